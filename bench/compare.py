@@ -0,0 +1,50 @@
+"""Compare two benchmark result files, e.g. from two commits::
+
+    python bench/compare.py bench/results/before.json bench/results/after.json --threshold 10
+
+Prints p50/p95/p99 and throughput side by side per scenario, dataset size and
+concurrency. Exits with status 1 when p95 or throughput got worse by more than
+``--threshold`` percent, so it can gate CI.
+"""
+import argparse
+import json
+import sys
+from typing import Any, Dict, Tuple
+
+from gen_data import size_label
+
+Key = Tuple[str, Any, int]
+
+def load(path: str) -> Dict[Key, Dict[str, Any]]:
+    with open(path) as f:
+        report = json.load(f)
+    return {(r["scenario"], r["rows"], r["concurrency"]): r for r in report["results"]}
+
+def change(old: float, new: float) -> float:
+    return 100.0 * (new - old) / old if old else 0.0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare two bench/run.py result files")
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=10.0, help="regression threshold in percent")
+    args = parser.parse_args()
+
+    before, after = load(args.before), load(args.after)
+    regressions = 0
+    print(f"{'scenario':>13} {'rows':>5} {'c':>4}  {'p50 ms':>17}  {'p95 ms':>17}  {'p99 ms':>17}  {'req/s':>19}")
+    for key in sorted(before.keys() & after.keys(), key=lambda k: (k[0], k[1] or 0, k[2])):
+        old, new = before[key], after[key]
+        cells = []
+        for name in ("p50", "p95", "p99"):
+            a, b = old["latency_ms"][name], new["latency_ms"][name]
+            cells.append(f"{a:7.2f}→{b:7.2f}{change(a, b):+4.0f}%")
+        a, b = old["throughput_rps"], new["throughput_rps"]
+        cells.append(f"{a:8.0f}→{b:8.0f}{change(a, b):+4.0f}%")
+        worse = change(old["latency_ms"]["p95"], new["latency_ms"]["p95"]) > args.threshold or change(a, b) < -args.threshold
+        regressions += worse
+        scenario, rows, c = key
+        print(f"{scenario:>13} {size_label(rows) if rows else '-':>5} {c:>4}  " + "  ".join(cells) + ("  REGRESSION" if worse else ""))
+    for key in sorted(before.keys() ^ after.keys(), key=str):
+        print(f"only in {'before' if key in before else 'after'}: {key}")
+    sys.exit(1 if regressions else 0)
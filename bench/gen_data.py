@@ -0,0 +1,112 @@
+"""Synthetic datasets for the benchmarks.
+
+Writes ``loads_<size>.csv`` (carrier_loads schema) and ``fmcsa_<size>.csv``
+(fmcsa_fake cache schema) per size. Output is deterministic for a given seed,
+so runs on different commits see the same data::
+
+    python bench/gen_data.py --sizes 10k,100k,1M --out bench/data
+"""
+import argparse
+import csv
+import math
+import os
+import random
+from datetime import datetime, timedelta
+from typing import List, Tuple
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+GAZETTEER = os.path.join(HERE, "..", "carrier_loads", "data", "gazetteer.csv")
+
+EQUIPMENT = ["Van", "Reefer", "Flatbed", "Step Deck", "Power Only"]
+COMMODITIES = ["Electronics", "Steel", "Produce", "Paper", "Furniture", "Chemicals", "Lumber", "Beverages"]
+NAME_WORDS = ["Alpha", "Beta", "Summit", "Prairie", "Coastal", "Iron", "Eagle", "Blue", "Lone Star", "Great Lakes", "Rapid", "Northern"]
+NAME_SUFFIXES = ["Logistics LLC", "Transport Inc", "Freight Co", "Trucking LLC", "Carriers Inc", "Express"]
+BASE_DATE = datetime(2025, 10, 1)
+
+def parse_size(text: str) -> int:
+    """"10k" -> 10000, "1M" -> 1000000."""
+    text = text.strip().lower()
+    scale = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    return int(float(text.rstrip("km")) * scale)
+
+def size_label(n: int) -> str:
+    for scale, suffix in ((1_000_000, "M"), (1_000, "k")):
+        if n >= scale and n % scale == 0:
+            return f"{n // scale}{suffix}"
+    return str(n)
+
+def read_places(path: str = GAZETTEER) -> List[Tuple[str, float, float]]:
+    with open(path, newline="") as f:
+        return [(f"{r['city']} {r['state']}", float(r["lat"]), float(r["lon"])) for r in csv.DictReader(f)]
+
+def road_miles(a: Tuple[str, float, float], b: Tuple[str, float, float]) -> int:
+    lat1, lon1, lat2, lon2 = map(math.radians, (a[1], a[2], b[1], b[2]))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    # great-circle distance plus ~20% for roads
+    return max(20, round(1.2 * 2 * 3958.8 * math.asin(math.sqrt(h))))
+
+def write_loads(path: str, n: int, rng: random.Random) -> None:
+    places = read_places()
+    # a few metro areas carry most of the freight, as on a real loadboard
+    weights = [1.0 / (i + 1) ** 0.6 for i in range(len(places))]
+    with open(path, "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["load_id", "origin", "destination", "pickup_datetime", "delivery_datetime", "equipment_type",
+                    "loadboard_rate", "notes", "weight", "commodity_type", "num_of_pieces", "miles", "dimensions"])
+        for i in range(n):
+            origin, destination = rng.choices(places, weights, k=2)
+            while destination is origin:
+                destination = rng.choices(places, weights)[0]
+            miles = road_miles(origin, destination)
+            pickup = BASE_DATE + timedelta(minutes=30 * rng.randrange(0, 2 * 24 * 60))
+            delivery = pickup + timedelta(hours=math.ceil(miles / 50) + rng.randint(2, 12))
+            w.writerow([
+                f"L{i + 1:07d}",
+                origin[0],
+                destination[0],
+                pickup.isoformat(),
+                delivery.isoformat(),
+                rng.choice(EQUIPMENT),
+                round(miles * rng.uniform(1.8, 3.4)),
+                rng.choice(["", "", "Fragile goods", "Tarps required", "Drop and hook", "Team drivers"]),
+                rng.randrange(1000, 45000, 500),
+                rng.choice(COMMODITIES),
+                rng.randint(1, 800),
+                miles,
+                f"{rng.choice([40, 48, 53])}x{rng.choice([40, 48, 102])}x{rng.choice([48, 60, 72, 96])}",
+            ])
+
+def write_fmcsa(path: str, n: int, rng: random.Random) -> None:
+    with open(path, "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["mc", "dot", "carrier_name", "status", "insurance_ok", "authority_ok", "reason"])
+        for i in range(n):
+            active = rng.random() < 0.85
+            insurance_ok = active and rng.random() < 0.9
+            authority_ok = active and rng.random() < 0.95
+            reason = "" if insurance_ok and authority_ok else (
+                "Carrier inactive" if not active else "Insurance not on file" if not insurance_ok else "Authority revoked"
+            )
+            w.writerow([
+                100000 + i,
+                1000000 + i,
+                f"{rng.choice(NAME_WORDS)} {rng.choice(NAME_SUFFIXES)} {i}",
+                "active" if active else "inactive",
+                str(insurance_ok).lower(),
+                str(authority_ok).lower(),
+                reason,
+            ])
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic loads and FMCSA datasets")
+    parser.add_argument("--sizes", default="10k,100k,1M", help="comma-separated row counts, e.g. 10k,100k,1M")
+    parser.add_argument("--out", default=os.path.join(HERE, "data"))
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    os.makedirs(args.out, exist_ok=True)
+    for n in map(parse_size, args.sizes.split(",")):
+        label = size_label(n)
+        for name, write in (("loads", write_loads), ("fmcsa", write_fmcsa)):
+            path = os.path.join(args.out, f"{name}_{label}.csv")
+            write(path, n, random.Random(f"{args.seed}-{name}-{n}"))
+            print(f"wrote {path}")
@@ -1,14 +1,130 @@
 
 import os
-import csv
-from typing import List, Dict, Any, Optional
-from fastapi import FastAPI, HTTPException, Query, Header, Depends
+import base64
+import hashlib
+import json
+import logging
+import math
+import threading
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+from fastapi import FastAPI, HTTPException, Query, Header, Depends, Response
 from fastapi.middleware.cors import CORSMiddleware
+from pydantic import BaseModel, Field
+
+from carrier_common.fuzzy import best, code_candidates, spoken_code
+from carrier_common.telemetry import install as install_telemetry, phase
+from columnar import ColumnarLoadStore
+from fastjson import FastJSONResponse, dumps
+from snapshot import load_or_build
+from geo import gazetteer, parse_place
+from pricing import PriceBook
+from reservations import Reservation, ReservationConflict, ReservationStore
+from response_cache import ResponseCache, etag_matches
+from store import DEADHEAD, DEFAULT_SORT, SORT_KEYS, InvalidCursor, LoadIndex, Selection, load_rows
 
 DATA_PATH = os.environ.get("LOADS_PATH", "data/loads.csv")
 API_KEY = os.environ.get("API_KEY", "dev-secret")
+LOADS_BACKEND = os.environ.get("LOADS_BACKEND", "index")  # index|columnar
+SNAPSHOT_PATH = os.environ.get("LOADS_SNAPSHOT", "")  # columnar backend only, e.g. data/loads.snap
+RELOAD_INTERVAL = float(os.environ.get("LOADS_RELOAD_INTERVAL", "5"))  # seconds, 0 disables hot reload
+RESPONSE_CACHE_SIZE = int(os.environ.get("RESPONSE_CACHE_SIZE", "1024"))  # entries, 0 disables
+RESPONSE_CACHE_BYTES = int(os.environ.get("RESPONSE_CACHE_BYTES", str(64 << 20)))
+# SQLite file shared by every worker on the machine (one machine only, see reservations.py)
+RESERVATIONS_PATH = os.environ.get("RESERVATIONS_PATH", "data/reservations.db")
+# seconds before listings see a reservation made by another worker
+RESERVATIONS_POLL_INTERVAL = float(os.environ.get("RESERVATIONS_POLL_INTERVAL", "0.25"))
+HOLD_TTL = float(os.environ.get("HOLD_TTL", "300"))  # seconds
+HOLD_TTL_MAX = float(os.environ.get("HOLD_TTL_MAX", "3600"))
+
+log = logging.getLogger("carrier_loads")
+
+class Dataset(NamedTuple):
+    """One immutable generation of the store; swapped as a whole on reload."""
+    store: Any
+    prices: PriceBook
+    generation: int
+    loaded_at: float
+    stamp: Tuple[int, int]
+
+def _stamp(path: str) -> Tuple[int, int]:
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+def build_store(path: str, previous: Any = None):
+    if LOADS_BACKEND == "columnar":
+        if SNAPSHOT_PATH:
+            return load_or_build(path, SNAPSHOT_PATH, previous=previous)
+        return ColumnarLoadStore.from_csv(path, previous=previous)
+    cache, digests = load_rows(path, previous.digests if previous is not None else None)
+    return LoadIndex(cache, digests, previous=previous)
+
+def _initial_dataset() -> Dataset:
+    if int(os.environ.get("WEB_CONCURRENCY", "1")) > 1 and not (LOADS_BACKEND == "columnar" and SNAPSHOT_PATH):
+        log.warning("every worker keeps its own copy of %s; set LOADS_BACKEND=columnar and LOADS_SNAPSHOT to share one", DATA_PATH)
+    stamp = _stamp(DATA_PATH)
+    store = build_store(DATA_PATH)
+    return Dataset(store, PriceBook.from_store(store), 1, time.time(), stamp)
+
+DATASET = _initial_dataset()
+RESPONSE_CACHE = ResponseCache(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_BYTES)
+RESERVATIONS = ReservationStore(RESERVATIONS_PATH, RESERVATIONS_POLL_INTERVAL)
+
+class Availability(NamedTuple):
+    """Loads hidden from listings (booked or actively held) for one dataset generation."""
+    generation: int
+    changes: int
+    valid_until: float  # when the next hold expires
+    exclude: Any  # store.exclusion() of the unavailable ids
+
+_AVAILABILITY: Optional[Availability] = None
+
+def availability(data: "Dataset") -> Availability:
+    """Current availability view; rebuilt only when the dataset, a reservation or a hold expiry changed it."""
+    global _AVAILABILITY
+    changes = RESERVATIONS.changes()
+    now = time.time()
+    current = _AVAILABILITY
+    if current is None or current.generation != data.generation or current.changes != changes or now >= current.valid_until:
+        ids, valid_until = RESERVATIONS.unavailable(now)
+        current = _AVAILABILITY = Availability(data.generation, changes, valid_until, data.store.exclusion(ids))
+    return current
+
+def reload_dataset() -> bool:
+    """Rebuild the store if the CSV changed, then swap it in with one assignment.
+
+    Requests read ``DATASET`` once, so they see either the old or the new
+    generation, never a mix. Returns True when a new generation was installed.
+    """
+    global DATASET
+    current = DATASET
+    stamp = _stamp(DATA_PATH)
+    if stamp == current.stamp:
+        return False
+    store = build_store(DATA_PATH, previous=current.store)
+    DATASET = Dataset(store, PriceBook.from_store(store), current.generation + 1, time.time(), stamp)
+    log.info("reloaded %s: generation %d, %d records", DATA_PATH, DATASET.generation, len(store))
+    return True
 
-app = FastAPI(title="Carrier Loads API", version="0.3.1", description="Searchable loads API with optional filters and sane defaults")
+def _watch(stop: threading.Event) -> None:
+    while not stop.wait(RELOAD_INTERVAL):
+        try:
+            reload_dataset()
+        except Exception:
+            # keep serving the previous generation; retried on the next tick
+            log.exception("reload of %s failed", DATA_PATH)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    stop = threading.Event()
+    if RELOAD_INTERVAL > 0:
+        threading.Thread(target=_watch, args=(stop,), name="loads-reload", daemon=True).start()
+    yield
+    stop.set()
+
+app = FastAPI(title="Carrier Loads API", version="0.3.1", description="Searchable loads API with optional filters and sane defaults", lifespan=lifespan, default_response_class=FastJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -17,51 +133,166 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-
-def _norm_id(x: str) -> str:
-    return (x or "").strip().upper()
-
-def load_data(path: str) -> Dict[str, Dict[str, Any]]:
-    cache: Dict[str, Dict[str, Any]] = {}
-    with open(path, newline="") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            # Trim whitespace
-            for k, v in list(row.items()):
-                if isinstance(v, str):
-                    row[k] = v.strip()
-            # numeric coercion
-            try:
-                row["loadboard_rate"] = float(row["loadboard_rate"]) if row.get("loadboard_rate") else None
-            except Exception:
-                row["loadboard_rate"] = None
-            try:
-                row["weight"] = float(row["weight"]) if row.get("weight") else None
-            except Exception:
-                row["weight"] = None
-            try:
-                row["num_of_pieces"] = int(row["num_of_pieces"]) if row.get("num_of_pieces") else None
-            except Exception:
-                row["num_of_pieces"] = None
-            try:
-                row["miles"] = int(row["miles"]) if row.get("miles") else None
-            except Exception:
-                row["miles"] = None
-            # normalize id key to uppercase
-            row_id = _norm_id(row["load_id"])
-            row["load_id"] = row_id
-            cache[row_id] = row
-    return cache
-
-CACHE = load_data(DATA_PATH)
+install_telemetry(app, api_key=API_KEY)  # GET /metrics (Prometheus)
 
 def require_api_key(x_api_key: Optional[str] = Header(default=None, alias="X-API-Key" )):
     if API_KEY and x_api_key != API_KEY:
         raise HTTPException(status_code=401, detail="Invalid or missing API key")
 
+def _cursor_scope(filters: Dict[str, Any]) -> str:
+    """Digest of the active filters, so a cursor is only followed on the query that issued it."""
+    active = sorted((name, value) for name, value in filters.items() if value is not None)
+    return hashlib.blake2b(repr(active).encode(), digest_size=6).hexdigest()
+
+def _data_version(data: "Dataset") -> str:
+    """Digest of the CSV stamp a dataset was built from; the same in every worker serving that file."""
+    return hashlib.blake2b(repr(data.stamp).encode(), digest_size=6).hexdigest()
+
+def _encode_cursor(key: str, descending: bool, scope: str, version: str, row: Dict[str, Any]) -> str:
+    raw = json.dumps([key, descending, row.get(key), row["load_id"], scope, version], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def _valid_cursor_value(key: str, value: Any) -> bool:
+    if key in ("pickup_datetime", "delivery_datetime"):
+        return value is None or isinstance(value, str)
+    if value is None:
+        return key != DEADHEAD
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+def _decode_cursor(cursor: str) -> Tuple[str, bool, Any, str, str, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key, descending, value, load_id, scope, version = json.loads(raw)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if (
+        key not in SORT_KEYS + (DEADHEAD,) or not isinstance(descending, bool) or not isinstance(load_id, str)
+        or not isinstance(scope, str) or not isinstance(version, str) or not _valid_cursor_value(key, value)
+    ):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return key, descending, value, load_id, scope, version
+
+class View(NamedTuple):
+    """How a page of loads is rendered: which fields, as row objects or as columns."""
+    fields: Optional[Tuple[str, ...]]
+    shape: str  # rows|columns
+
+def _view(store: Any, fields: Optional[str], shape: str) -> View:
+    names = tuple(f.strip() for f in fields.split(",") if f.strip()) if fields else ()
+    unknown = [f for f in names if f not in store.columns and f != DEADHEAD]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown field(s): {', '.join(unknown)}")
+    return View(tuple(dict.fromkeys(names)) or None, shape)
+
+def _results(store: Any, sel: Selection, view: View) -> bytes:
+    if view.shape == "columns":
+        rows = store.rows_of(sel, view.fields)
+        names = view.fields or (list(rows[0]) if rows else [])
+        with phase("serialize"):
+            return dumps({name: [row.get(name) for row in rows] for name in names})
+    if view.fields:
+        rows = store.rows_of(sel, view.fields)
+        with phase("serialize"):
+            return dumps(rows)
+    # full rows: their encodings are cached by the store, a page is one join
+    blobs = store.rows_json(sel)
+    with phase("serialize"):
+        return b"[" + b",".join(blobs) + b"]"
+
+def _paginate(data: "Dataset", filters: Dict[str, Any], sort_by: Optional[str], order: Optional[str], page: int, page_size: int, cursor: Optional[str], exclude: Any = None, view: View = View(None, "rows")) -> bytes:
+    """Offset pagination (page/page_size) or keyset pagination (cursor), as an encoded JSON page.
+
+    A cursor carries the sort key, direction, a digest of the filters, the
+    version of the data and the last row's (value, load_id); it resumes right
+    after that row, replacing page. A cursor sent with other filters, sort_by
+    or order is rejected with a 400 rather than resuming a different ordering,
+    and so is one issued before the CSV was reloaded.
+    """
+    store = data.store
+    ranked = filters.get("origin_near") is not None
+    if sort_by == DEADHEAD and ranked:
+        key = DEADHEAD
+    elif sort_by is None and ranked:
+        # radius searches rank by deadhead unless asked otherwise
+        key = DEADHEAD
+    else:
+        key = sort_by if sort_by in SORT_KEYS else DEFAULT_SORT
+    descending = (order or "").lower() == "desc"
+    scope = _cursor_scope(filters)
+    version = _data_version(data)
+    if cursor:
+        cursor_key, cursor_descending, value, load_id, cursor_scope, cursor_version = _decode_cursor(cursor)
+        if (cursor_key, cursor_descending, cursor_scope) != (key, descending, scope):
+            raise HTTPException(
+                status_code=400, detail="Cursor does not match this query: repeat the filters, sort_by and order it came with"
+            )
+        if cursor_version != version:
+            raise HTTPException(status_code=400, detail="Cursor is from before the loads were reloaded: start again from page 1")
+        after, offset = (value, load_id), 0
+    else:
+        after, offset = None, (page - 1) * page_size
+    # one extra row tells whether there is a next page
+    try:
+        sel = store.select(
+            **filters, sort_by=key, descending=descending, offset=offset, limit=page_size + 1, after=after, exclude=exclude
+        )
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    next_cursor = None
+    if len(sel.positions) > page_size:
+        next_cursor = _encode_cursor(key, descending, scope, version, store.rows_of(sel.sliced(page_size - 1, page_size))[0])
+        sel = sel.sliced(0, page_size)
+    results = _results(store, sel, view)
+    return b'{"count":%d,"page":%s,"page_size":%d,"results":%s,"next_cursor":%s}' % (
+        sel.count, dumps(None if cursor else page), page_size, results, dumps(next_cursor)
+    )
+
+def _locate(place: Optional[str], field: str):
+    point = gazetteer().locate(place) if place else None
+    if point is None:
+        raise HTTPException(status_code=400, detail=f"Unknown {field} location: {place!r}")
+    return point
+
+def _norm_param(value: Optional[str]) -> Optional[str]:
+    # text filters and sort options are case-insensitive and ignore surrounding blanks;
+    # normalized once in the route, the same values key the cache and run the query
+    return value.strip().lower() if value is not None else None
+
+def _cached_json(key: Tuple[Any, ...], if_none_match: Optional[str], build) -> Response:
+    """Serve the JSON bytes of ``build(data, exclude)`` from the response cache.
+
+    ``key`` holds the (normalized) query parameters and gets the availability
+    version appended; entries are dropped when the dataset generation changes.
+    A matching If-None-Match gets a bodiless 304.
+    """
+    data = DATASET
+    avail = availability(data)
+    entry = RESPONSE_CACHE.get_or_build(
+        data.generation,
+        key + ((avail.changes, avail.valid_until),),
+        lambda: build(data, avail.exclude),
+    )
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
 @app.get("/health")
 def health():
-    return {"status": "ok", "records": len(CACHE), "source": DATA_PATH}
+    data = DATASET
+    return {
+        "status": "ok",
+        "records": len(data.store),
+        "source": DATA_PATH,
+        "backend": LOADS_BACKEND,
+        "generation": data.generation,
+        "last_reload": datetime.fromtimestamp(data.loaded_at, timezone.utc).isoformat(),
+        "response_cache": RESPONSE_CACHE.stats(),
+        "unavailable_loads": len(RESERVATIONS.unavailable()[0]),
+    }
+
+FIELDS_DOC = "Comma-separated fields to return, e.g. load_id,origin,destination,loadboard_rate (default: all)"
+SHAPE_DOC = "rows: results is a list of objects; columns: results is one list per field"
 
 # List all loads (with pagination & sorting), no filters
 @app.get("/loads", dependencies=[Depends(require_api_key)])
@@ -70,61 +301,138 @@ def list_loads(
     order: Optional[str] = Query("asc", description="asc|desc"),
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from a previous page; send it with the same filters, sort_by and order (replaces page)"),
+    fields: Optional[str] = Query(None, description=FIELDS_DOC),
+    shape: str = Query("rows", pattern="^(rows|columns)$", description=SHAPE_DOC),
+    if_none_match: Optional[str] = Header(None),
 ):
-    results: List[Dict[str, Any]] = list(CACHE.values())
-    valid_sort = {"pickup_datetime", "delivery_datetime", "miles", "loadboard_rate"}
-    key = sort_by if sort_by in valid_sort else "pickup_datetime"
-    reverse = (order.lower() == "desc")
-    results.sort(key=lambda r: (r.get(key) is None, r.get(key)), reverse=reverse)
-    start = (page - 1) * page_size
-    end = start + page_size
-    return {"count": len(results), "page": page, "page_size": page_size, "results": results[start:end]}
+    sort_by, order = _norm_param(sort_by), _norm_param(order)
+    view = _view(DATASET.store, fields, shape)
+    key = ("list", sort_by, order, page, page_size, cursor, view)
+    return _cached_json(key, if_none_match, lambda data, exclude: _paginate(data, {}, sort_by, order, page, page_size, cursor, exclude, view))
 
 # SEARCH BEFORE DYNAMIC ROUTE to avoid shadowing by /loads/{load_id}
 @app.get("/loads/search", dependencies=[Depends(require_api_key)])
 @app.get("/loads/search/", dependencies=[Depends(require_api_key)])
 def search_loads(
-    origin: Optional[str] = Query(None, description="Text match within origin"),
-    destination: Optional[str] = Query(None, description="Text match within destination"),
+    origin: Optional[str] = Query(None, description="Text match within origin, or the center place (e.g. 'Dallas TX') with origin_radius_miles"),
+    destination: Optional[str] = Query(None, description="Text match within destination, or the center place with dest_radius_miles"),
     equipment_type: Optional[str] = Query(None, description="Exact match on equipment_type"),
     max_weight: Optional[float] = Query(None, description="Filter out loads with weight > max_weight"),
-    sort_by: Optional[str] = Query("pickup_datetime", description="Field to sort by: pickup_datetime|delivery_datetime|miles|loadboard_rate"),
+    origin_radius_miles: Optional[float] = Query(None, gt=0, le=3000, description="Loads picking up within this many miles of origin"),
+    dest_radius_miles: Optional[float] = Query(None, gt=0, le=3000, description="Loads delivering within this many miles of destination"),
+    sort_by: Optional[str] = Query(None, description="Field to sort by: pickup_datetime|delivery_datetime|miles|loadboard_rate|deadhead_miles (default pickup_datetime, or deadhead_miles with origin_radius_miles)"),
     order: Optional[str] = Query("asc", description="Sort order: asc|desc"),
     page: int = Query(1, ge=1, description="Page number (1-based)"),
     page_size: int = Query(50, ge=1, le=500, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from a previous page; send it with the same filters, sort_by and order (replaces page)"),
+    fields: Optional[str] = Query(None, description=FIELDS_DOC),
+    shape: str = Query("rows", pattern="^(rows|columns)$", description=SHAPE_DOC),
+    if_none_match: Optional[str] = Header(None),
 ):
     """
     Returns loads filtered by the optional parameters. If no filters are provided,
-    returns all loads (paginated). Supports sorting and pagination.
+    returns all loads (paginated). Supports sorting and pagination, either by
+    page number or by following ``next_cursor`` (keyset pagination).
     """
-    results: List[Dict[str, Any]] = []
-    for load in CACHE.values():
-        if origin and origin.lower() not in load.get("origin", "").lower():
-            continue
-        if destination and destination.lower() not in load.get("destination", "").lower():
-            continue
-        if equipment_type and equipment_type.lower() != load.get("equipment_type", "").lower():
-            continue
-        if max_weight is not None and load.get("weight") is not None and load["weight"] > max_weight:
-            continue
-        results.append(load)
-    
-    valid_sort = {"pickup_datetime", "delivery_datetime", "miles", "loadboard_rate"}
-    key = sort_by if sort_by in valid_sort else "pickup_datetime"
-    reverse = (order.lower() == "desc")
-    results.sort(key=lambda r: (r.get(key) is None, r.get(key)), reverse=reverse)
-    
-    start = (page - 1) * page_size
-    end = start + page_size
-    page_items = results[start:end]
-    
-    return {"count": len(results), "page": page, "page_size": page_size, "results": page_items}
+    origin, destination, equipment_type = _norm_param(origin), _norm_param(destination), _norm_param(equipment_type)
+    sort_by, order = _norm_param(sort_by), _norm_param(order)
+    filters = {"origin": origin, "destination": destination, "equipment_type": equipment_type, "max_weight": max_weight}
+    if origin_radius_miles is not None:
+        filters["origin"] = None
+        filters["origin_near"] = (_locate(origin, "origin"), origin_radius_miles)
+    if dest_radius_miles is not None:
+        filters["destination"] = None
+        filters["destination_near"] = (_locate(destination, "destination"), dest_radius_miles)
+    view = _view(DATASET.store, fields, shape)
+    key = ("search", tuple(filters.items()), sort_by, order, page, page_size, cursor, view)
+    return _cached_json(key, if_none_match, lambda data, exclude: _paginate(data, filters, sort_by, order, page, page_size, cursor, exclude, view))
+
+# words callers say around a load number ("load number L 0 0 1")
+ID_FILLER = ("load", "number", "id", "is", "it", "the", "my")
+
+@app.get("/loads/lookup", dependencies=[Depends(require_api_key)])
+def lookup_loads(
+    q: str = Query(..., min_length=1, description="What the caller said, e.g. 'L 0 0 1', 'el zero zero one' or 'chicago ill'"),
+    field: str = Query("any", pattern="^(any|load_id|origin|destination)$", description="Where to look: any|load_id|origin|destination"),
+    limit: int = Query(5, ge=1, le=50, description="Maximum number of candidates"),
+    min_score: float = Query(0.5, ge=0, le=1, description="Drop candidates scoring below this (1.0 = exact)"),
+):
+    """
+    Tolerant lookup for speech-to-text input: ranked candidates with a score in
+    [0, 1]. Load ids are matched within two edits after spoken digits and
+    letters are collapsed; load_id candidates carry the load, origin and
+    destination candidates the exact place name (for /loads/search) and how
+    many loads use it.
+    """
+    store = DATASET.store
+    candidates = []
+    if field in ("any", "load_id"):
+        found = code_candidates(spoken_code(q, ID_FILLER), store.id_chars, store.known_ids, limit)
+        for load_id, score in best(found, limit, min_score):
+            candidates.append({"field": "load_id", "value": load_id, "score": score, "load": store.get(load_id)})
+    text = " ".join(filter(None, parse_place(q)))  # "dallas texas" -> "dallas tx"
+    for name in ("origin", "destination"):
+        if field in ("any", name):
+            for place, score, loads in store.similar_places(name, text, limit, min_score):
+                candidates.append({"field": name, "value": place, "score": score, "loads": loads})
+    candidates.sort(key=lambda c: -c["score"])
+    return {"query": q, "candidates": candidates[:limit]}
+
+class QuoteRequest(BaseModel):
+    ask: float = Field(gt=0, description="Price the carrier asked for")
+    round: int = Field(1, ge=1, description="Negotiation round, starting at 1")
+
+@app.post("/loads/{load_id}/quote", dependencies=[Depends(require_api_key)])
+def quote_load(load_id: str, req: QuoteRequest):
+    """Accept, counter or reject a carrier's ask for a load, with the next price to offer."""
+    data = DATASET
+    load = data.store.get(load_id)
+    if not load:
+        raise HTTPException(status_code=404, detail="Load not found")
+    return data.prices.quote(load, req.ask, req.round)
+
+class ReservationRequest(BaseModel):
+    holder: str = Field(min_length=1, description="Who holds or books the load, e.g. the carrier's MC number")
+    version: Optional[int] = Field(None, description="Reservation version last seen; the change is refused (409) if it has moved on")
+
+class HoldRequest(ReservationRequest):
+    ttl_seconds: float = Field(HOLD_TTL, gt=0, le=HOLD_TTL_MAX, description="How long the hold lasts")
+
+def _reservation_json(res: Reservation) -> Dict[str, Any]:
+    expires = datetime.fromtimestamp(res.expires_at, timezone.utc).isoformat() if res.expires_at else None
+    return {"load_id": res.load_id, "state": res.state, "holder": res.holder, "expires_at": expires, "version": res.version}
+
+def _reserve(load_id: str, change) -> Dict[str, Any]:
+    load = DATASET.store.get(load_id)
+    if not load:
+        raise HTTPException(status_code=404, detail="Load not found")
+    try:
+        return _reservation_json(change(load["load_id"]))
+    except ReservationConflict as e:
+        raise HTTPException(status_code=409, detail={"message": str(e), "reservation": _reservation_json(e.current)})
+
+@app.get("/loads/{load_id}/reservation", dependencies=[Depends(require_api_key)])
+def get_reservation(load_id: str):
+    return _reserve(load_id, RESERVATIONS.get)
+
+@app.post("/loads/{load_id}/hold", dependencies=[Depends(require_api_key)])
+def hold_load(load_id: str, req: HoldRequest):
+    """Hold a load for ``ttl_seconds``; held and booked loads drop out of /loads and /loads/search."""
+    return _reserve(load_id, lambda lid: RESERVATIONS.hold(lid, req.holder, req.ttl_seconds, req.version))
+
+@app.post("/loads/{load_id}/book", dependencies=[Depends(require_api_key)])
+def book_load(load_id: str, req: ReservationRequest):
+    return _reserve(load_id, lambda lid: RESERVATIONS.book(lid, req.holder, req.version))
+
+@app.post("/loads/{load_id}/release", dependencies=[Depends(require_api_key)])
+def release_load(load_id: str, req: ReservationRequest):
+    return _reserve(load_id, lambda lid: RESERVATIONS.release(lid, req.holder, req.version))
 
 # Dynamic route defined LAST
 @app.get("/loads/{load_id}", dependencies=[Depends(require_api_key)])
 def get_load(load_id: str):
-    norm = _norm_id(load_id)
-    load = CACHE.get(norm)
+    load = DATASET.store.get(load_id)
     if not load:
         raise HTTPException(status_code=404, detail="Load not found")
     return load
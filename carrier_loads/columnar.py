@@ -0,0 +1,672 @@
+import csv
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import BinaryIO, List, Dict, Any, Optional, Iterable, Iterator, Sequence, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:  # the columnar backend is optional
+    np = None
+
+from carrier_common.telemetry import Laps, phase
+from geo import GeoIndex
+from fastjson import dumps, with_field
+from store import (
+    SORT_KEYS, DEFAULT_SORT, DEADHEAD, InvalidCursor, Near, Selection, TextIndex,
+    project, _norm_id, cursor_start, deadhead_target, iter_records, lane_key,
+)
+
+FLOAT_COLUMNS = ("loadboard_rate", "weight")
+INT_COLUMNS = ("num_of_pieces", "miles")
+TIME_COLUMNS = ("pickup_datetime", "delivery_datetime")
+INT_NULL = -(2 ** 63)
+# encoded rows each process keeps when it does not serve from a snapshot (which holds
+# them all); 0 encodes every page afresh
+ROW_CACHE_SIZE = int(os.environ.get("LOADS_ROW_CACHE", "100000"))
+
+def _parse_time(raw: str) -> int:
+    if not raw:
+        return INT_NULL
+    try:
+        ts = datetime.fromisoformat(raw)
+    except ValueError:
+        return INT_NULL
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return int(ts.timestamp())
+
+def _float_column(raw: List[str]) -> "np.ndarray":
+    try:
+        return np.array([s or "nan" for s in raw], dtype=np.float64)
+    except ValueError:
+        out = np.full(len(raw), np.nan)
+        for i, s in enumerate(raw):
+            try:
+                out[i] = float(s) if s else np.nan
+            except ValueError:
+                pass
+        return out
+
+def _int_column(raw: List[str]) -> "np.ndarray":
+    try:
+        return np.array([s or str(INT_NULL) for s in raw], dtype=np.int64)
+    except ValueError:
+        pass
+    out = np.full(len(raw), INT_NULL, dtype=np.int64)
+    for i, s in enumerate(raw):
+        try:
+            out[i] = int(s) if s else INT_NULL
+        except ValueError:
+            pass
+    return out
+
+class StringTable:
+    """Strings packed into one UTF-8 blob: item ``i`` is ``blob[offsets[i]:offsets[i + 1]]``.
+
+    Unlike a NumPy ``U`` array, which stores every item as wide as the longest
+    one at 4 bytes per character, this costs the encoded text plus 8 bytes per
+    item, and both arrays can be memory-mapped from a snapshot. Tables built by
+    ``from_strings`` are sorted by code point (= UTF-8 byte order), so they also
+    answer lookups; ``keys`` holds every item's first 8 bytes as a big-endian
+    integer to run those as vectorized searchsorted calls.
+    """
+
+    def __init__(self, offsets: "np.ndarray", blob: "np.ndarray", keys: Optional["np.ndarray"] = None):
+        self.offsets = offsets
+        self.blob = blob
+        self._view = memoryview(blob)
+        self._keys = keys
+
+    @classmethod
+    def from_strings(cls, values: Sequence[str]) -> "StringTable":
+        encoded = [v.encode("utf-8") for v in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.uint64)
+        offsets[1:] = np.cumsum([len(b) for b in encoded])
+        return cls(offsets, np.frombuffer(b"".join(encoded), dtype=np.uint8))
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        return str(self._view[int(self.offsets[i]):int(self.offsets[i + 1])], "utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        for start in range(0, len(self), 1 << 16):
+            yield from self.take(np.arange(start, min(start + (1 << 16), len(self))))
+
+    def take(self, indices: "np.ndarray") -> List[str]:
+        view = self._view
+        return [str(view[a:b], "utf-8") for a, b in zip(self.offsets[indices].tolist(), self.offsets[indices + 1].tolist())]
+
+    def take_bytes(self, indices: "np.ndarray") -> List[bytes]:
+        """Like take(), without decoding."""
+        view = self._view
+        return [view[a:b].tobytes() for a, b in zip(self.offsets[indices].tolist(), self.offsets[indices + 1].tolist())]
+
+    @property
+    def keys(self) -> "np.ndarray":
+        if self._keys is None:
+            starts = self.offsets[:-1].astype(np.int64)
+            lengths = self.offsets[1:].astype(np.int64) - starts
+            keys = np.zeros(len(self), dtype=np.uint64)
+            last = max(len(self.blob) - 1, 0)
+            for k in range(8):
+                byte = self.blob[np.minimum(starts + k, last)] if len(self.blob) else np.zeros(len(self), np.uint8)
+                keys = (keys << np.uint64(8)) | np.where(lengths > k, byte, 0).astype(np.uint64)
+            self._keys = keys
+        return self._keys
+
+    @staticmethod
+    def _key(encoded: bytes) -> int:
+        return int.from_bytes(encoded[:8].ljust(8, b"\0"), "big")
+
+    def searchsorted(self, value: str, side: str = "left") -> int:
+        """Insertion point of ``value``, as ``np.searchsorted`` on a sorted table."""
+        target = value.encode("utf-8")
+        key = np.uint64(self._key(target))
+        lo = int(np.searchsorted(self.keys, key, "left"))
+        hi = int(np.searchsorted(self.keys, key, "right"))
+        # items sharing the 8-byte prefix: compare them in full
+        view = self._view
+        while lo < hi:
+            mid = (lo + hi) // 2
+            item = view[int(self.offsets[mid]):int(self.offsets[mid + 1])].tobytes()
+            if item < target or (side == "right" and item == target):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def find(self, values: Sequence[str]) -> "np.ndarray":
+        """Position of every value in a sorted table, -1 where it is missing."""
+        encoded = [v.encode("utf-8") for v in values]
+        keys = np.array([self._key(b) for b in encoded], dtype=np.uint64)
+        lo = np.searchsorted(self.keys, keys, "left")
+        hi = np.searchsorted(self.keys, keys, "right")
+        out = np.full(len(encoded), -1, dtype=np.int64)
+        for i in np.flatnonzero(hi > lo).tolist():
+            pos = self.searchsorted(values[i])
+            if pos < len(self) and self._view[int(self.offsets[pos]):int(self.offsets[pos + 1])] == encoded[i]:
+                out[i] = pos
+        return out
+
+class FileStringTable:
+    """A StringTable whose blob stays in a file and is read item by item (``pread``).
+
+    For tables read a few random items at a time, like a snapshot's encoded
+    rows: mapping the blob would map whole page-cache folios (up to 2 MB on
+    recent kernels) into the process for each item touched, until every
+    worker maps most of it. Reads leave those pages in the shared page cache.
+    """
+
+    def __init__(self, offsets: "np.ndarray", file: BinaryIO, base: int):
+        self.offsets = offsets
+        self.file = file
+        self.base = base
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def take_bytes(self, indices: "np.ndarray") -> List[bytes]:
+        fd, base = self.file.fileno(), self.base
+        return [os.pread(fd, b - a, base + a) for a, b in zip(self.offsets[indices].tolist(), self.offsets[indices + 1].tolist())]
+
+def _dictionary(values: Sequence[str]) -> Tuple["np.ndarray", StringTable]:
+    """Dictionary-encode ``values``: int32 codes into a sorted StringTable."""
+    index: Dict[str, int] = {}
+    codes = np.fromiter((index.setdefault(v, len(index)) for v in values), dtype=np.int32, count=len(values))
+    uniques = sorted(index)
+    rank = np.empty(len(uniques), dtype=np.int32)
+    rank[[index[v] for v in uniques]] = np.arange(len(uniques), dtype=np.int32)
+    return rank[codes], StringTable.from_strings(uniques)
+
+def _ascending(values: "np.ndarray", null: "np.ndarray", ids: "np.ndarray") -> "np.ndarray":
+    """Permutation ordered by ``(value, load_id)`` with nulls last; descending is its reverse."""
+    return np.lexsort((ids, np.where(null, 0, values), null))
+
+class ColumnarLoadStore:
+    """NumPy-backed, column-oriented load store.
+
+    Numeric fields are typed arrays (NaN / ``INT_NULL`` for missing values)
+    and every other field is dictionary-encoded (int32 codes into a sorted
+    StringTable), so values come back exactly as written in the CSV.
+    Pickup/delivery datetimes also get an epoch-second int64 copy that orders
+    them (naive values are read as UTC; missing or unparseable ones sort as
+    null). Filters run as vectorized masks over the presorted permutations;
+    rows are only turned back into dicts for the page being returned.
+
+    Pages are served as encoded JSON rows. A store mapped from a snapshot
+    reads them from the snapshot's row table (see FileStringTable);
+    otherwise they are encoded on first use and kept in an LRU of
+    ``ROW_CACHE_SIZE`` rows.
+    """
+
+    def __init__(
+        self,
+        columns: List[str],
+        data: Dict[str, Any],
+        digests: Optional["np.ndarray"] = None,
+        order: Optional[Dict[str, "np.ndarray"]] = None,
+        id_positions: Optional["np.ndarray"] = None,
+        lanes: Optional[Tuple["np.ndarray", "np.ndarray", "np.ndarray"]] = None,
+        epochs: Optional[Dict[str, "np.ndarray"]] = None,
+        rows: Optional[Union[StringTable, FileStringTable]] = None,
+    ):
+        if np is None:
+            raise RuntimeError("the columnar backend requires numpy")
+        self.columns = columns
+        self.data = data
+        self.n = len(data["load_id"][0])
+        # per-row record digests, kept for incremental reloads
+        self.digests = digests if digests is not None else np.zeros(self.n, dtype="V16")
+
+        # load_id values are unique and sorted, so codes map straight to positions
+        self.id_values = data["load_id"][1]
+        if id_positions is None:
+            id_positions = np.empty(self.n, dtype=np.int64)
+            id_positions[data["load_id"][0]] = np.arange(self.n)
+        self.id_positions = id_positions
+        # characters load ids are made of, for fuzzy id lookups: mark the bytes of the
+        # id blob in a table instead of decoding it (in slices: fancy indexing copies
+        # the indices as intp, 8x the blob), and decode only if any is non-ASCII
+        seen = np.zeros(256, dtype=bool)
+        blob = self.id_values.blob
+        for start in range(0, len(blob), 1 << 16):
+            seen[blob[start:start + (1 << 16)]] = True
+        if seen[128:].any():
+            self.id_chars = "".join(sorted(set(str(memoryview(blob), "utf-8"))))
+        else:
+            self.id_chars = bytes(np.flatnonzero(seen).astype(np.uint8)).decode()
+
+        # sort values: the columns themselves, epoch seconds for datetimes
+        self.sort_values: Dict[str, "np.ndarray"] = {}
+        for key in SORT_KEYS:
+            if key not in TIME_COLUMNS:
+                self.sort_values[key] = data[key]
+            elif epochs is not None:
+                self.sort_values[key] = epochs[key]
+            else:
+                codes, uniques = data[key]
+                self.sort_values[key] = np.array([_parse_time(v) for v in uniques], dtype=np.int64)[codes]
+
+        self.text = {
+            name: TextIndex(data[name][1])
+            for name in ("origin", "destination", "equipment_type")
+        }
+        self.geo = {name: GeoIndex(self.text[name].values) for name in ("origin", "destination")}
+        # encoded rows: every row, by position, when mapped from a snapshot; else an LRU
+        # filled as pages are served (encoding every row into each process's heap
+        # would cost more memory than the columns themselves)
+        self.rows = rows
+        self.row_cache: "OrderedDict[int, bytes]" = OrderedDict()
+        self.row_cache_size = ROW_CACHE_SIZE
+        self.row_cache_lock = threading.Lock()
+        self._lanes = lanes
+
+        if order is None:
+            order = {
+                key: _ascending(self.sort_values[key], self._null(key, self.sort_values[key]), data["load_id"][0])
+                for key in SORT_KEYS
+            }
+        self.order: Dict[Tuple[str, bool], "np.ndarray"] = {}
+        for key, asc in order.items():
+            self.order[key, False] = asc
+            self.order[key, True] = asc[::-1]
+
+    @staticmethod
+    def _null(key: str, values: Any) -> Any:
+        return np.isnan(values) if key in FLOAT_COLUMNS else values == INT_NULL
+
+    @classmethod
+    def from_csv(cls, path: str, previous: Optional["ColumnarLoadStore"] = None) -> "ColumnarLoadStore":
+        """Build the store from CSV.
+
+        With ``previous``, records whose digest is unchanged are gathered from
+        its columns and only new or changed records are parsed.
+        """
+        if np is None:
+            raise RuntimeError("the columnar backend requires numpy")
+        known: Dict[bytes, int] = {}
+        if previous is not None:
+            known = {d: i for i, d in enumerate(previous.digests.tolist())}
+        with open(path, newline="") as f:
+            header = f.readline()
+            columns = [c.strip() for c in next(csv.reader([header]))]
+            digests: List[bytes] = []
+            source: List[int] = []
+
+            def fresh():
+                # single streaming pass: hash every record, hand only unknown ones to the CSV reader
+                for digest, record in iter_records(f, header):
+                    digests.append(digest)
+                    src = known.get(digest, -1)
+                    source.append(src)
+                    if src < 0:
+                        yield record
+
+            raw: List[List[str]] = [[] for _ in columns]
+            for record in csv.reader(fresh()):
+                record = [v.strip() for v in record[:len(columns)]]
+                record += [""] * (len(columns) - len(record))
+                for col, v in zip(raw, record):
+                    col.append(v)
+
+        n = len(digests)
+        src_pos = np.array(source, dtype=np.int64)
+        reused = src_pos >= 0
+        raw[columns.index("load_id")] = [_norm_id(v) for v in raw[columns.index("load_id")]]
+
+        data: Dict[str, Any] = {}
+        for name, values in zip(columns, raw):
+            if name in FLOAT_COLUMNS:
+                col = np.empty(n, dtype=np.float64)
+                col[~reused] = _float_column(values)
+            elif name in INT_COLUMNS:
+                col = np.empty(n, dtype=np.int64)
+                col[~reused] = _int_column(values)
+            else:
+                col = np.empty(n, dtype=object)
+                col[~reused] = values
+            if reused.any():
+                col[reused] = previous.value(name, src_pos[reused])
+            data[name] = col
+
+        # Duplicate load_ids keep the first position and the last values, like dict assignment
+        last: Dict[str, int] = {}
+        for i, load_id in enumerate(data["load_id"].tolist()):
+            last[load_id] = i
+        take = np.fromiter(last.values(), dtype=np.int64, count=len(last))
+        del last
+
+        for name in columns:
+            col = data[name][take]
+            if col.dtype == object:
+                col = _dictionary(col.tolist())
+            data[name] = col
+        # V16 rather than S16: fixed-size bytes must keep their trailing NULs
+        return cls(columns, data, digests=np.frombuffer(b"".join(digests), dtype="V16")[take])
+
+    def arrays(self) -> Dict[str, "np.ndarray"]:
+        """Every array backing the store, by name (see snapshot.py)."""
+        out = {"digests": self.digests, "id_positions": self.id_positions}
+        for name in self.columns:
+            col = self.data[name]
+            if isinstance(col, tuple):
+                codes, uniques = col
+                out[name + ".codes"], out[name + ".offsets"], out[name + ".blob"] = codes, uniques.offsets, uniques.blob
+            else:
+                out[name] = col
+        out["load_id.keys"] = self.id_values.keys
+        for key in TIME_COLUMNS:
+            out["epoch." + key] = self.sort_values[key]
+        for key in SORT_KEYS:
+            out["order." + key] = self.order[key, False]
+        out["lanes.origin"], out["lanes.destination"], out["lanes.rpm"] = self.lanes()
+        rows = self.rows if isinstance(self.rows, StringTable) else self.encode_rows()
+        out["rows.offsets"], out["rows.blob"] = rows.offsets, rows.blob
+        return out
+
+    def encode_rows(self, chunk: int = 1 << 14) -> StringTable:
+        """Every row as encoded JSON, by position (the row table of a snapshot)."""
+        offsets = np.zeros(self.n + 1, dtype=np.uint64)
+        blob = bytearray()
+        for start in range(0, self.n, chunk):
+            stop = min(start + chunk, self.n)
+            lengths = []
+            for row in self._rows(np.arange(start, stop)):
+                encoded = dumps(row)
+                blob += encoded
+                lengths.append(len(encoded))
+            offsets[start + 1:stop + 1] = offsets[start] + np.cumsum(lengths, dtype=np.uint64)
+        return StringTable(offsets, np.frombuffer(blob, dtype=np.uint8))
+
+    @classmethod
+    def from_arrays(
+        cls, columns: List[str], arrays: Dict[str, "np.ndarray"], rows: Optional[FileStringTable] = None
+    ) -> "ColumnarLoadStore":
+        """Inverse of arrays(); the arrays are used as-is, so they may be memory-mapped.
+
+        ``rows`` stands in for the ``rows.*`` arrays when those are read from a file.
+        """
+        data: Dict[str, Any] = {}
+        for name in columns:
+            if name in arrays:
+                data[name] = arrays[name]
+            else:
+                keys = arrays["load_id.keys"] if name == "load_id" else None
+                uniques = StringTable(arrays[name + ".offsets"], arrays[name + ".blob"], keys)
+                data[name] = (arrays[name + ".codes"], uniques)
+        order = {key: arrays["order." + key] for key in SORT_KEYS}
+        lanes = (arrays["lanes.origin"], arrays["lanes.destination"], arrays["lanes.rpm"])
+        epochs = {key: arrays["epoch." + key] for key in TIME_COLUMNS}
+        if rows is None:
+            rows = StringTable(arrays["rows.offsets"], arrays["rows.blob"])
+        return cls(
+            columns, data, digests=arrays["digests"], order=order,
+            id_positions=arrays["id_positions"], lanes=lanes, epochs=epochs, rows=rows,
+        )
+
+    def value(self, name: str, positions: "np.ndarray") -> Any:
+        """Raw column values at ``positions`` (a list of strings for dictionary columns)."""
+        col = self.data[name]
+        if isinstance(col, tuple):
+            codes, uniques = col
+            return uniques.take(codes[positions])
+        return col[positions]
+
+    def __len__(self) -> int:
+        return self.n
+
+    def _rows(self, positions: "np.ndarray", fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        out: List[Dict[str, Any]] = [{} for _ in range(len(positions))]
+        for name in self.columns if fields is None else fields:
+            col = self.data[name]
+            if name in FLOAT_COLUMNS:
+                values = [None if v != v else v for v in col[positions].tolist()]
+            elif name in INT_COLUMNS:
+                values = [None if v == INT_NULL else v for v in col[positions].tolist()]
+            else:
+                codes, uniques = col
+                values = uniques.take(codes[positions])
+            for row, v in zip(out, values):
+                row[name] = v
+        return out
+
+    def get(self, load_id: str) -> Optional[Dict[str, Any]]:
+        code = int(self.id_values.find([_norm_id(load_id)])[0])
+        if code < 0:
+            return None
+        return self._rows(self.id_positions[code:code + 1])[0]
+
+    def exclusion(self, load_ids: Iterable[str]) -> Optional["np.ndarray"]:
+        """Availability bitmap (False for ``load_ids``), to pass as ``search(exclude=...)``; None if nothing is excluded."""
+        codes = self.id_values.find(sorted({_norm_id(i) for i in load_ids}))
+        codes = codes[codes >= 0]
+        if not len(codes):
+            return None
+        available = np.ones(self.n, dtype=bool)
+        available[self.id_positions[codes]] = False
+        return available
+
+    def known_ids(self, load_ids: Iterable[str]) -> List[str]:
+        """The ``load_ids`` that exist (already normalized, see ``_norm_id``)."""
+        ids = list(load_ids)
+        return [i for i, code in zip(ids, self.id_values.find(ids).tolist()) if code >= 0]
+
+    def similar_places(self, name: str, query: str, limit: int, min_score: float) -> List[Tuple[str, float, int]]:
+        """``(place, score, loads)`` of the ``name`` (origin/destination) values closest to ``query``."""
+        index = self.text[name]
+        codes, uniques = self.data[name]
+        matches = index.similar(query, limit, min_score)
+        counts = np.bincount(codes, minlength=len(uniques)) if matches else None
+        return [
+            (uniques[index.postings[vid][0]], score, int(counts[index.postings[vid]].sum()))
+            for vid, score in matches
+        ]
+
+    def lane_rates(self) -> Dict[Tuple[str, str], float]:
+        """Median loadboard rate per mile of every lane (see ``lane_key``)."""
+        origin, destination, rpm = self.lanes()
+        return dict(zip(zip(origin.tolist(), destination.tolist()), rpm.tolist()))
+
+    def lanes(self) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+        """Every lane's normalized origin, destination and median rate per mile, as arrays.
+
+        Computed once per CSV and stored in the snapshot, so workers mapping it
+        skip the full-column passes (and the heap they leave behind).
+        """
+        if self._lanes is None:
+            self._lanes = self._lane_medians()
+        return self._lanes
+
+    def _lane_medians(self) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+        rate = self.data["loadboard_rate"]
+        miles = self.data["miles"]
+        valid = ~np.isnan(rate) & (miles != INT_NULL) & (miles != 0)
+        # dictionary codes -> codes of the normalized lane endpoints
+        ends = {}
+        for name in ("origin", "destination"):
+            codes, uniques = self.data[name]
+            names, group = np.unique([lane_key(v, "")[0] for v in uniques], return_inverse=True)
+            ends[name] = (names, group.reshape(-1)[codes[valid]])
+        o_names, o = ends["origin"]
+        d_names, d = ends["destination"]
+        lanes = o.astype(np.int64) * len(d_names) + d
+        rpm = rate[valid] / miles[valid]
+        order = np.lexsort((rpm, lanes))
+        lanes, rpm = lanes[order], rpm[order]
+        keys, starts, counts = np.unique(lanes, return_index=True, return_counts=True)
+        medians = (rpm[starts + (counts - 1) // 2] + rpm[starts + counts // 2]) / 2
+        return o_names[keys // len(d_names)].astype(str), d_names[keys % len(d_names)].astype(str), medians
+
+    def _text_mask(self, name: str, needle: str, exact: bool = False) -> "np.ndarray":
+        index = self.text[name]
+        needle = needle.lower()
+        if exact:
+            codes = [c for vid, v in enumerate(index.values) if v == needle for c in index.postings[vid]]
+        else:
+            codes = [c for vid in index.match_values(needle) for c in index.postings[vid]]
+        return np.isin(self.data[name][0], codes)
+
+    def distances(self, name: str, near: Near) -> "np.ndarray":
+        """Per-row distance to the radius center, +inf outside the radius."""
+        index = self.text[name]
+        by_code = np.full(len(self.data[name][1]), np.inf)
+        for vid, d in self.geo[name].within(*near).items():
+            by_code[index.postings[vid]] = d
+        return by_code[self.data[name][0]]
+
+    def mask(
+        self,
+        origin: Optional[str] = None,
+        destination: Optional[str] = None,
+        equipment_type: Optional[str] = None,
+        max_weight: Optional[float] = None,
+        deadhead: Optional["np.ndarray"] = None,
+        destination_near: Optional[Near] = None,
+    ) -> Optional["np.ndarray"]:
+        """Boolean row mask for the filters, or None when nothing is filtered."""
+        masks = []
+        if equipment_type:
+            masks.append(self._text_mask("equipment_type", equipment_type, exact=True))
+        if origin:
+            masks.append(self._text_mask("origin", origin))
+        if destination:
+            masks.append(self._text_mask("destination", destination))
+        if max_weight is not None:
+            # NaN compares False, so loads without a weight are kept
+            masks.append(~(self.data["weight"] > max_weight))
+        if deadhead is not None:
+            masks.append(np.isfinite(deadhead))
+        if destination_near is not None:
+            masks.append(np.isfinite(self.distances("destination", destination_near)))
+        if not masks:
+            return None
+        return np.logical_and.reduce(masks)
+
+    def _key(self, key: str, pos: int) -> Tuple[bool, Any, str]:
+        value = self.sort_values[key][pos]
+        null = bool(self._null(key, value))
+        return (null, 0 if null else value, self.id_values[self.data["load_id"][0][pos]])
+
+    def _cursor_key(self, key: str, after: Tuple[Any, str]) -> Tuple[bool, Any, str]:
+        value, load_id = after
+        try:
+            if value is not None and key in TIME_COLUMNS:
+                value = _parse_time(value)
+                value = None if value == INT_NULL else value
+            if value is not None:
+                value = float(value) if key in FLOAT_COLUMNS else int(value)
+            return (value is None, 0 if value is None else value, _norm_id(load_id))
+        except (TypeError, ValueError, OverflowError, AttributeError) as e:
+            raise InvalidCursor(f"cursor value {value!r} does not fit {key}") from e
+
+    def select(
+        self,
+        origin: Optional[str] = None,
+        destination: Optional[str] = None,
+        equipment_type: Optional[str] = None,
+        max_weight: Optional[float] = None,
+        sort_by: str = DEFAULT_SORT,
+        descending: bool = False,
+        offset: int = 0,
+        limit: int = 50,
+        after: Optional[Tuple[Any, str]] = None,
+        origin_near: Optional[Near] = None,
+        destination_near: Optional[Near] = None,
+        exclude: Optional["np.ndarray"] = None,
+    ) -> Selection:
+        """The page of matches for the given filters and ordering.
+
+        ``after``, the radius filters and ``exclude`` behave as in LoadIndex.select.
+        """
+        laps = Laps()
+        deadhead = None
+        if origin_near is not None:
+            deadhead = self.distances("origin", origin_near)
+        mask = self.mask(origin, destination, equipment_type, max_weight, deadhead, destination_near)
+        if exclude is not None:
+            mask = exclude if mask is None else mask & exclude
+        laps("filter")
+
+        if sort_by == DEADHEAD and deadhead is not None:
+            sel = np.flatnonzero(mask)
+            dist, ids = deadhead[sel], self.data["load_id"][0][sel]
+            count = len(sel)
+            if after is not None:
+                ad, aid = deadhead_target(after)
+                if descending:
+                    code = self.id_values.searchsorted(aid, side="left")
+                    keep = (dist < ad) | ((dist == ad) & (ids < code))
+                else:
+                    code = self.id_values.searchsorted(aid, side="right")
+                    keep = (dist > ad) | ((dist == ad) & (ids >= code))
+                sel, dist, ids = sel[keep], dist[keep], ids[keep]
+            order = np.lexsort((ids, dist))
+            if descending:
+                order = order[::-1]
+            page = sel[order[offset:offset + limit]]
+            laps("sort")
+            return Selection(count, page, deadhead[page].tolist())
+
+        key = sort_by if sort_by in SORT_KEYS else DEFAULT_SORT
+        order = self.order[key, descending]
+        if after is not None:
+            asc = self.order[key, False]
+            start = cursor_start(self.n, lambda i: self._key(key, asc[i]), self._cursor_key(key, after), descending)
+            order = order[start:]
+        if mask is None:
+            count, page = self.n, order[offset:offset + limit]
+        else:
+            count, page = int(mask.sum()), order[mask[order]][offset:offset + limit]
+        laps("sort")
+        return Selection(count, page, None if deadhead is None else deadhead[page].tolist())
+
+    def search(self, **query: Any) -> Tuple[int, List[Dict[str, Any]]]:
+        """Return ``(total_matches, page_rows)``; takes the arguments of ``select()``."""
+        sel = self.select(**query)
+        return sel.count, self.rows_of(sel)
+
+    def rows_of(self, sel: Selection, fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """The selected rows as dicts; with ``fields`` only those columns are materialized."""
+        with phase("paginate"):
+            names = [f for f in fields if f in self.data] if fields else None
+            rows = self._rows(np.asarray(sel.positions, dtype=np.int64), names)
+            if sel.deadhead is not None:
+                for row, d in zip(rows, sel.deadhead):
+                    row[DEADHEAD] = d
+            return project(rows, fields)
+
+    def _cached_rows(self, positions: List[int]) -> List[bytes]:
+        """Encoded rows at ``positions`` through the LRU, encoding the ones it lacks."""
+        cache = self.row_cache
+        found: Dict[int, Optional[bytes]] = {}
+        with self.row_cache_lock:
+            for p in positions:
+                blob = found[p] = cache.get(p)
+                if blob is not None:
+                    cache.move_to_end(p)
+        missing = [p for p, blob in found.items() if blob is None]
+        if missing:
+            encoded = [dumps(row) for row in self._rows(np.array(missing, dtype=np.int64))]
+            found.update(zip(missing, encoded))
+            if self.row_cache_size > 0:
+                with self.row_cache_lock:
+                    cache.update(zip(missing, encoded))
+                    while len(cache) > self.row_cache_size:
+                        cache.popitem(last=False)
+        return [found[p] for p in positions]
+
+    def rows_json(self, sel: Selection) -> List[bytes]:
+        """The selected rows as encoded JSON objects."""
+        with phase("paginate"):
+            positions = np.asarray(sel.positions, dtype=np.int64)
+            if self.rows is not None:
+                blobs = self.rows.take_bytes(positions)
+            else:
+                blobs = self._cached_rows(positions.tolist())
+            if sel.deadhead is not None:
+                blobs = [with_field(b, DEADHEAD, d) for b, d in zip(blobs, sel.deadhead)]
+            return blobs
@@ -0,0 +1,23 @@
+"""JSON encoding for responses: orjson when it is installed, the standard library otherwise."""
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional speedup, see requirements.txt
+    orjson = None
+
+def dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+def with_field(encoded: bytes, name: str, value: Any) -> bytes:
+    """Append ``name: value`` to an already encoded JSON object."""
+    return b"%s,%s:%s}" % (encoded[:-1], dumps(name), dumps(value))
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,126 @@
+import csv
+import math
+import os
+import re
+from typing import List, Dict, Optional, Iterable, Tuple
+
+GAZETTEER_PATH = os.environ.get(
+    "GAZETTEER_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "gazetteer.csv")
+)
+EARTH_RADIUS_MILES = 3958.8
+CELL_DEGREES = 1.0
+
+STATES = {
+    "alabama": "al", "alaska": "ak", "arizona": "az", "arkansas": "ar", "california": "ca",
+    "colorado": "co", "connecticut": "ct", "delaware": "de", "district of columbia": "dc",
+    "florida": "fl", "georgia": "ga", "hawaii": "hi", "idaho": "id", "illinois": "il",
+    "indiana": "in", "iowa": "ia", "kansas": "ks", "kentucky": "ky", "louisiana": "la",
+    "maine": "me", "maryland": "md", "massachusetts": "ma", "michigan": "mi", "minnesota": "mn",
+    "mississippi": "ms", "missouri": "mo", "montana": "mt", "nebraska": "ne", "nevada": "nv",
+    "new hampshire": "nh", "new jersey": "nj", "new mexico": "nm", "new york": "ny",
+    "north carolina": "nc", "north dakota": "nd", "ohio": "oh", "oklahoma": "ok", "oregon": "or",
+    "pennsylvania": "pa", "rhode island": "ri", "south carolina": "sc", "south dakota": "sd",
+    "tennessee": "tn", "texas": "tx", "utah": "ut", "vermont": "vt", "virginia": "va",
+    "washington": "wa", "west virginia": "wv", "wisconsin": "wi", "wyoming": "wy",
+}
+STATE_CODES = set(STATES.values())
+_ALIASES = {"saint": "st", "ft": "fort"}
+
+Point = Tuple[float, float]
+
+def _tokens(text: str) -> List[str]:
+    words = re.sub(r"[^a-z0-9 ]+", " ", (text or "").lower().replace(".", "")).split()
+    return [_ALIASES.get(w, w) for w in words]
+
+def parse_place(text: str) -> Tuple[str, Optional[str]]:
+    """Split "Chicago IL" / "chicago, illinois" into ("chicago", "il")."""
+    words = _tokens(text)
+    for size in (3, 2, 1):
+        if len(words) > size:
+            tail = " ".join(words[-size:])
+            code = tail if size == 1 and tail in STATE_CODES else STATES.get(tail)
+            if code:
+                return " ".join(words[:-size]), code
+    return " ".join(words), None
+
+def haversine_miles(a: Point, b: Point) -> float:
+    lat1, lon1, lat2, lon2 = map(math.radians, (a[0], a[1], b[0], b[1]))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * math.asin(math.sqrt(h))
+
+class Gazetteer:
+    """Offline city/state -> coordinates lookup.
+
+    Rows are expected largest city first, so a bare city name ("Dallas")
+    resolves to the first entry with that name.
+    """
+
+    def __init__(self, path: str = GAZETTEER_PATH):
+        self.places: Dict[Tuple[str, str], Point] = {}
+        self.cities: Dict[str, Point] = {}
+        with open(path, newline="") as f:
+            for row in csv.DictReader(f):
+                city = " ".join(_tokens(row["city"]))
+                point = (float(row["lat"]), float(row["lon"]))
+                self.places[city, row["state"].strip().lower()] = point
+                self.cities.setdefault(city, point)
+
+    def locate(self, text: str) -> Optional[Point]:
+        city, state = parse_place(text)
+        if state is None:
+            return self.cities.get(city)
+        return self.places.get((city, state))
+
+_GAZETTEER: Optional[Gazetteer] = None
+
+def gazetteer() -> Gazetteer:
+    global _GAZETTEER
+    if _GAZETTEER is None:
+        _GAZETTEER = Gazetteer()
+    return _GAZETTEER
+
+class GeoIndex:
+    """Grid index over the distinct places of one text column.
+
+    Places are bucketed into CELL_DEGREES cells; a radius query only measures
+    the places in the cells overlapping the query's bounding box, so it costs
+    O(places nearby) regardless of how many loads share them.
+    """
+
+    def __init__(self, values: Iterable[str], geo: Optional[Gazetteer] = None):
+        geo = geo or gazetteer()
+        self.points: Dict[int, Point] = {}
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+        for vid, value in enumerate(values):
+            point = geo.locate(value)
+            if point is not None:
+                self.points[vid] = point
+                self.cells.setdefault(self._cell(point), []).append(vid)
+
+    @staticmethod
+    def _cell(point: Point) -> Tuple[int, int]:
+        return (math.floor(point[0] / CELL_DEGREES), math.floor(point[1] / CELL_DEGREES))
+
+    def within(self, center: Point, radius_miles: float) -> Dict[int, float]:
+        """``{value_id: distance_miles}`` for places within the radius (distance rounded to 0.1)."""
+        dlat = radius_miles / 69.0
+        # a degree of longitude is shortest at the box's poleward edge: size the box there
+        poleward = min(89.9, abs(center[0]) + dlat)
+        dlon = radius_miles / (69.0 * math.cos(math.radians(poleward)))
+        lo = self._cell((center[0] - dlat, center[1] - dlon))
+        hi = self._cell((center[0] + dlat, center[1] + dlon))
+        columns = round(360 / CELL_DEGREES)
+        first = math.floor(-180 / CELL_DEGREES)
+        if hi[1] - lo[1] + 1 >= columns:
+            lons = range(first, first + columns)
+        else:
+            # wrap around the antimeridian
+            lons = sorted({(j - first) % columns + first for j in range(lo[1], hi[1] + 1)})
+        found: Dict[int, float] = {}
+        for i in range(lo[0], hi[0] + 1):
+            for j in lons:
+                for vid in self.cells.get((i, j), ()):
+                    d = haversine_miles(center, self.points[vid])
+                    if d <= radius_miles:
+                        found[vid] = round(d, 1)
+        return found
@@ -0,0 +1,72 @@
+import math
+import os
+from typing import Any, Dict, NamedTuple, Tuple
+
+from store import lane_key
+
+# Negotiation policy (mirrors the agent prompt: up to 10% off the loadboard rate,
+# three rounds, 100$ standard / 75$ minimum when a load has no rate)
+MAX_DISCOUNT = float(os.environ.get("QUOTE_MAX_DISCOUNT", "0.10"))
+MAX_ROUNDS = int(os.environ.get("QUOTE_MAX_ROUNDS", "3"))
+DEFAULT_PRICE = float(os.environ.get("QUOTE_DEFAULT_PRICE", "100"))
+DEFAULT_FLOOR = float(os.environ.get("QUOTE_DEFAULT_FLOOR", "75"))
+
+class PriceBand(NamedTuple):
+    floor: float
+    ceiling: float
+
+class PriceBook:
+    """Per-dataset pricing state: the median rate per mile of every lane.
+
+    A load's band is its loadboard rate (ceiling) down to the lower of the
+    allowed discount off that rate, or off the lane's market price when the
+    load is already priced below market (floor). Built once per generation, so
+    a quote round is a dict lookup and some arithmetic.
+    """
+
+    def __init__(self, lane_rpm: Dict[Tuple[str, str], float]):
+        self.lane_rpm = lane_rpm
+
+    @classmethod
+    def from_store(cls, store: Any) -> "PriceBook":
+        return cls(store.lane_rates())
+
+    def band(self, row: Dict[str, Any]) -> PriceBand:
+        rate = row.get("loadboard_rate")
+        if not rate or rate <= 0:
+            return PriceBand(DEFAULT_FLOOR, DEFAULT_PRICE)
+        floor = rate * (1 - MAX_DISCOUNT)
+        rpm = self.lane_rpm.get(lane_key(row.get("origin"), row.get("destination")))
+        miles = row.get("miles")
+        if rpm and miles:
+            # cheap for its lane: concede less than the full discount
+            floor = min(rate, max(floor, rpm * miles * (1 - MAX_DISCOUNT)))
+        return PriceBand(round(floor, 2), float(rate))
+
+    def quote(self, row: Dict[str, Any], ask: float, round_no: int) -> Dict[str, Any]:
+        """Answer the carrier's ask in negotiation round ``round_no`` (1-based).
+
+        Our acceptable price steps linearly from the ceiling to the floor over
+        MAX_ROUNDS rounds. An ask at or above it is accepted, anything lower
+        is countered with it (rounded up to whole dollars), and in the last
+        round an ask below the floor is rejected with the floor as final offer.
+        """
+        band = self.band(row)
+        round_no = min(round_no, MAX_ROUNDS)
+        offer = band.ceiling - (band.ceiling - band.floor) * round_no / MAX_ROUNDS
+        if ask >= offer:
+            decision, price = "accept", round(ask, 2)
+        elif round_no >= MAX_ROUNDS:
+            decision, price = "reject", band.floor
+        else:
+            decision, price = "counter", min(band.ceiling, float(math.ceil(offer)))
+        return {
+            "load_id": row.get("load_id"),
+            "round": round_no,
+            "max_rounds": MAX_ROUNDS,
+            "ask": ask,
+            "decision": decision,
+            "price": price,
+            "discount_rate": round(max(0.0, 100 * (1 - price / band.ceiling)), 2),
+            "final": decision != "counter" or round_no >= MAX_ROUNDS,
+        }
@@ -0,0 +1,190 @@
+"""Load reservations (hold / book / release) shared by all workers through SQLite.
+
+Every load that was ever reserved has one row with its state, holder, hold
+expiry and a version. Transitions are single compare-and-set UPDATEs guarded
+by the expected state (and, optionally, the version the caller last saw), so
+concurrent workers never double-book a load and nobody holds a lock across a
+request. A trigger bumps a global counter on every change and stamps the
+changed row with the new value; readers compare the counter to decide when to
+refresh their availability view, and then read only the rows stamped after
+the last value they applied. The counter is re-read at most every
+``poll_interval`` seconds, so a change made by another worker can take that
+long to show in listings; changes made through the same store show at once,
+and transitions themselves are always checked against the database.
+
+SQLite locking only works between processes on one machine, over a local
+file. Every worker that serves reservations must run on the same machine and
+share ``path``.
+
+Holds expire by time alone: a ``held`` row whose ``expires_at`` has passed is
+treated as available everywhere and is overwritten by the next transition.
+"""
+import math
+import sqlite3
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reservations (
+    load_id    TEXT PRIMARY KEY,
+    state      TEXT NOT NULL DEFAULT 'available',  -- available | held | booked
+    holder     TEXT,
+    expires_at REAL,                               -- holds only, epoch seconds
+    version    INTEGER NOT NULL DEFAULT 0,
+    changed    INTEGER NOT NULL DEFAULT 0          -- the 'changes' counter after its last transition
+);
+CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO counters VALUES ('changes', 0);
+"""
+# every transition bumps version (stamping the row does not fire it again)
+TRIGGER = """
+CREATE TRIGGER IF NOT EXISTS reservations_changed AFTER UPDATE OF version ON reservations
+BEGIN
+    UPDATE counters SET value = value + 1 WHERE name = 'changes';
+    UPDATE reservations SET changed = (SELECT value FROM counters WHERE name = 'changes')
+    WHERE load_id = NEW.load_id;
+END
+"""
+
+class Reservation(NamedTuple):
+    load_id: str
+    state: str
+    holder: Optional[str]
+    expires_at: Optional[float]
+    version: int
+
+class ReservationConflict(Exception):
+    def __init__(self, current: Reservation):
+        super().__init__(f"load {current.load_id} is {current.state}")
+        self.current = current
+
+class ReservationStore:
+    def __init__(self, path: str, poll_interval: float = 0.0):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.local = threading.local()
+        self._changes = (0, -math.inf)  # (counter, time.monotonic() it was read)
+        # the unavailable view: rows stamped up to ``_applied`` are in it
+        self._view_lock = threading.Lock()
+        self._applied = -1
+        self._booked: Set[str] = set()
+        self._held: Dict[str, float] = {}  # load_id -> expires_at
+        self._create_schema()
+
+    def _create_schema(self) -> None:
+        conn = self._conn()
+        conn.executescript(SCHEMA)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if "changed" not in {column[1] for column in conn.execute("PRAGMA table_info(reservations)")}:
+                # a file from before rows were stamped: its trigger only bumps the counter
+                conn.execute("ALTER TABLE reservations ADD COLUMN changed INTEGER NOT NULL DEFAULT 0")
+                conn.execute("DROP TRIGGER IF EXISTS reservations_changed")
+            conn.execute("CREATE INDEX IF NOT EXISTS reservations_by_change ON reservations (changed)")
+            conn.execute(TRIGGER)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+
+    def get(self, load_id: str, now: Optional[float] = None) -> Reservation:
+        now = time.time() if now is None else now
+        row = self._conn().execute(
+            "SELECT load_id, state, holder, expires_at, version FROM reservations WHERE load_id = ?", (load_id,)
+        ).fetchone()
+        if row is None:
+            return Reservation(load_id, "available", None, None, 0)
+        res = Reservation(*row)
+        if res.state == "held" and res.expires_at <= now:
+            return res._replace(state="available", holder=None, expires_at=None)
+        return res
+
+    def _transition(self, load_id: str, assignments: str, guard: str, params: Tuple, version: Optional[int]) -> Reservation:
+        conn = self._conn()
+        conn.execute("INSERT OR IGNORE INTO reservations (load_id) VALUES (?)", (load_id,))
+        sql = f"UPDATE reservations SET {assignments}, version = version + 1 WHERE ({guard}) AND load_id = ?"
+        args = params + (load_id,)
+        if version is not None:
+            sql += " AND version = ?"
+            args += (version,)
+        updated = conn.execute(sql + " RETURNING load_id, state, holder, expires_at, version", args).fetchone()
+        if updated is None:
+            raise ReservationConflict(self.get(load_id))
+        self._changes = (self._changes[0], -math.inf)  # this process sees its own change at once
+        return Reservation(*updated)
+
+    def hold(self, load_id: str, holder: str, ttl: float, version: Optional[int] = None) -> Reservation:
+        """Hold (or extend the caller's own hold on) an available load for ``ttl`` seconds."""
+        now = time.time()
+        return self._transition(
+            load_id,
+            "state = 'held', holder = ?, expires_at = ?",
+            "state = 'available' OR (state = 'held' AND (holder = ? OR expires_at <= ?))",
+            (holder, now + ttl, holder, now),
+            version,
+        )
+
+    def book(self, load_id: str, holder: str, version: Optional[int] = None) -> Reservation:
+        """Book a load that is available or held by ``holder``."""
+        now = time.time()
+        return self._transition(
+            load_id,
+            "state = 'booked', holder = ?, expires_at = NULL",
+            "state = 'available' OR (state = 'held' AND (holder = ? OR expires_at <= ?))",
+            (holder, holder, now),
+            version,
+        )
+
+    def release(self, load_id: str, holder: str, version: Optional[int] = None) -> Reservation:
+        """Give back a hold or booking owned by ``holder``."""
+        return self._transition(
+            load_id,
+            "state = 'available', holder = NULL, expires_at = NULL",
+            "state IN ('held', 'booked') AND holder = ?",
+            (holder,),
+            version,
+        )
+
+    def changes(self) -> int:
+        """Global change counter, read from the database at most every ``poll_interval`` seconds."""
+        value, read_at = self._changes
+        now = time.monotonic()
+        if now - read_at >= self.poll_interval:
+            value = self._conn().execute("SELECT value FROM counters WHERE name = 'changes'").fetchone()[0]
+            self._changes = (value, now)
+        return value
+
+    def unavailable(self, now: Optional[float] = None) -> Tuple[List[str], float]:
+        """Ids of booked and actively held loads, and when the next of those holds expires.
+
+        The ids are kept in memory. Each call reads only the rows that changed
+        since the last one (the first reads them all), so its cost follows the
+        changes, not the size of the table.
+        """
+        now = time.time() if now is None else now
+        with self._view_lock:
+            rows = self._conn().execute(
+                "SELECT load_id, state, expires_at, changed FROM reservations WHERE changed > ?", (self._applied,)
+            ).fetchall()
+            for load_id, state, expires_at, changed in rows:
+                self._booked.discard(load_id)
+                self._held.pop(load_id, None)
+                if state == "booked":
+                    self._booked.add(load_id)
+                elif state == "held":
+                    self._held[load_id] = expires_at
+                self._applied = max(self._applied, changed)
+            # an expired hold is available; taking it again is a change like any other
+            for load_id in [i for i, expires_at in self._held.items() if expires_at <= now]:
+                del self._held[load_id]
+            return [*self._booked, *self._held], min(self._held.values(), default=math.inf)
@@ -0,0 +1,80 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, NamedTuple, Optional
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: str
+
+def make_etag(body: bytes) -> str:
+    return '"%s"' % hashlib.blake2b(body, digest_size=12).hexdigest()
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+class ResponseCache:
+    """LRU of pre-serialized JSON bodies, bounded by entry count and total bytes.
+
+    Entries belong to one dataset generation: the first lookup for a newer
+    generation drops everything, so a reload invalidates the cache as a whole.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 << 20):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.generation: Any = None
+        self.entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def _check_generation(self, generation: Any) -> None:
+        if generation != self.generation:
+            self.generation = generation
+            self.entries.clear()
+            self.size = 0
+
+    def get(self, generation: Any, key: Hashable) -> Optional[CachedResponse]:
+        with self.lock:
+            self._check_generation(generation)
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, generation: Any, key: Hashable, body: bytes) -> CachedResponse:
+        entry = CachedResponse(body, make_etag(body))
+        if self.max_entries <= 0 or len(body) > self.max_bytes:
+            return entry
+        with self.lock:
+            self._check_generation(generation)
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old.body)
+            self.entries[key] = entry
+            self.size += len(body)
+            while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted.body)
+        return entry
+
+    def get_or_build(self, generation: Any, key: Hashable, build: Callable[[], bytes]) -> CachedResponse:
+        entry = self.get(generation, key)
+        if entry is None:
+            entry = self.put(generation, key, build())
+        return entry
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {"entries": len(self.entries), "bytes": self.size, "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,104 @@
+"""Compiled binary snapshot of the columnar loads store.
+
+Layout of a snapshot file::
+
+    MAGIC | u64 header length | JSON header | arrays, each 64-byte aligned
+
+The header records the SHA-256 of the source CSV, the column list and the
+dtype/shape/offset of every array. Reading maps the file and wraps the arrays
+in place, so startup cost no longer depends on the CSV size and every process
+mapping the same file shares its pages: uvicorn workers hold one copy of the
+data between them, and only one of them parses a changed CSV.
+
+Besides the columns, indexes and lane medians, the snapshot holds every row
+encoded as JSON (``rows.offsets`` / ``rows.blob``), so workers serve pages from
+the page cache they share instead of each encoding rows into its own heap.
+
+Pre-build one (e.g. in the Docker image)::
+
+    python snapshot.py data/loads.csv data/loads.snap
+"""
+import argparse
+import logging
+import os
+from typing import Dict, Optional
+
+from carrier_common.snapshots import build_lock, csv_checksum, pad, read_header, write_sections
+from columnar import ColumnarLoadStore, FileStringTable, np
+
+MAGIC = b"CLSNAP1\n"
+FORMAT_VERSION = 5
+ALIGN = 64
+
+log = logging.getLogger("carrier_loads")
+
+def write_snapshot(store: ColumnarLoadStore, path: str, checksum: str) -> None:
+    """Write ``store`` to ``path`` atomically (temp file + rename)."""
+    arrays = {name: np.ascontiguousarray(a) for name, a in store.arrays().items()}
+    meta: Dict[str, Dict] = {}
+    offset = 0
+    for name, a in arrays.items():
+        meta[name] = {"dtype": a.dtype.str, "shape": list(a.shape), "offset": offset}
+        offset += a.nbytes + pad(a.nbytes, ALIGN)
+    header = {"version": FORMAT_VERSION, "checksum": checksum, "columns": store.columns, "arrays": meta}
+    # contiguous: written from the arrays' buffers, not copies
+    write_sections(path, MAGIC, header, [a.data for a in arrays.values()], ALIGN)
+
+def read_snapshot(path: str, checksum: Optional[str] = None) -> Optional[ColumnarLoadStore]:
+    """Map a snapshot read-only; None if it is missing, unreadable or stale."""
+    try:
+        f = open(path, "rb")
+    except OSError:
+        return None
+    found = read_header(f, MAGIC, FORMAT_VERSION, checksum)
+    if found is None:
+        f.close()
+        return None
+    header, base = found
+    meta = header["arrays"]
+    buf = np.memmap(f, mode="r", dtype=np.uint8)
+    arrays = {
+        name: np.ndarray(tuple(m["shape"]), dtype=np.dtype(m["dtype"]), buffer=buf, offset=base + m["offset"])
+        for name, m in meta.items() if name != "rows.blob"
+    }
+    # the encoded rows are read, not mapped: pages touch a few rows each, at random
+    rows = FileStringTable(arrays["rows.offsets"], f, base + meta["rows.blob"]["offset"])
+    return ColumnarLoadStore.from_arrays(header["columns"], arrays, rows=rows)
+
+def load_or_build(
+    csv_path: str, snapshot_path: str, previous: Optional[ColumnarLoadStore] = None
+) -> ColumnarLoadStore:
+    """Map the snapshot if it matches the CSV checksum, else parse and rewrite it.
+
+    With several workers (at startup or on a hot reload) one parses while
+    the others wait on the lock, then they all map the file it wrote.
+    """
+    checksum = csv_checksum(csv_path)
+    store = read_snapshot(snapshot_path, checksum)
+    if store is not None:
+        return store
+    with build_lock(snapshot_path):
+        store = read_snapshot(snapshot_path, checksum)
+        if store is not None:
+            return store
+        store = ColumnarLoadStore.from_csv(csv_path, previous=previous)
+        try:
+            write_snapshot(store, snapshot_path, checksum)
+        except OSError:
+            # read-only filesystem etc.: serve from memory, retry on the next build
+            log.exception("could not write snapshot %s", snapshot_path)
+            return store
+    # map what was written, so this worker shares the pages with the others too
+    return read_snapshot(snapshot_path, checksum) or store
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pre-build the binary loads snapshot from a CSV file")
+    parser.add_argument("csv", nargs="?", default=os.environ.get("LOADS_PATH", "data/loads.csv"))
+    parser.add_argument("snapshot", nargs="?", default=os.environ.get("LOADS_SNAPSHOT", "data/loads.snap"))
+    args = parser.parse_args()
+    store = ColumnarLoadStore.from_csv(args.csv)
+    write_snapshot(store, args.snapshot, csv_checksum(args.csv))
+    print(f"wrote {args.snapshot}: {len(store)} loads")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,422 @@
+import csv
+import hashlib
+import heapq
+import statistics
+from bisect import bisect_left, bisect_right
+from itertools import islice
+from typing import List, Dict, Any, NamedTuple, Optional, Iterable, Iterator, Sequence, Set, Tuple
+
+from carrier_common.fuzzy import PhraseIndex
+from carrier_common.telemetry import Laps, phase
+from fastjson import dumps, with_field
+from geo import GeoIndex, Point
+
+SORT_KEYS = ("pickup_datetime", "delivery_datetime", "miles", "loadboard_rate")
+DEFAULT_SORT = "pickup_datetime"
+# query-dependent sort key, only valid with an origin radius
+DEADHEAD = "deadhead_miles"
+
+# (center, radius_miles) of a radius filter
+Near = Tuple[Point, float]
+
+class InvalidCursor(ValueError):
+    """A keyset cursor whose value cannot be compared with the sort key's values."""
+
+class Selection(NamedTuple):
+    """A page of search results as store positions; turned into rows by ``rows_of()`` / ``rows_json()``."""
+    count: int  # total matches
+    positions: Sequence[int]
+    deadhead: Optional[Sequence[float]]  # deadhead_miles per position, radius searches only
+
+    def sliced(self, start: int, stop: int) -> "Selection":
+        deadhead = None if self.deadhead is None else self.deadhead[start:stop]
+        return Selection(self.count, self.positions[start:stop], deadhead)
+
+def project(rows: List[Dict[str, Any]], fields: Optional[Sequence[str]]) -> List[Dict[str, Any]]:
+    return [{f: row.get(f) for f in fields} for row in rows] if fields else rows
+
+def _norm_id(x: str) -> str:
+    return (x or "").strip().upper()
+
+def _coerce(row: Dict[str, Any]) -> Dict[str, Any]:
+    # Trim whitespace
+    for k, v in list(row.items()):
+        if isinstance(v, str):
+            row[k] = v.strip()
+    # numeric coercion
+    try:
+        row["loadboard_rate"] = float(row["loadboard_rate"]) if row.get("loadboard_rate") else None
+    except Exception:
+        row["loadboard_rate"] = None
+    try:
+        row["weight"] = float(row["weight"]) if row.get("weight") else None
+    except Exception:
+        row["weight"] = None
+    try:
+        row["num_of_pieces"] = int(row["num_of_pieces"]) if row.get("num_of_pieces") else None
+    except Exception:
+        row["num_of_pieces"] = None
+    try:
+        row["miles"] = int(row["miles"]) if row.get("miles") else None
+    except Exception:
+        row["miles"] = None
+    # normalize id key to uppercase
+    row["load_id"] = _norm_id(row["load_id"])
+    return row
+
+def _records(lines: Iterable[str]) -> Iterator[str]:
+    """Yield raw CSV records, keeping newlines inside quoted fields in one record."""
+    pending = ""
+    for line in lines:
+        pending += line
+        if pending.count('"') % 2 == 0:
+            if pending.strip():
+                yield pending
+            pending = ""
+    if pending.strip():
+        yield pending
+
+def iter_records(lines: Iterable[str], header: str) -> Iterator[Tuple[bytes, str]]:
+    """Yield ``(digest, raw_record)`` pairs; digests are keyed by the header line,
+    so a changed header invalidates every row of the previous build."""
+    key = hashlib.blake2b(header.encode()).digest()
+    for record in _records(lines):
+        yield hashlib.blake2b(record.encode(), digest_size=16, key=key).digest(), record
+
+def load_rows(
+    path: str, previous: Optional[Dict[bytes, Dict[str, Any]]] = None
+) -> Tuple[Dict[str, Dict[str, Any]], Dict[bytes, Dict[str, Any]]]:
+    """Parse the CSV into the loads cache plus a ``digest -> row`` map.
+
+    Records whose digest is in ``previous`` reuse the already coerced row; only
+    new or changed records go through the CSV reader.
+    """
+    previous = previous or {}
+    cache: Dict[str, Dict[str, Any]] = {}
+    digests: Dict[bytes, Dict[str, Any]] = {}
+    with open(path, newline="") as f:
+        header = f.readline()
+        fieldnames = next(csv.reader([header]))
+        entries: List[Tuple[bytes, Optional[Dict[str, Any]]]] = []
+        fresh: List[str] = []
+        for digest, record in iter_records(f, header):
+            row = previous.get(digest)
+            if row is None:
+                fresh.append(record)
+            entries.append((digest, row))
+    parsed = csv.DictReader(fresh, fieldnames=fieldnames)
+    for digest, row in entries:
+        if row is None:
+            row = _coerce(next(parsed))
+        digests[digest] = row
+        cache[row["load_id"]] = row
+    return cache, digests
+
+def load_data(path: str) -> Dict[str, Dict[str, Any]]:
+    return load_rows(path)[0]
+
+def _sort_key(value: Any) -> Tuple[bool, Any]:
+    # Missing values sort last (first when descending), as in the original list sort
+    return (value is None, value)
+
+def cursor_start(n: int, key_at, target: Tuple[Any, ...], descending: bool) -> int:
+    """Index of the first row strictly after ``target`` in a presorted order.
+
+    ``key_at(i)`` is the total-order key of the i-th row in ascending order; the
+    descending order is its exact reverse.
+    """
+    try:
+        if descending:
+            return n - bisect_left(range(n), target, key=key_at)
+        return bisect_right(range(n), target, key=key_at)
+    except (TypeError, ValueError, OverflowError) as e:
+        raise InvalidCursor(f"cursor value {target[0]!r} does not fit the sort key") from e
+
+def deadhead_target(after: Tuple[Any, str]) -> Tuple[float, str]:
+    """``(distance, load_id)`` of a deadhead cursor."""
+    try:
+        return (float(after[0]), _norm_id(after[1]))
+    except (TypeError, ValueError, AttributeError) as e:
+        raise InvalidCursor(f"invalid deadhead cursor {after!r}") from e
+
+def lane_key(origin: Optional[str], destination: Optional[str]) -> Tuple[str, str]:
+    return ((origin or "").strip().lower(), (destination or "").strip().lower())
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+class TextIndex:
+    """Case-insensitive substring index over one text column.
+
+    Distinct values are indexed by trigram and each keeps a posting list of row
+    positions, so a query only verifies the values sharing all of its trigrams.
+    """
+
+    def __init__(self, values: Iterable[Optional[str]]):
+        self.values: List[str] = []
+        self.postings: List[List[int]] = []
+        self.grams: Dict[str, Set[int]] = {}
+        ids: Dict[str, int] = {}
+        for pos, value in enumerate(values):
+            value = (value or "").lower()
+            vid = ids.get(value)
+            if vid is None:
+                vid = ids[value] = len(self.values)
+                self.values.append(value)
+                self.postings.append([])
+                for gram in _trigrams(value):
+                    self.grams.setdefault(gram, set()).add(vid)
+            self.postings[vid].append(pos)
+        self._phrases: Optional[PhraseIndex] = None
+
+    def similar(self, query: str, limit: int, min_score: float) -> List[Tuple[int, float]]:
+        """``(value_id, score)`` of the values closest to a misspelled or misheard query."""
+        if self._phrases is None:  # built on first use; most queries never need it
+            self._phrases = PhraseIndex(self.values)
+        return self._phrases.search(query, limit, min_score)
+
+    def match_values(self, needle: str) -> List[int]:
+        needle = needle.lower()
+        grams = _trigrams(needle)
+        if grams:
+            sets = sorted((self.grams.get(g, set()) for g in grams), key=len)
+            candidates: Iterable[int] = sets[0].intersection(*sets[1:])
+        else:
+            # Needles shorter than a trigram: the distinct values are few, scan them
+            candidates = range(len(self.values))
+        return [vid for vid in candidates if needle in self.values[vid]]
+
+    def match(self, needle: str) -> Set[int]:
+        rows: Set[int] = set()
+        for vid in self.match_values(needle):
+            rows.update(self.postings[vid])
+        return rows
+
+class LoadIndex:
+    """Secondary indexes over the loads cache, built once per load.
+
+    - hash index on lowercased equipment_type
+    - trigram substring indexes on origin and destination
+    - presorted permutations (and their inverse ranks) for every sort key,
+      totally ordered by ``(value, load_id)``; descending is the exact reverse
+    - weight-sorted positions so ``max_weight`` is a prefix lookup
+    - grid indexes over the geocoded origin/destination places for radius search
+
+    Filters become posting-list intersections; a sorted page is then taken by
+    walking the presorted permutation (large match sets) or by a bounded heap
+    over the candidates' ranks (small match sets), never a full sort. Keyset
+    cursors resume with a binary search on the permutation.
+    """
+
+    def __init__(
+        self,
+        cache: Dict[str, Dict[str, Any]],
+        digests: Optional[Dict[bytes, Dict[str, Any]]] = None,
+        previous: Optional["LoadIndex"] = None,
+    ):
+        self.cache = cache
+        # kept for incremental reloads, see load_rows()
+        self.digests = digests or {}
+        self.rows: List[Dict[str, Any]] = list(cache.values())
+        self.columns: List[str] = list(self.rows[0]) if self.rows else []
+        self.positions: Dict[str, int] = {load_id: pos for pos, load_id in enumerate(cache)}
+        # characters load ids are made of, the alphabet of fuzzy id lookups
+        self.id_chars = "".join(sorted(set("".join(self.positions))))
+        n = len(self.rows)
+
+        # every row pre-encoded, so a page is a join of byte strings; load_rows() hands
+        # unchanged records back as the same dict, whose encoding is reused
+        reuse = {id(row): blob for row, blob in zip(previous.rows, previous.row_json)} if previous is not None else {}
+        self.row_json: List[bytes] = [reuse.get(id(row)) or dumps(row) for row in self.rows]
+
+        self.equipment: Dict[str, List[int]] = {}
+        for pos, row in enumerate(self.rows):
+            self.equipment.setdefault((row.get("equipment_type") or "").lower(), []).append(pos)
+        self.origin = TextIndex(row.get("origin") for row in self.rows)
+        self.destination = TextIndex(row.get("destination") for row in self.rows)
+        self.origin_geo = GeoIndex(self.origin.values)
+        self.destination_geo = GeoIndex(self.destination.values)
+
+        weighed = [p for p in range(n) if self.rows[p].get("weight") is not None]
+        weighed.sort(key=lambda p: self.rows[p]["weight"])
+        self.by_weight: List[int] = weighed
+        self.weights: List[float] = [self.rows[p]["weight"] for p in weighed]
+        self.unweighed: List[int] = [p for p in range(n) if self.rows[p].get("weight") is None]
+
+        self.order: Dict[Tuple[str, bool], List[int]] = {}
+        self.rank: Dict[Tuple[str, bool], List[int]] = {}
+        for key in SORT_KEYS:
+            order = sorted(range(n), key=lambda p: self._key(key, p))
+            rank = [0] * n
+            for r, p in enumerate(order):
+                rank[p] = r
+            self.order[key, False] = order
+            self.rank[key, False] = rank
+            self.order[key, True] = order[::-1]
+            self.rank[key, True] = [n - 1 - r for r in rank]
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def get(self, load_id: str) -> Optional[Dict[str, Any]]:
+        return self.cache.get(_norm_id(load_id))
+
+    def exclusion(self, load_ids: Iterable[str]) -> Optional[Set[int]]:
+        """Positions of ``load_ids``, to pass as ``search(exclude=...)``; None if there are none."""
+        found = {self.positions[i] for i in map(_norm_id, load_ids) if i in self.positions}
+        return found or None
+
+    def known_ids(self, load_ids: Iterable[str]) -> List[str]:
+        """The ``load_ids`` that exist (already normalized, see ``_norm_id``)."""
+        return [i for i in load_ids if i in self.positions]
+
+    def similar_places(self, name: str, query: str, limit: int, min_score: float) -> List[Tuple[str, float, int]]:
+        """``(place, score, loads)`` of the ``name`` (origin/destination) values closest to ``query``."""
+        index = getattr(self, name)
+        return [
+            (self.rows[index.postings[vid][0]][name], score, len(index.postings[vid]))
+            for vid, score in index.similar(query, limit, min_score)
+        ]
+
+    def lane_rates(self) -> Dict[Tuple[str, str], float]:
+        """Median loadboard rate per mile of every lane (see ``lane_key``)."""
+        per_lane: Dict[Tuple[str, str], List[float]] = {}
+        for row in self.rows:
+            rate, miles = row.get("loadboard_rate"), row.get("miles")
+            if rate is not None and miles:
+                per_lane.setdefault(lane_key(row.get("origin"), row.get("destination")), []).append(rate / miles)
+        return {lane: statistics.median(rpm) for lane, rpm in per_lane.items()}
+
+    def _key(self, key: str, pos: int) -> Tuple[Tuple[bool, Any], str]:
+        row = self.rows[pos]
+        return (_sort_key(row.get(key)), row["load_id"])
+
+    @staticmethod
+    def _near(text: TextIndex, geo: GeoIndex, near: Near) -> Dict[int, float]:
+        """``{position: distance}`` for rows whose place lies within the radius."""
+        return {p: d for vid, d in geo.within(*near).items() for p in text.postings[vid]}
+
+    def _candidates(
+        self,
+        origin: Optional[str],
+        destination: Optional[str],
+        equipment_type: Optional[str],
+        max_weight: Optional[float],
+        deadhead: Optional[Dict[int, float]] = None,
+        destination_near: Optional[Near] = None,
+    ) -> Optional[Set[int]]:
+        """Row positions matching every filter, or None when nothing is filtered."""
+        sets: List[Set[int]] = []
+        if equipment_type:
+            sets.append(set(self.equipment.get(equipment_type.lower(), ())))
+        if origin:
+            sets.append(self.origin.match(origin))
+        if destination:
+            sets.append(self.destination.match(destination))
+        if deadhead is not None:
+            sets.append(set(deadhead))
+        if destination_near is not None:
+            sets.append(set(self._near(self.destination, self.destination_geo, destination_near)))
+
+        if sets:
+            sets.sort(key=len)
+            cand = sets[0].intersection(*sets[1:])
+            if max_weight is not None:
+                cand = {p for p in cand if self.rows[p].get("weight") is None or self.rows[p]["weight"] <= max_weight}
+            return cand
+        if max_weight is not None:
+            cut = bisect_right(self.weights, max_weight)
+            return set(self.by_weight[:cut]).union(self.unweighed)
+        return None
+
+    def select(
+        self,
+        origin: Optional[str] = None,
+        destination: Optional[str] = None,
+        equipment_type: Optional[str] = None,
+        max_weight: Optional[float] = None,
+        sort_by: str = DEFAULT_SORT,
+        descending: bool = False,
+        offset: int = 0,
+        limit: int = 50,
+        after: Optional[Tuple[Any, str]] = None,
+        origin_near: Optional[Near] = None,
+        destination_near: Optional[Near] = None,
+        exclude: Optional[Set[int]] = None,
+    ) -> Selection:
+        """The page of matches for the given filters and ordering.
+
+        ``after`` is a keyset cursor ``(sort_value, load_id)``: the page starts
+        with the first match strictly after that row, ``offset`` matches later.
+        ``origin_near``/``destination_near`` keep loads whose pickup/drop lies
+        within the radius; with ``origin_near`` rows gain ``deadhead_miles``
+        and can be sorted by it. ``exclude`` (from ``exclusion()``) drops
+        those rows from the matches.
+        """
+        laps = Laps()
+        deadhead = None
+        if origin_near is not None:
+            deadhead = self._near(self.origin, self.origin_geo, origin_near)
+        cand = self._candidates(origin, destination, equipment_type, max_weight, deadhead, destination_near)
+        if exclude and cand is not None:
+            cand = cand.difference(exclude)
+        laps("filter")
+
+        if sort_by == DEADHEAD and deadhead is not None:
+            by_deadhead = lambda p: (deadhead[p], self.rows[p]["load_id"])
+            pool: Iterable[int] = cand
+            if after is not None:
+                target = deadhead_target(after)
+                pool = [p for p in cand if (by_deadhead(p) < target if descending else by_deadhead(p) > target)]
+            pick = heapq.nlargest if descending else heapq.nsmallest
+            page = pick(offset + limit, pool, key=by_deadhead)[offset:]
+            laps("sort")
+            return Selection(len(cand), page, [deadhead[p] for p in page])
+
+        key = sort_by if sort_by in SORT_KEYS else DEFAULT_SORT
+        order = self.order[key, descending]
+        start = 0
+        if after is not None:
+            asc = self.order[key, False]
+            try:
+                target = (_sort_key(after[0]), _norm_id(after[1]))
+            except AttributeError as e:
+                raise InvalidCursor(f"invalid cursor {after!r}") from e
+            start = cursor_start(len(asc), lambda i: self._key(key, asc[i]), target, descending)
+        if cand is None and exclude:
+            hits = (order[i] for i in range(start, len(order)) if order[i] not in exclude)
+            page = list(islice(hits, offset, offset + limit))
+        elif cand is None:
+            page = order[start + offset:start + offset + limit]
+        elif len(cand) * 4 >= len(order):
+            # Dense match: walking the permutation reaches the page in ~4x its size
+            hits = (order[i] for i in range(start, len(order)) if order[i] in cand)
+            page = list(islice(hits, offset, offset + limit))
+        else:
+            rank = self.rank[key, descending]
+            pool = cand if start == 0 else [p for p in cand if rank[p] >= start]
+            page = heapq.nsmallest(offset + limit, pool, key=rank.__getitem__)[offset:]
+        laps("sort")
+        count = len(order) - len(exclude or ()) if cand is None else len(cand)
+        return Selection(count, page, None if deadhead is None else [deadhead[p] for p in page])
+
+    def search(self, **query: Any) -> Tuple[int, List[Dict[str, Any]]]:
+        """Return ``(total_matches, page_rows)``; takes the arguments of ``select()``."""
+        sel = self.select(**query)
+        return sel.count, self.rows_of(sel)
+
+    def rows_of(self, sel: Selection, fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """The selected rows as dicts, optionally projected onto ``fields``."""
+        with phase("paginate"):
+            rows = [self.rows[p] for p in sel.positions]
+            if sel.deadhead is not None:
+                rows = [dict(row, deadhead_miles=d) for row, d in zip(rows, sel.deadhead)]
+            return project(rows, fields)
+
+    def rows_json(self, sel: Selection) -> List[bytes]:
+        """The selected rows as encoded JSON objects."""
+        with phase("paginate"):
+            blobs = [self.row_json[p] for p in sel.positions]
+            if sel.deadhead is not None:
+                blobs = [with_field(b, DEADHEAD, d) for b, d in zip(blobs, sel.deadhead)]
+            return blobs
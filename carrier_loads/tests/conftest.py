@@ -0,0 +1,33 @@
+import importlib
+import os
+import sys
+
+import pytest
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# the service modules import each other by their flat names (run pytest from any directory);
+# carrier_common is used from the checkout, installed or not
+sys.path[:0] = [SERVICE_DIR, os.path.join(os.path.dirname(SERVICE_DIR), "common")]
+
+@pytest.fixture
+def load_app(tmp_path, monkeypatch):
+    """Import a fresh ``app`` module serving ``csv_text`` with the given backend."""
+    def load(csv_text: str, backend: str = "index", **env: str):
+        path = tmp_path / "loads.csv"
+        path.write_text(csv_text, encoding="utf-8")
+        settings = {
+            "LOADS_PATH": str(path),
+            "LOADS_BACKEND": backend,
+            "LOADS_SNAPSHOT": "",
+            "RESERVATIONS_PATH": str(tmp_path / "reservations.db"),
+            "API_KEY": "test-key",
+            "RESPONSE_CACHE_SIZE": "0",
+            **env,
+        }
+        for name, value in settings.items():
+            monkeypatch.setenv(name, value)
+        sys.modules.pop("app", None)
+        return importlib.import_module("app")
+
+    yield load
+    sys.modules.pop("app", None)
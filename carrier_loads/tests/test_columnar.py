@@ -0,0 +1,75 @@
+import json
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from columnar import ColumnarLoadStore, StringTable
+from store import LoadIndex, Selection, load_rows
+
+HEADER = "load_id,origin,destination,pickup_datetime,delivery_datetime,equipment_type,loadboard_rate,notes,weight,commodity_type,num_of_pieces,miles,dimensions\n"
+
+MESSY = HEADER + "\n".join([
+    "L001,Chicago IL,Dallas TX,2025-09-28T08:00:00,2025-09-29T18:00:00,Van,2500,Fragile goods,20000,Electronics,500,925,48x40x60",
+    "l002 , Zürich ,Phoenix AZ,2024-05-01T08:00:00-05:00,tomorrow,Flatbed,,\"Tarps, straps\",,Steel,x,370,",
+    "L003,Chicago IL,Denver CO,,2025-09-29 18:00,Reefer,1800.5,,12000.25,Produce,,,",
+    "L004,Atlanta GA,Miami FL,2025-09-28T08:00:00+00:00,2025-09-28T08:00:00Z,Van,abc,日本語のメモ,1e3,Paper,12,600,",
+    "L002,Phoenix AZ,Chicago IL,2025-09-30T06:00:00,2025-10-01T06:00:00,Van,900,duplicate id keeps the last values,5000,Paper,1,450,",
+]) + "\n"
+
+@pytest.fixture
+def messy(tmp_path):
+    path = tmp_path / "loads.csv"
+    path.write_text(MESSY, encoding="utf-8")
+    return str(path)
+
+def test_rows_match_the_index_backend(messy):
+    index = LoadIndex(*load_rows(messy))
+    store = ColumnarLoadStore.from_csv(messy)
+    assert len(store) == len(index)
+    for load_id, row in index.cache.items():
+        assert json.dumps(store.get(load_id)) == json.dumps(row)
+
+def test_datetimes_are_returned_as_written(messy):
+    store = ColumnarLoadStore.from_csv(messy)
+    assert store.get("L002")["pickup_datetime"] == "2025-09-30T06:00:00"
+    assert store.get("L004")["delivery_datetime"] == "2025-09-28T08:00:00Z"
+    assert store.get("L003")["pickup_datetime"] == ""
+
+def test_datetimes_sort_by_instant(messy):
+    store = ColumnarLoadStore.from_csv(messy)
+    ids = store.value("load_id", store.order["pickup_datetime", False])
+    # L003's empty pickup sorts last; both 08:00 UTC pickups tie and fall back to load_id
+    assert ids == ["L001", "L004", "L002", "L003"]
+
+def test_incremental_reload_reuses_unchanged_rows(messy, tmp_path):
+    store = ColumnarLoadStore.from_csv(messy)
+    changed = tmp_path / "changed.csv"
+    changed.write_text(MESSY.replace("Fragile goods", "Handle with care"), encoding="utf-8")
+    reloaded = ColumnarLoadStore.from_csv(str(changed), previous=store)
+    assert reloaded.get("L001")["notes"] == "Handle with care"
+    assert reloaded.get("L004") == store.get("L004")
+
+def test_row_cache_is_bounded(messy):
+    store = ColumnarLoadStore.from_csv(messy)
+    store.row_cache_size = 2
+    everything = Selection(len(store), list(range(len(store))), None)
+    first = store.rows_json(everything)
+    assert [json.loads(b) for b in first] == store.rows_of(everything)
+    assert list(store.row_cache) == [len(store) - 2, len(store) - 1]
+    # served from the cache or encoded again, the bytes are the same
+    assert store.rows_json(everything) == first
+    assert list(store.row_cache) == [0, 1]
+    store.row_cache_size = 0
+    store.row_cache.clear()
+    assert store.rows_json(everything) == first and not store.row_cache
+
+def test_string_table_lookups():
+    values = sorted(["", "A", "AB", "ABCDEFGH", "ABCDEFGH1", "ABCDEFGH2", "Zürich", "日本"])
+    table = StringTable.from_strings(values)
+    assert list(table) == values
+    assert table.find(values + ["ABCDEFGH3", "B", "ABC"]).tolist() == list(range(len(values))) + [-1, -1, -1]
+    for i, v in enumerate(values):
+        assert table.searchsorted(v) == i
+        assert table.searchsorted(v, side="right") == i + 1
+    assert table.searchsorted("ABCDEFGH15") == values.index("ABCDEFGH2")
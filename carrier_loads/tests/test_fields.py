@@ -0,0 +1,68 @@
+import pytest
+
+pytest.importorskip("numpy")
+from fastapi.testclient import TestClient
+
+from test_pagination import CSV
+
+QUERIES = [
+    ("/loads", {}),
+    ("/loads", {"fields": "load_id,miles", "sort_by": "miles", "order": "desc"}),
+    ("/loads", {"shape": "columns", "page_size": 9}),
+    ("/loads/search", {"origin": "dallas", "fields": "load_id,loadboard_rate,weight", "shape": "columns"}),
+    ("/loads/search", {"origin": "Dallas TX", "origin_radius_miles": 40, "fields": "load_id,deadhead_miles"}),
+    ("/loads/search", {"origin": "Dallas TX", "origin_radius_miles": 40, "shape": "columns"}),
+    ("/loads/search", {"equipment_type": "flatbed", "shape": "columns"}),
+]
+
+@pytest.fixture(params=["index", "columnar"])
+def client(request, load_app):
+    return TestClient(load_app(CSV, request.param).app, headers={"X-API-Key": "test-key"})
+
+def _get(client, path, params):
+    response = client.get(path, params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def test_fields_project_every_row(client):
+    full = _get(client, "/loads", {"page_size": 20})["results"]
+    picked = _get(client, "/loads", {"page_size": 20, "fields": " miles, load_id ,miles,"})["results"]
+    assert [list(row) for row in picked] == [["miles", "load_id"]] * 20
+    assert picked == [{"miles": row["miles"], "load_id": row["load_id"]} for row in full]
+
+def test_deadhead_can_be_picked_on_radius_searches(client):
+    params = {"origin": "Dallas TX", "origin_radius_miles": 40}
+    full = _get(client, "/loads/search", params)["results"]
+    picked = _get(client, "/loads/search", dict(params, fields="deadhead_miles,load_id"))["results"]
+    assert full and picked == [{"deadhead_miles": r["deadhead_miles"], "load_id": r["load_id"]} for r in full]
+
+def test_unknown_fields_are_rejected(client):
+    response = client.get("/loads", params={"fields": "load_id,price,colour"})
+    assert response.status_code == 400 and response.json()["detail"] == "Unknown field(s): price, colour"
+    assert client.get("/loads/search", params={"fields": "nope"}).status_code == 400
+    assert client.get("/loads", params={"shape": "table"}).status_code == 422
+
+def test_columns_shape_transposes_the_page(client):
+    rows = _get(client, "/loads", {"page_size": 12})
+    columns = _get(client, "/loads", {"page_size": 12, "shape": "columns"})
+    assert {k: v for k, v in columns.items() if k != "results"} == {k: v for k, v in rows.items() if k != "results"}
+    assert list(columns["results"]) == list(rows["results"][0])
+    assert columns["results"] == {name: [row[name] for row in rows["results"]] for name in rows["results"][0]}
+    picked = _get(client, "/loads", {"page_size": 12, "shape": "columns", "fields": "loadboard_rate,load_id"})
+    assert picked["results"] == {name: columns["results"][name] for name in ("loadboard_rate", "load_id")}
+    # an empty page: named columns stay, with no values
+    empty = {"equipment_type": "flatbed", "shape": "columns"}
+    assert _get(client, "/loads/search", empty)["results"] == {}
+    assert _get(client, "/loads/search", dict(empty, fields="load_id,miles"))["results"] == {"load_id": [], "miles": []}
+
+def test_backends_answer_alike(load_app):
+    bodies = {}
+    for backend in ("index", "columnar"):
+        module = load_app(CSV, backend)
+        # the same data, written twice: cursors carry the file's stamp
+        module.DATASET = module.DATASET._replace(stamp=(0, len(CSV)))
+        client = TestClient(module.app, headers={"X-API-Key": "test-key"})
+        responses = [client.get(path, params=params) for path, params in QUERIES]
+        assert all(r.status_code == 200 for r in responses)
+        bodies[backend] = [r.content for r in responses]
+    assert bodies["index"] == bodies["columnar"]
@@ -0,0 +1,43 @@
+import csv
+
+import pytest
+
+from geo import GAZETTEER_PATH, Gazetteer, GeoIndex, haversine_miles
+
+with open(GAZETTEER_PATH, newline="") as f:
+    PLACES = [f"{row['city']} {row['state']}" for row in csv.DictReader(f)]
+
+@pytest.fixture(scope="module")
+def index():
+    return GeoIndex(PLACES)
+
+def brute_force(index, center, radius):
+    found = {}
+    for vid, point in index.points.items():
+        d = haversine_miles(center, point)
+        if d <= radius:
+            found[vid] = round(d, 1)
+    return found
+
+@pytest.mark.parametrize("center", ["Newark NJ", "Des Moines IA", "Albuquerque NM", "Las Cruces NM", "Anchorage AK", "Miami FL"])
+@pytest.mark.parametrize("radius", [25, 250, 1500, 3000])
+def test_within_matches_a_full_scan(index, center, radius):
+    point = Gazetteer().locate(center)
+    assert index.within(point, radius) == brute_force(index, point, radius)
+
+def test_distance_is_compared_before_rounding(tmp_path):
+    path = tmp_path / "gazetteer.csv"
+    # about 69.09 miles apart: inside a 69.1 mile radius once rounded, outside before
+    path.write_text("city,state,lat,lon\nA,TX,30.0,-97.0\nB,TX,31.0,-97.0\n")
+    index = GeoIndex(["A TX", "B TX"], Gazetteer(str(path)))
+    d = haversine_miles((30.0, -97.0), (31.0, -97.0))
+    assert round(d, 1) == 69.1 and d < 69.1
+    assert index.within((30.0, -97.0), 69.09) == {0: 0.0}
+    assert index.within((30.0, -97.0), 69.1) == {0: 0.0, 1: 69.1}
+
+def test_within_wraps_around_the_antimeridian(tmp_path):
+    path = tmp_path / "gazetteer.csv"
+    path.write_text("city,state,lat,lon\nEast,AK,52.0,179.5\nWest,AK,52.0,-179.5\n")
+    index = GeoIndex(["East AK", "West AK"], Gazetteer(str(path)))
+    assert set(index.within((52.0, 179.9), 100)) == {0, 1}
+    assert set(index.within((52.0, -179.9), 100)) == {0, 1}
@@ -0,0 +1,55 @@
+import pytest
+
+pytest.importorskip("numpy")
+from fastapi.testclient import TestClient
+
+HEADER = "load_id,origin,destination,pickup_datetime,delivery_datetime,equipment_type,loadboard_rate,notes,weight,commodity_type,num_of_pieces,miles,dimensions\n"
+CSV = HEADER + "".join(
+    f"{load_id},{origin},{destination},2025-10-01T08:00:00,2025-10-02T18:00:00,Van,1000,,,,,900,\n"
+    for load_id, origin, destination in [
+        ("L001", "Chicago IL", "Dallas TX"), ("L002", "Dallas TX", "Austin TX"),
+        ("L010", "Chicago IL", "Denver CO"), ("L552", "Fort Worth TX", "Chicago IL"),
+    ]
+)
+
+@pytest.fixture(params=["index", "columnar"])
+def lookup(request, load_app):
+    client = TestClient(load_app(CSV, request.param).app, headers={"X-API-Key": "test-key"})
+
+    def get(q, **params):
+        response = client.get("/loads/lookup", params=dict(params, q=q))
+        assert response.status_code == 200, response.text
+        body = response.json()
+        assert body["query"] == q
+        return body["candidates"]
+    get.client = client
+    return get
+
+def test_spoken_load_ids(lookup):
+    first, second = lookup("load number el zero zero one")
+    assert (first["field"], first["value"], first["score"]) == ("load_id", "L001", 1.0)
+    assert first["load"]["destination"] == "Dallas TX"
+    # one edit away from what was heard
+    assert (second["value"], second["score"]) == ("L002", 0.75)
+    assert [c["value"] for c in lookup("double five two", field="load_id")] == ["L552"]
+
+def test_places_with_typos(lookup):
+    found = lookup("chicago ill")
+    assert [(c["field"], c["value"], c["loads"]) for c in found] == [("origin", "Chicago IL", 2), ("destination", "Chicago IL", 1)]
+    assert found[0]["score"] == found[1]["score"] < 1
+    assert [c["value"] for c in lookup("dalas texas", field="destination")] == ["Dallas TX"]
+
+def test_limit_and_min_score(lookup):
+    assert [c["value"] for c in lookup("el zero zero one", limit=1)] == ["L001"]
+    assert [c["field"] for c in lookup("chicago ill", limit=1)] == ["origin"]
+    assert [c["value"] for c in lookup("el zero zero one", min_score=0.9)] == ["L001"]
+    assert lookup("chicago ill", min_score=0.99) == []
+
+def test_nothing_to_match(lookup):
+    for q in ("zzz", "   ", "load number", "?!"):
+        assert lookup(q) == [], q
+
+def test_invalid_parameters(lookup):
+    client = lookup.client
+    for params in ({}, {"q": ""}, {"q": "L001", "limit": 0}, {"q": "L001", "min_score": 2}, {"q": "L001", "field": "weight"}):
+        assert client.get("/loads/lookup", params=params).status_code == 422, params
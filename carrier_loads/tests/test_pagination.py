@@ -0,0 +1,134 @@
+import base64
+import csv
+import io
+import json
+import random
+
+import pytest
+
+pytest.importorskip("numpy")
+from fastapi.testclient import TestClient
+
+HEADER = ["load_id", "origin", "destination", "pickup_datetime", "delivery_datetime", "equipment_type",
+          "loadboard_rate", "notes", "weight", "commodity_type", "num_of_pieces", "miles", "dimensions"]
+PLACES = ["Dallas TX", "Fort Worth TX", "Plano TX", "Irving TX", "Houston TX", "Austin TX", "Chicago IL"]
+
+def _csv() -> str:
+    rnd = random.Random(7)
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(HEADER)
+    for i in range(1, 131):
+        # few distinct values, so every key has long runs of ties; some numbers are missing
+        day = rnd.randint(1, 6)
+        writer.writerow([
+            f"L{rnd.randint(0, 10 ** 6):07d}" if i % 9 else f"L{i:07d}",
+            rnd.choice(PLACES), rnd.choice(PLACES),
+            f"2025-10-0{day}T{rnd.choice(['06', '08'])}:00:00",
+            f"2025-10-0{day + 1}T18:00:00",
+            rnd.choice(["Van", "Reefer"]),
+            rnd.choice(["", "1200", "1500.5", "900"]),
+            "", rnd.choice(["", "20000"]), "Paper", "10",
+            rnd.choice(["", "250", "370", "925"]), "",
+        ])
+    return out.getvalue()
+
+CSV = _csv()
+
+@pytest.fixture(params=["index", "columnar"])
+def client(request, load_app):
+    module = load_app(CSV, request.param)
+    return TestClient(module.app, headers={"X-API-Key": "test-key"})
+
+def _baseline(key, descending, rows):
+    """The original implementation: one list sort, missing values last."""
+    rows = sorted(rows, key=lambda r: (r.get(key) is None, r.get(key)), reverse=descending)
+    return [r.get(key) for r in rows]
+
+def _walk(client, path, params, page_size=7):
+    seen, cursor = [], None
+    while True:
+        query = dict(params, page_size=page_size, **({"cursor": cursor} if cursor else {}))
+        body = client.get(path, params=query).json()
+        seen += body["results"]
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return seen, body["count"]
+
+@pytest.mark.parametrize("sort_by", ["pickup_datetime", "delivery_datetime", "miles", "loadboard_rate"])
+@pytest.mark.parametrize("order", ["asc", "desc"])
+def test_cursor_walk_follows_the_baseline_order(client, sort_by, order):
+    everything = client.get("/loads", params={"page_size": 500}).json()["results"]
+    rows, count = _walk(client, "/loads", {"sort_by": sort_by, "order": order})
+    assert count == len(everything) == len(rows)
+    assert sorted(r["load_id"] for r in rows) == sorted(r["load_id"] for r in everything)
+    assert [r[sort_by] for r in rows] == _baseline(sort_by, order == "desc", everything)
+    # the cursor walk and page numbers see the same order
+    pages = [client.get("/loads", params={"sort_by": sort_by, "order": order, "page": p, "page_size": 7}).json()["results"]
+             for p in range(1, len(rows) // 7 + 2)]
+    assert [r["load_id"] for page in pages for r in page] == [r["load_id"] for r in rows]
+
+@pytest.mark.parametrize("order", ["asc", "desc"])
+def test_cursor_walk_with_filters_and_deadhead(client, order):
+    params = {"origin": "Dallas TX", "origin_radius_miles": 60, "equipment_type": "van", "order": order}
+    everything = client.get("/loads/search", params=dict(params, page_size=500)).json()["results"]
+    rows, count = _walk(client, "/loads/search", params, page_size=3)
+    assert count == len(rows) == len(everything) > 3
+    assert sorted(r["load_id"] for r in rows) == sorted(r["load_id"] for r in everything)
+    distances = [r["deadhead_miles"] for r in rows]
+    assert distances == sorted(distances, reverse=order == "desc")
+
+def _cursor(client, path, params):
+    cursor = client.get(path, params=dict(params, page_size=5)).json()["next_cursor"]
+    assert cursor
+    return cursor
+
+def _forge(*fields):
+    return base64.urlsafe_b64encode(json.dumps(list(fields)).encode()).decode().rstrip("=")
+
+@pytest.mark.parametrize("changed", [
+    {"sort_by": "miles"},
+    {"order": "desc"},
+    {"origin": "Houston"},
+])
+def test_cursor_from_another_query_is_rejected(client, changed):
+    params = {"origin": "Dallas", "sort_by": "loadboard_rate", "order": "asc"}
+    cursor = _cursor(client, "/loads/search", params)
+    response = client.get("/loads/search", params=dict(params, **changed, cursor=cursor))
+    assert response.status_code == 400
+    assert client.get("/loads/search", params=dict(params, cursor=cursor)).status_code == 200
+
+def test_deadhead_cursor_needs_the_radius(client):
+    params = {"origin": "Dallas TX", "origin_radius_miles": 60}
+    cursor = _cursor(client, "/loads/search", params)
+    response = client.get("/loads/search", params={"origin": "Dallas TX", "cursor": cursor})
+    assert response.status_code == 400
+
+def test_forged_cursors_get_400(client):
+    scope, version = json.loads(base64.urlsafe_b64decode(_cursor(client, "/loads", {}) + "=="))[4:]
+    for cursor in [
+        "not-base64!",
+        _forge("pickup_datetime", False, 1.5, "L0000001", scope, version),  # number on a datetime key
+        _forge("miles", False, "far", "L0000001", scope, version),
+        _forge("miles", False, True, "L0000001", scope, version),
+        _forge("miles", "no", 10, "L0000001", scope, version),
+        _forge("miles", False, 10, 42, scope, version),
+        _forge("miles", False, 10, "L0000001", scope),
+        _forge("miles", False, 10, "L0000001", scope, 7),
+        _forge("deadhead_miles", False, None, "L0000001", scope, version),
+        _forge("weight", False, 10, "L0000001", scope, version),
+    ]:
+        assert client.get("/loads", params={"sort_by": "miles", "cursor": cursor}).status_code == 400, cursor
+    # a huge (but finite) number is still just a position
+    cursor = _forge("miles", False, 1e300, "L0000001", scope, version)
+    body = client.get("/loads", params={"sort_by": "miles", "cursor": cursor}).json()
+    assert all(r["miles"] is None for r in body["results"])
+
+def test_store_level_cursor_errors_are_invalid_cursor(load_app):
+    from store import InvalidCursor
+    for backend in ("index", "columnar"):
+        store = load_app(CSV, backend).DATASET.store
+        with pytest.raises(InvalidCursor):
+            store.select(sort_by="pickup_datetime", after=(1.5, "L0000001"))
+        with pytest.raises(InvalidCursor):
+            store.select(sort_by="miles", after=("far", "L0000001"))
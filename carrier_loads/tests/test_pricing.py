@@ -0,0 +1,66 @@
+import pytest
+
+pytest.importorskip("numpy")
+from fastapi.testclient import TestClient
+
+import pricing
+
+HEADER = "load_id,origin,destination,pickup_datetime,delivery_datetime,equipment_type,loadboard_rate,notes,weight,commodity_type,num_of_pieces,miles,dimensions\n"
+# Chicago -> Dallas runs at 2.3, 2.4 and 4.0 $/mile: a median of 2.4, 1200 $ for 500 miles
+CSV = HEADER + "".join([
+    "CHEAP,Chicago IL,Dallas TX,2025-10-01T08:00:00,2025-10-02T18:00:00,Van,1150,,,,,500,\n",
+    "MID,Chicago IL,Dallas TX,2025-10-01T08:00:00,2025-10-02T18:00:00,Van,1200,,,,,500,\n",
+    "DEAR,Chicago IL,Dallas TX,2025-10-01T08:00:00,2025-10-02T18:00:00,Van,2000,,,,,500,\n",
+    "NORATE,Austin TX,Houston TX,2025-10-01T08:00:00,2025-10-02T18:00:00,Van,,,,,,160,\n",
+])
+
+@pytest.fixture(params=["index", "columnar"])
+def quote(request, load_app):
+    client = TestClient(load_app(CSV, request.param).app, headers={"X-API-Key": "test-key"})
+
+    def ask(load_id, price, round_no=1):
+        response = client.post(f"/loads/{load_id}/quote", json={"ask": price, "round": round_no})
+        assert response.status_code == 200, response.text
+        return response.json()
+    ask.client = client
+    return ask
+
+def test_asks_at_or_above_the_offer_are_accepted(quote):
+    # 2000 $ down to a 1800 $ floor: 1933.33 in round 1, 1866.67 in round 2
+    assert quote("DEAR", 2100)["decision"] == "accept" and quote("DEAR", 2100)["price"] == 2100
+    answer = quote("DEAR", 1933.34)
+    assert answer["decision"] == "accept" and answer["final"] and answer["discount_rate"] == 3.33
+    assert quote("DEAR", 1866.67, 2)["decision"] == "accept"
+
+def test_counters_step_down_to_the_floor(quote):
+    answers = [quote("DEAR", 1700, r) for r in range(1, pricing.MAX_ROUNDS + 1)]
+    assert [(a["decision"], a["price"], a["final"]) for a in answers] == [
+        ("counter", 1934.0, False), ("counter", 1867.0, False), ("reject", 1800.0, True),
+    ]
+    assert [a["round"] for a in answers] == [1, 2, 3] and all(a["max_rounds"] == pricing.MAX_ROUNDS for a in answers)
+    assert answers[-1]["discount_rate"] == 10.0
+    # the floor itself is still accepted in the last round; later rounds count as the last
+    assert quote("DEAR", 1800, pricing.MAX_ROUNDS)["decision"] == "accept"
+    late = quote("DEAR", 1799, pricing.MAX_ROUNDS + 2)
+    assert (late["round"], late["decision"], late["price"]) == (pricing.MAX_ROUNDS, "reject", 1800.0)
+
+def test_lane_price_raises_the_floor_of_a_cheap_load(quote):
+    # 10% off 1150 would be 1035; 10% off the lane's 1200 is 1080
+    assert quote("CHEAP", 1079, pricing.MAX_ROUNDS)["price"] == 1080.0
+    assert quote("CHEAP", 1079, pricing.MAX_ROUNDS)["decision"] == "reject"
+    assert quote("CHEAP", 1080, pricing.MAX_ROUNDS)["decision"] == "accept"
+    # priced at the lane median, the usual discount applies
+    assert quote("MID", 1080, pricing.MAX_ROUNDS)["decision"] == "accept"
+
+def test_loads_without_a_rate_use_the_default_band(quote):
+    first = quote("NORATE", 90)
+    assert (first["decision"], first["price"]) == ("counter", 92.0)
+    last = quote("NORATE", 74, pricing.MAX_ROUNDS)
+    assert (last["decision"], last["price"], last["discount_rate"]) == ("reject", pricing.DEFAULT_FLOOR, 25.0)
+    assert quote("NORATE", pricing.DEFAULT_PRICE)["decision"] == "accept"
+
+def test_unknown_loads_and_bad_asks(quote):
+    client = quote.client
+    assert client.post("/loads/NOPE/quote", json={"ask": 1000}).status_code == 404
+    assert client.post("/loads/DEAR/quote", json={"ask": 0}).status_code == 422
+    assert client.post("/loads/DEAR/quote", json={"ask": 1000, "round": 0}).status_code == 422
@@ -0,0 +1,61 @@
+import os
+import time
+
+import pytest
+
+pytest.importorskip("numpy")
+from fastapi.testclient import TestClient
+
+HEADER = "load_id,origin,destination,pickup_datetime,delivery_datetime,equipment_type,loadboard_rate,notes,weight,commodity_type,num_of_pieces,miles,dimensions\n"
+
+def _csv(rates):
+    return HEADER + "".join(
+        f"{load_id},Dallas TX,Austin TX,2025-10-01T08:00:00,2025-10-02T18:00:00,Van,{rate},,,,,200,\n"
+        for load_id, rate in rates.items()
+    )
+
+OLD = {f"L{i:03d}": 1000 + i for i in range(1, 6)}
+NEW = dict(OLD, L003=1500, L006=900)
+
+@pytest.fixture(params=["index", "columnar"])
+def served(request, load_app):
+    # the cache is on, so a reload must also retire cached pages
+    module = load_app(_csv(OLD), request.param, LOADS_RELOAD_INTERVAL="0.05", RESPONSE_CACHE_SIZE="100")
+    with TestClient(module.app, headers={"X-API-Key": "test-key"}) as client:  # starts the reload watcher
+        yield module, client
+
+def _rates(client, **params):
+    body = client.get("/loads", params=dict(params, sort_by="loadboard_rate", page_size=2)).json()
+    return {row["load_id"]: row["loadboard_rate"] for row in body["results"]}, body["next_cursor"]
+
+def test_reload_serves_the_new_file(served):
+    module, client = served
+    assert client.get("/health").json()["generation"] == 1
+    first, cursor = _rates(client)
+    assert first == {"L001": 1001.0, "L002": 1002.0}
+    assert _rates(client, cursor=cursor)[0] == {"L003": 1003.0, "L004": 1004.0}
+    # nothing changed: nothing is rebuilt
+    assert module.reload_dataset() is False
+
+    # replaced the way the README asks, with a rename
+    path = module.DATA_PATH
+    with open(path + ".new", "w", encoding="utf-8") as f:
+        f.write(_csv(NEW))
+    os.replace(path + ".new", path)
+    deadline = time.monotonic() + 5
+    while client.get("/health").json()["generation"] == 1:
+        assert time.monotonic() < deadline, "the watcher did not reload the file"
+        time.sleep(0.02)
+
+    health = client.get("/health").json()
+    assert health["generation"] == 2 and health["records"] == 6
+    assert _rates(client)[0] == {"L006": 900.0, "L001": 1001.0}
+    top = client.get("/loads/search", params={"origin": "dallas", "sort_by": "loadboard_rate", "order": "desc", "page_size": 1})
+    assert top.json()["results"][0]["load_id"] == "L003"
+    # a cursor from the first generation would resume in a different ordering
+    response = client.get("/loads", params={"sort_by": "loadboard_rate", "page_size": 2, "cursor": cursor})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Cursor is from before the loads were reloaded: start again from page 1"
+    # cursors of the new generation work
+    _, cursor = _rates(client)
+    assert _rates(client, cursor=cursor)[0] == {"L002": 1002.0, "L004": 1004.0}
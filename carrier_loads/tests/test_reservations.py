@@ -0,0 +1,165 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from reservations import ReservationConflict, ReservationStore
+
+WORKERS = 16
+
+def race(path, action):
+    """Run ``action(store, i)`` in WORKERS threads at once, each with its own store
+    (and so its own SQLite connection, like separate uvicorn workers)."""
+    stores = [ReservationStore(str(path)) for _ in range(WORKERS)]
+    barrier = threading.Barrier(WORKERS)
+    won, lost = [], []
+
+    def run(i):
+        barrier.wait()
+        try:
+            won.append(action(stores[i], i))
+        except ReservationConflict as e:
+            lost.append(e.current)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(WORKERS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return won, lost
+
+def test_one_of_many_concurrent_holds_wins(tmp_path):
+    path = tmp_path / "reservations.db"
+    won, lost = race(path, lambda store, i: store.hold("L1", f"MC{i}", 300))
+    assert len(won) == 1 and len(lost) == WORKERS - 1
+    winner = won[0]
+    assert winner.state == "held" and winner.version == 1
+    # the losers were told who holds it
+    assert {res.holder for res in lost} == {winner.holder}
+    assert ReservationStore(str(path)).get("L1") == winner
+
+def test_one_of_many_concurrent_bookings_wins(tmp_path):
+    path = tmp_path / "reservations.db"
+    won, lost = race(path, lambda store, i: store.book("L1", f"MC{i}"))
+    assert len(won) == 1 and len(lost) == WORKERS - 1
+    assert ReservationStore(str(path)).get("L1") == won[0]
+
+def test_holder_books_while_others_try_to_hold(tmp_path):
+    path = tmp_path / "reservations.db"
+    ReservationStore(str(path)).hold("L1", "MC0", 300)
+    won, lost = race(path, lambda store, i: store.book("L1", "MC0") if i == 0 else store.hold("L1", f"MC{i}", 300))
+    assert [(res.state, res.holder) for res in won] == [("booked", "MC0")]
+    assert len(lost) == WORKERS - 1
+
+def test_expired_hold_is_taken_once(tmp_path):
+    path = tmp_path / "reservations.db"
+    ReservationStore(str(path)).hold("L1", "MC0", 0.01)
+    time.sleep(0.05)
+    won, lost = race(path, lambda store, i: store.hold("L1", f"MC{i + 1}", 300))
+    assert len(won) == 1 and len(lost) == WORKERS - 1
+    assert won[0].version == 2
+
+def test_stale_version_loses(tmp_path):
+    path = tmp_path / "reservations.db"
+    seen = ReservationStore(str(path)).hold("L1", "MC0", 300)
+    # every worker extends the hold from the same version; only the first gets through
+    won, lost = race(path, lambda store, i: store.hold("L1", "MC0", 600, version=seen.version))
+    assert len(won) == 1 and len(lost) == WORKERS - 1
+    assert won[0].version == seen.version + 1
+
+def test_changes_counter_is_polled(tmp_path):
+    path = str(tmp_path / "reservations.db")
+    reader = ReservationStore(path, poll_interval=60)
+    other = ReservationStore(path)
+    start = reader.changes()
+    other.hold("L1", "MC1", 300)
+    # another worker's change waits for the next poll ...
+    assert reader.changes() == start
+    reader.poll_interval = 0
+    assert reader.changes() == start + 1
+    # ... a change made through the store itself is seen at once
+    reader.poll_interval = 60
+    reader.hold("L2", "MC2", 300)
+    assert reader.changes() == start + 2
+
+def test_unavailable_applies_the_changes_between_polls(tmp_path):
+    path = str(tmp_path / "reservations.db")
+    reader = ReservationStore(path, poll_interval=0.2)
+    writer = ReservationStore(path)
+    booked = {f"B{i}" for i in range(100)}
+    for load_id in booked:
+        writer.book(load_id, "MC1")
+    for i in range(100):
+        writer.hold(f"R{i}", "MC1", 300)
+        writer.release(f"R{i}", "MC1")
+    assert sorted(reader.unavailable()[0]) == sorted(booked)
+    start = reader.changes()
+
+    # several changes before the next poll, some to the same load
+    writer.hold("L1", "MC2", 300)
+    writer.release("L1", "MC2")
+    writer.book("L1", "MC3")
+    writer.hold("L2", "MC2", 300)
+    writer.release("B0", "MC1")
+    expires = writer.hold("L3", "MC2", 0.6).expires_at
+    assert reader.changes() == start
+    time.sleep(0.2)
+    assert reader.changes() == start + 6
+    ids, valid_until = reader.unavailable()
+    assert sorted(ids) == sorted(booked - {"B0"} | {"L1", "L2", "L3"})
+    assert valid_until == expires
+    # the hold runs out without another change
+    time.sleep(0.45)
+    assert sorted(reader.unavailable()[0]) == sorted(booked - {"B0"} | {"L1", "L2"})
+
+    # rows that did not change since the last call are not read again: a row edited
+    # behind the store's back (no transition, so no stamp) is only seen by a new store
+    conn = sqlite3.connect(path)
+    conn.execute("UPDATE reservations SET state = 'booked' WHERE load_id = 'R0'")
+    conn.commit()
+    conn.close()
+    assert "R0" not in reader.unavailable()[0]
+    assert "R0" in ReservationStore(path).unavailable()[0]
+
+def test_file_from_before_stamps_is_upgraded(tmp_path):
+    path = str(tmp_path / "reservations.db")
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE reservations (load_id TEXT PRIMARY KEY, state TEXT NOT NULL DEFAULT 'available',
+                                   holder TEXT, expires_at REAL, version INTEGER NOT NULL DEFAULT 0);
+        CREATE TABLE counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+        INSERT INTO counters VALUES ('changes', 7);
+        CREATE TRIGGER reservations_changed AFTER UPDATE ON reservations
+        BEGIN UPDATE counters SET value = value + 1 WHERE name = 'changes'; END;
+        INSERT INTO reservations VALUES ('L1', 'booked', 'MC1', NULL, 3), ('L2', 'available', NULL, NULL, 2);
+    """)
+    conn.close()
+    store = ReservationStore(path)
+    assert store.unavailable()[0] == ["L1"]
+    assert store.book("L2", "MC2").version == 3
+    assert store.changes() == 8
+    assert sorted(store.unavailable()[0]) == ["L1", "L2"]
+    assert ReservationStore(path).get("L2").state == "booked"
+
+def test_listings_hide_held_loads(load_app):
+    pytest.importorskip("numpy")
+    from fastapi.testclient import TestClient
+
+    header = "load_id,origin,destination,pickup_datetime,delivery_datetime,equipment_type,loadboard_rate,notes,weight,commodity_type,num_of_pieces,miles,dimensions\n"
+    rows = "".join(f"L{i},Dallas TX,Austin TX,2025-10-01T08:00:00,2025-10-02T18:00:00,Van,1000,,,,,,\n" for i in range(1, 4))
+    module = load_app(header + rows, RESERVATIONS_POLL_INTERVAL="0.2")
+    client = TestClient(module.app, headers={"X-API-Key": "test-key"})
+
+    def listed():
+        return [row["load_id"] for row in client.get("/loads").json()["results"]]
+
+    assert listed() == ["L1", "L2", "L3"]
+    assert client.post("/loads/L1/hold", json={"holder": "MC1"}).status_code == 200
+    assert listed() == ["L2", "L3"]
+    # a hold taken by another worker shows once the counter is polled again
+    ReservationStore(module.RESERVATIONS_PATH).hold("L2", "MC2", 300)
+    time.sleep(0.3)
+    assert listed() == ["L3"]
+    assert client.post("/loads/L3/hold", json={"holder": "MC1"}).status_code == 200
+    assert client.post("/loads/L3/hold", json={"holder": "MC3"}).status_code == 409
@@ -0,0 +1,72 @@
+import pytest
+
+pytest.importorskip("numpy")
+from fastapi.testclient import TestClient
+
+from response_cache import ResponseCache, etag_matches
+
+HEADER = "load_id,origin,destination,pickup_datetime,delivery_datetime,equipment_type,loadboard_rate,notes,weight,commodity_type,num_of_pieces,miles,dimensions\n"
+CSV = HEADER + "".join([
+    "L1,Chicago IL,Dallas TX,2025-10-01T08:00:00,2025-10-02T18:00:00,Van,1000,,,,,900,\n",
+    "L2,Dallas TX,Austin TX,2025-10-02T08:00:00,2025-10-02T18:00:00,Reefer,500,,,,,200,\n",
+])
+
+@pytest.fixture(params=["index", "columnar"])
+def module(request, load_app):
+    return load_app(CSV, request.param, RESPONSE_CACHE_SIZE="16")
+
+def _client(module):
+    return TestClient(module.app, headers={"X-API-Key": "test-key"})
+
+@pytest.mark.parametrize("first", ["Chicago IL ", "Chicago IL"])
+def test_padded_and_plain_filters_share_one_answer(module, first):
+    client = _client(module)
+    second = "Chicago IL" if first != "Chicago IL" else " chicago il "
+    a = client.get("/loads/search", params={"origin": first, "equipment_type": " VAN"})
+    b = client.get("/loads/search", params={"origin": second, "equipment_type": "van"})
+    assert a.json()["count"] == 1 and [r["load_id"] for r in a.json()["results"]] == ["L1"]
+    assert b.content == a.content and b.headers["etag"] == a.headers["etag"]
+    assert module.RESPONSE_CACHE.stats()["hits"] == 1
+
+def test_sort_options_are_case_insensitive(module):
+    client = _client(module)
+    a = client.get("/loads", params={"sort_by": "Miles", "order": "DESC"}).json()
+    b = client.get("/loads", params={"sort_by": "miles", "order": "desc"}).json()
+    assert a == b and [r["load_id"] for r in a["results"]] == ["L1", "L2"]
+
+def test_if_none_match_gets_304(module):
+    client = _client(module)
+    first = client.get("/loads")
+    etag = first.headers["etag"]
+    assert first.status_code == 200 and first.headers["cache-control"] == "no-cache"
+    for header in (etag, "W/" + etag, '"other", ' + etag, "*"):
+        again = client.get("/loads", headers={"If-None-Match": header})
+        assert again.status_code == 304 and again.content == b"" and again.headers["etag"] == etag, header
+    assert client.get("/loads", headers={"If-None-Match": '"other"'}).status_code == 200
+    # another query, another tag
+    assert client.get("/loads", params={"page_size": 1}, headers={"If-None-Match": etag}).status_code == 200
+
+def test_reload_drops_cached_pages(module, tmp_path):
+    client = _client(module)
+    before = client.get("/loads")
+    (tmp_path / "loads.csv").write_text(CSV + "L3,Austin TX,Houston TX,2025-10-03T08:00:00,2025-10-03T18:00:00,Van,700,,,,,160,\n", encoding="utf-8")
+    assert module.reload_dataset()
+    after = client.get("/loads", headers={"If-None-Match": before.headers["etag"]})
+    assert after.status_code == 200 and after.json()["count"] == 3
+    assert after.headers["etag"] != before.headers["etag"]
+    assert module.RESPONSE_CACHE.stats()["entries"] == 1
+
+def test_cache_is_bounded_by_entries_and_bytes():
+    cache = ResponseCache(max_entries=2, max_bytes=10)
+    for key in "abc":
+        cache.put(1, key, b"1234")
+    assert list(cache.entries) == ["b", "c"]
+    cache.put(1, "d", b"1234567")
+    assert list(cache.entries) == ["d"] and cache.size == 7
+    # too big to keep, still served
+    assert cache.put(1, "e", b"x" * 11).body == b"x" * 11 and "e" not in cache.entries
+    assert cache.get(2, "d") is None and not cache.entries
+
+def test_etag_matching():
+    assert etag_matches('W/"a"', '"a"') and etag_matches('"b", "a"', '"a"') and etag_matches("*", '"a"')
+    assert not etag_matches(None, '"a"') and not etag_matches('"b"', '"a"')
@@ -0,0 +1,90 @@
+import threading
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import snapshot
+from columnar import ColumnarLoadStore, FileStringTable
+from snapshot import csv_checksum, load_or_build, read_snapshot, write_snapshot
+from store import Selection
+
+CSV = """load_id,origin,destination,pickup_datetime,delivery_datetime,equipment_type,loadboard_rate,notes,weight,commodity_type,num_of_pieces,miles,dimensions
+L001,Chicago IL,Dallas TX,2025-09-28T08:00:00,2025-09-29T18:00:00,Van,2500,Fragile goods,20000,Electronics,500,925,48x40x60
+L002,Los Angeles CA,Phoenix AZ,2025-09-27T07:00:00-07:00,2025-09-27T20:00:00,Flatbed,1200,Open deck load,15000,Steel,100,370,60x48x72
+L003,Chicago IL,Denver CO,,tomorrow,Reefer,,Zürich transfer,,Produce,,1000,
+"""
+
+@pytest.fixture
+def paths(tmp_path):
+    csv_path = tmp_path / "loads.csv"
+    csv_path.write_text(CSV, encoding="utf-8")
+    return str(csv_path), str(tmp_path / "loads.snap")
+
+def _dump(store):
+    ids = store.value("load_id", np.arange(len(store)))
+    return [store.get(i) for i in sorted(ids)]
+
+def test_round_trip(paths):
+    csv_path, snap_path = paths
+    store = ColumnarLoadStore.from_csv(csv_path)
+    write_snapshot(store, snap_path, csv_checksum(csv_path))
+    mapped = read_snapshot(snap_path, csv_checksum(csv_path))
+    assert mapped is not None
+    # mapped read-only, not copied
+    assert not mapped.id_positions.flags.writeable
+    assert _dump(mapped) == _dump(store)
+    for key, order in store.order.items():
+        assert mapped.order[key].tolist() == order.tolist()
+    assert mapped.lane_rates() == store.lane_rates()
+    assert mapped.id_chars == store.id_chars
+    query = dict(origin="chicago", sort_by="miles", descending=True)
+    assert mapped.search(**query) == store.search(**query)
+    # pages come from the snapshot's row table, byte for byte what the store encodes
+    everything = Selection(len(store), list(range(len(store))), None)
+    assert isinstance(mapped.rows, FileStringTable)
+    assert mapped.rows_json(everything) == store.rows_json(everything)
+    assert not mapped.row_cache
+
+def test_stale_checksum_is_rejected(paths):
+    csv_path, snap_path = paths
+    write_snapshot(ColumnarLoadStore.from_csv(csv_path), snap_path, csv_checksum(csv_path))
+    assert read_snapshot(snap_path, "0" * 64) is None
+    # without a checksum to compare with, any snapshot of this format is accepted
+    assert read_snapshot(snap_path) is not None
+
+def test_other_format_versions_and_garbage_are_rejected(paths, monkeypatch):
+    csv_path, snap_path = paths
+    checksum = csv_checksum(csv_path)
+    write_snapshot(ColumnarLoadStore.from_csv(csv_path), snap_path, checksum)
+    monkeypatch.setattr(snapshot, "FORMAT_VERSION", snapshot.FORMAT_VERSION + 1)
+    assert read_snapshot(snap_path, checksum) is None
+    with open(snap_path, "wb") as f:
+        f.write(b"not a snapshot")
+    assert read_snapshot(snap_path, checksum) is None
+    assert read_snapshot(snap_path + ".missing", checksum) is None
+
+def test_load_or_build_rebuilds_a_stale_snapshot(paths):
+    csv_path, snap_path = paths
+    first = load_or_build(csv_path, snap_path)
+    assert read_snapshot(snap_path, csv_checksum(csv_path)) is not None
+    with open(csv_path, "a", encoding="utf-8") as f:
+        f.write("L004,Atlanta GA,Miami FL,2025-10-01T08:00:00,2025-10-02T08:00:00,Van,1500,,10000,Paper,10,660,\n")
+    second = load_or_build(csv_path, snap_path, previous=first)
+    assert second.get("L004")["destination"] == "Miami FL"
+    assert _dump(second)[:3] == _dump(first)
+    assert read_snapshot(snap_path, csv_checksum(csv_path)) is not None
+
+def test_concurrent_builders_write_once(paths, monkeypatch):
+    csv_path, snap_path = paths
+    writes = []
+    real_write = snapshot.write_snapshot
+    monkeypatch.setattr(snapshot, "write_snapshot", lambda *a: writes.append(1) or real_write(*a))
+    stores = []
+    threads = [threading.Thread(target=lambda: stores.append(load_or_build(csv_path, snap_path))) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(writes) == 1
+    assert len({len(s) for s in stores}) == 1
@@ -0,0 +1,5 @@
+"""Modules shared by carrier_loads, fmcsa_fake and the metrics API.
+
+The services import them as ``carrier_common.<module>``. Docker images are built
+from the repository root and ``pip install`` this package (see the README).
+"""
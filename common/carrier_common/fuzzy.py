@@ -0,0 +1,193 @@
+"""Tolerant matching for noisy, speech-to-text input.
+
+- ``spoken_code`` turns "L 0 0 1", "el zero zero one" or "double five two"
+  into the code that was meant ("L001", "552").
+- ``code_candidates`` enumerates the strings within a small edit distance of
+  a code and keeps the known ones. Looking those up in a hash (or sorted
+  array) of ids costs the same whatever the dataset size, unlike scanning or
+  a BK-tree walk.
+- ``PhraseIndex`` ranks phrases (places, company names) against a query:
+  words are matched exactly or within one edit through a word -> phrases
+  index, candidates are the phrases sharing the most (and rarest) query
+  words, and those are scored by trigram similarity of the whole text.
+"""
+import re
+from array import array
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+DIGITS = {
+    "zero": "0", "oh": "0", "o": "0", "one": "1", "won": "1", "two": "2", "to": "2", "too": "2",
+    "three": "3", "tree": "3", "four": "4", "for": "4", "five": "5", "fife": "5", "six": "6",
+    "seven": "7", "eight": "8", "ate": "8", "nine": "9", "niner": "9",
+}
+LETTERS = {
+    "alpha": "A", "alfa": "A", "bravo": "B", "bee": "B", "charlie": "C", "see": "C", "sea": "C",
+    "delta": "D", "dee": "D", "echo": "E", "foxtrot": "F", "ef": "F", "golf": "G", "gee": "G",
+    "hotel": "H", "india": "I", "juliet": "J", "jay": "J", "kilo": "K", "kay": "K", "lima": "L",
+    "el": "L", "ell": "L", "mike": "M", "em": "M", "november": "N", "en": "N", "oscar": "O",
+    "papa": "P", "pee": "P", "quebec": "Q", "cue": "Q", "romeo": "R", "ar": "R", "sierra": "S",
+    "tango": "T", "tee": "T", "uniform": "U", "you": "U", "victor": "V", "vee": "V",
+    "whiskey": "W", "x-ray": "X", "xray": "X", "ex": "X", "yankee": "Y", "why": "Y", "zulu": "Z", "zee": "Z",
+}
+REPEAT = {"double": 2, "triple": 3}
+MAX_CANDIDATES = 200  # phrases scored per candidate run, see PhraseIndex.search
+COMMON = 16  # words in more than 1/COMMON of the phrases get a membership bitmap
+
+def _words(text: str) -> List[str]:
+    return re.findall(r"[a-z0-9]+(?:-[a-z]+)?", (text or "").lower())
+
+def spoken_code(text: str, ignore: Iterable[str] = ()) -> str:
+    """Collapse a spoken or spelled-out code into its characters, uppercased.
+
+    Number and letter names become characters, "double"/"triple" repeat the
+    next one, words in ``ignore`` (e.g. "load", "mc") are dropped.
+    """
+    skip = set(ignore)
+    out: List[str] = []
+    repeat = 1
+    for word in _words(text):
+        if word in skip:
+            continue
+        if word in REPEAT:
+            repeat = REPEAT[word]
+            continue
+        char = DIGITS.get(word) or LETTERS.get(word) or word.replace("-", "").upper()
+        out.append(char[0] * repeat + char[1:])
+        repeat = 1
+    return "".join(out)
+
+def _edits1(word: str, alphabet: str) -> Set[str]:
+    out = set()
+    for i in range(len(word) + 1):
+        head, tail = word[:i], word[i:]
+        out.update(head + c + tail for c in alphabet)  # insertion (a dropped character)
+        if tail:
+            out.add(head + tail[1:])  # deletion
+            out.update(head + c + tail[1:] for c in alphabet)  # substitution
+    return out
+
+def code_score(query: str, candidate: str, distance: int) -> float:
+    return round(1 - distance / max(len(query), len(candidate), 1), 3)
+
+def _trigrams(text: str) -> Set[str]:
+    padded = "  " + " ".join(_words(text)) + " "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def _dice(a: Set[str], b: Set[str]) -> float:
+    return 2 * len(a & b) / (len(a) + len(b)) if a or b else 0.0
+
+def similarity(a: str, b: str) -> float:
+    """Dice coefficient of the padded trigram sets (1.0 = same words)."""
+    return _dice(_trigrams(a), _trigrams(b))
+
+class PhraseIndex:
+    def __init__(self, phrases: Sequence[str]):
+        self.phrases = phrases
+        self.vocab: Dict[str, int] = {}
+        self.postings: List[array] = []
+        alphabet: Set[str] = set()
+        for pid, phrase in enumerate(phrases):
+            for word in set(_words(phrase)):
+                wid = self.vocab.get(word)
+                if wid is None:
+                    wid = self.vocab[word] = len(self.postings)
+                    self.postings.append(array("I"))
+                    alphabet.update(word)
+                self.postings[wid].append(pid)
+        self.alphabet = "".join(sorted(alphabet))
+        # membership bitmaps for the common words ("llc", "trucking"): one byte per
+        # phrase, at most COMMON of them, no bigger than the posting lists themselves
+        self.masks: Dict[int, bytearray] = {}
+        for wid, posting in enumerate(self.postings):
+            if len(posting) * COMMON > len(phrases):
+                mask = self.masks[wid] = bytearray(len(phrases))
+                for pid in posting:
+                    mask[pid] = 1
+
+    @classmethod
+    def from_parts(cls, phrases: Sequence[str], vocab, postings, masks, alphabet: str) -> "PhraseIndex":
+        """An index over prebuilt, e.g. memory-mapped, structures shaped like the attributes above."""
+        index = cls.__new__(cls)
+        index.phrases, index.vocab, index.postings, index.masks, index.alphabet = phrases, vocab, postings, masks, alphabet
+        return index
+
+    def _matching_words(self, word: str) -> List[int]:
+        wid = self.vocab.get(word)
+        if wid is not None:
+            return [wid]
+        # one typo, or a dropped/extra letter ("ill" for "il", "dalas" for "dallas")
+        near = _edits1(word, self.alphabet) if len(word) > 1 else set()
+        return [wid for wid in map(self.vocab.get, near) if wid is not None]
+
+    def _term(self, word: str) -> Optional[Tuple[Sequence[int], Callable[[int], Any]]]:
+        """Phrases containing ``word`` (or a near miss of it) and a membership test for them."""
+        wids = self._matching_words(word)
+        if not wids:
+            return None
+        if len(wids) == 1:
+            posting: Sequence[int] = self.postings[wids[0]]
+            mask = self.masks.get(wids[0])
+            return posting, mask.__getitem__ if mask is not None else set(posting).__contains__
+        members = set().union(*(self.postings[wid] for wid in wids))
+        return sorted(members), members.__contains__
+
+    def search(self, query: str, limit: int = 5, min_score: float = 0.5) -> List[Tuple[int, float]]:
+        """``(phrase_id, score)`` of the best matches, best first.
+
+        Candidates start from the rarest query word and are narrowed by each
+        other word that still leaves some; a word that never co-occurs with
+        the ones before it ("iron express 5" with no "Iron Express 5") seeds
+        its own run. The first ``MAX_CANDIDATES`` of every run are scored.
+        """
+        terms = [t for t in map(self._term, set(_words(query))) if t is not None]
+        terms.sort(key=lambda t: len(t[0]))
+        candidates: Set[int] = set()
+        used: Set[int] = set()
+        for i, (posting, _) in enumerate(terms):
+            if i in used:
+                continue
+            found = posting
+            for j, (_, has) in enumerate(terms):
+                if j != i:
+                    narrowed = [pid for pid in found if has(pid)]
+                    if narrowed:
+                        found = narrowed
+                        used.add(j)
+            candidates.update(found[:MAX_CANDIDATES])
+        grams = _trigrams(query)
+        scored = []
+        for pid in candidates:
+            score = _dice(grams, _trigrams(self.phrases[pid]))
+            if score >= min_score:
+                scored.append((pid, round(score, 3)))
+        scored.sort(key=lambda s: (-s[1], s[0]))
+        return scored[:limit]
+
+def best(candidates: Iterable[Tuple[str, float]], limit: int, min_score: float) -> List[Tuple[str, float]]:
+    ranked = sorted((c for c in candidates if c[1] >= min_score), key=lambda c: (-c[1], c[0]))
+    return ranked[:limit]
+
+def code_candidates(
+    query: str, alphabet: str, known, limit: int, max_distance: Optional[int] = None
+) -> List[Tuple[str, float]]:
+    """Scored known codes near ``query``; ``known(strings)`` returns the ones that exist.
+
+    ``alphabet`` holds the characters codes are made of. The edit neighborhood
+    grows one distance at a time and stops once ``limit`` codes are found, as
+    farther ones could not rank above them. A query with more foreign
+    characters than ``max_distance`` cannot be near any code and is not
+    expanded at all (a spoken place name never costs an id lookup).
+    """
+    if max_distance is None:
+        max_distance = 1 if len(query) <= 4 else 2
+    if not query or sum(c not in alphabet for c in query) > max_distance:
+        return []
+    found = [(code, 1.0) for code in known([query])]
+    seen, frontier = {query}, {query}
+    for d in range(1, max_distance + 1):
+        if len(found) >= limit:
+            break
+        frontier = {e for w in frontier for e in _edits1(w, alphabet)} - seen
+        seen |= frontier
+        found.extend((code, code_score(query, code, d)) for code in known(list(frontier)))
+    return found
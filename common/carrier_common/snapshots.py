@@ -0,0 +1,87 @@
+"""File handling shared by the services' binary snapshots.
+
+Both snapshot formats (carrier_loads' columnar store, fmcsa_fake's carrier
+tables) are laid out as::
+
+    MAGIC | u64 header length | JSON header | sections, each padded to ALIGN
+
+The header is padded so the first section starts aligned; section offsets
+recorded in it are relative to that byte. What the sections hold, and how
+they are mapped back, is up to each service.
+"""
+import fcntl
+import hashlib
+import json
+import os
+import struct
+import tempfile
+from contextlib import contextmanager
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, Optional, Tuple
+
+def csv_checksum(path: str) -> str:
+    """SHA-256 of a source file, the key a snapshot is matched against."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def pad(n: int, align: int) -> int:
+    """Bytes needed after ``n`` bytes to reach the next multiple of ``align``."""
+    return -n % align
+
+def write_sections(path: str, magic: bytes, header: Dict[str, Any], sections: Iterable[Any], align: int) -> None:
+    """Write a snapshot to ``path`` atomically (temp file + rename).
+
+    ``sections`` are buffers (bytes, contiguous arrays), written in order
+    from their own memory, each followed by its padding.
+    """
+    encoded = json.dumps(header).encode()
+    encoded += b" " * pad(len(magic) + 8 + len(encoded), align)
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".snapshot-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(magic)
+            f.write(struct.pack("<Q", len(encoded)))
+            f.write(encoded)
+            for data in sections:
+                view = memoryview(data)
+                f.write(view)
+                f.write(b"\0" * pad(view.nbytes, align))
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+def read_header(f: BinaryIO, magic: bytes, version: int, checksum: Optional[str] = None) -> Optional[Tuple[Dict[str, Any], int]]:
+    """``(header, offset of the first section)`` of the snapshot open as ``f``.
+
+    None if it is not a snapshot, has another format version or, when
+    ``checksum`` is given, was built from another file.
+    """
+    try:
+        if f.read(len(magic)) != magic:
+            return None
+        (size,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(size))
+    except (ValueError, OverflowError, struct.error):
+        return None
+    if not isinstance(header, dict) or header.get("version") != version or (checksum is not None and header.get("checksum") != checksum):
+        return None
+    return header, len(magic) + 8 + size
+
+@contextmanager
+def build_lock(path: str) -> Iterator[None]:
+    """Exclusive lock next to ``path``, so concurrently starting workers build it only once."""
+    try:
+        fd = os.open(path + ".lock", os.O_RDWR | os.O_CREAT, 0o644)
+    except OSError:
+        # read-only directory: nothing will be written there anyway
+        yield
+        return
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)
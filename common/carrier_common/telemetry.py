@@ -0,0 +1,263 @@
+"""Request telemetry: Prometheus metrics, phase timers and a sampling profiler.
+
+``install(app)`` adds an ASGI middleware recording per-route latency and
+response size histograms plus an in-flight gauge, and serves everything on
+``GET /metrics`` in the Prometheus text format. Hot paths time their steps
+with ``phase(name)`` or ``Laps``. Metrics are per process: with several
+uvicorn workers each one reports its own.
+
+Route names, latencies and process memory are not for the public, so
+``install(app, api_key=...)`` serves ``/metrics`` only to requests carrying
+the key as ``X-API-Key`` or ``Authorization: Bearer <key>`` (what a
+Prometheus scrape config sends with ``authorization: {credentials: ...}``).
+
+The sampling profiler is off unless ``TELEMETRY_PROFILE=1``; ``kill -USR2
+<pid>`` toggles it in that one process. Stopping writes collapsed stacks
+(flamegraph.pl / speedscope input) to ``TELEMETRY_PROFILE_DIR``.
+"""
+import hmac
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+PROFILE = os.environ.get("TELEMETRY_PROFILE", "0").lower() in ("1", "true", "yes")
+PROFILE_INTERVAL = float(os.environ.get("TELEMETRY_PROFILE_INTERVAL", "0.005"))  # seconds between samples
+PROFILE_DIR = os.environ.get("TELEMETRY_PROFILE_DIR", "/tmp")
+
+log = logging.getLogger("telemetry")
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PHASE_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+SIZE_BUCKETS = (128, 1024, 8192, 65536, 524288, 4194304, 33554432)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self.lock = threading.Lock()
+        self.series: Dict[Tuple[str, ...], List[float]] = {}  # labels -> bucket counts..., +Inf count, sum
+
+    def observe(self, value: float, *labels: str) -> None:
+        i = bisect_left(self.buckets, value)
+        with self.lock:
+            counts = self.series.get(labels)
+            if counts is None:
+                counts = self.series[labels] = [0] * (len(self.buckets) + 2)
+            counts[i] += 1
+            counts[-1] += value
+
+    def collect(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        with self.lock:
+            series = [(labels, list(counts)) for labels, counts in self.series.items()]
+        for labels, counts in sorted(series):
+            running = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                running += n
+                le = 'le="%s"' % ("+Inf" if bound == float("inf") else repr(bound))
+                yield f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {running}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {counts[-1]}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {running}"
+
+class Gauge:
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.lock = threading.Lock()
+        self.value = 0.0
+
+    def add(self, amount: float) -> None:
+        with self.lock:
+            self.value += amount
+
+    def collect(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} gauge"
+        yield f"{self.name} {self.value}"
+
+REQUEST_LATENCY = Histogram("http_request_duration_seconds", "Request latency by route", ("method", "route", "status"))
+RESPONSE_SIZE = Histogram("http_response_size_bytes", "Response body size by route", ("method", "route"), SIZE_BUCKETS)
+IN_FLIGHT = Gauge("http_requests_in_flight", "Requests currently being served")
+PHASES = Histogram("app_phase_duration_seconds", "Time spent in hot-path phases", ("phase",), PHASE_BUCKETS)
+METRICS = [REQUEST_LATENCY, RESPONSE_SIZE, IN_FLIGHT, PHASES]
+START_TIME = time.time()
+
+def _process_metrics() -> Iterator[str]:
+    yield "# TYPE process_cpu_seconds_total counter"
+    yield f"process_cpu_seconds_total {time.process_time()}"
+    yield "# TYPE process_start_time_seconds gauge"
+    yield f"process_start_time_seconds {START_TIME}"
+    try:
+        with open("/proc/self/statm") as f:
+            rss = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return
+    yield "# TYPE process_resident_memory_bytes gauge"
+    yield f"process_resident_memory_bytes {rss}"
+
+def render() -> str:
+    lines: List[str] = []
+    for metric in METRICS:
+        lines.extend(metric.collect())
+    lines.extend(_process_metrics())
+    return "\n".join(lines) + "\n"
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        PHASES.observe(time.perf_counter() - start, name)
+
+class Laps:
+    """Times consecutive phases of one operation: each call records the time since the previous one."""
+
+    __slots__ = ("last",)
+
+    def __init__(self):
+        self.last = time.perf_counter()
+
+    def __call__(self, name: str) -> None:
+        now = time.perf_counter()
+        PHASES.observe(now - self.last, name)
+        self.last = now
+
+class PrometheusMiddleware:
+    """Pure ASGI middleware (works with streaming responses, adds no task switches)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status, size = 500, 0
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        IN_FLIGHT.add(1)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            IN_FLIGHT.add(-1)
+            # the router stores the matched route in the scope; unmatched paths share one label
+            route = getattr(scope.get("route"), "path", "unmatched")
+            REQUEST_LATENCY.observe(time.perf_counter() - start, scope["method"], route, str(status))
+            RESPONSE_SIZE.observe(size, scope["method"], route)
+
+class SamplingProfiler:
+    """Samples every thread's Python stack at a fixed interval into collapsed-stack counts."""
+
+    def __init__(self, interval: float = PROFILE_INTERVAL):
+        self.interval = interval
+        self.counts: Counter = Counter()
+        self.stop_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self.thread is not None
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self.counts = Counter()
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self.thread.start()
+        log.info("sampling profiler started in pid %d", os.getpid())
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        while not self.stop_event.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                self.counts[";".join(reversed(stack))] += 1
+
+    def stop(self) -> Optional[str]:
+        """Stop sampling and write the collapsed stacks; returns the file path."""
+        if not self.running:
+            return None
+        self.stop_event.set()
+        self.thread.join()
+        self.thread = None
+        path = os.path.join(PROFILE_DIR, f"profile-{os.getpid()}-{int(time.time())}.txt")
+        with open(path, "w") as f:
+            for stack, n in self.counts.most_common():
+                f.write(f"{stack} {n}\n")
+        log.info("sampling profiler stopped: %d samples written to %s", sum(self.counts.values()), path)
+        return path
+
+    def toggle(self, *_) -> None:
+        if self.running:
+            self.stop()
+        else:
+            self.start()
+
+PROFILER = SamplingProfiler()
+
+def _authorized(headers, api_key: str) -> bool:
+    """Whether a request carries ``api_key`` as X-API-Key or as a bearer token."""
+    supplied = headers.get("x-api-key")
+    if supplied is None:
+        scheme, _, token = headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer":
+            return False
+        supplied = token.strip()
+    return hmac.compare_digest(supplied.encode(), api_key.encode())
+
+def install(app, path: str = "/metrics", api_key: Optional[str] = None) -> None:
+    """Add the metrics middleware and endpoint to a FastAPI app and arm the profiler toggle.
+
+    With ``api_key`` the endpoint answers 401 to requests that do not carry it.
+    An empty key leaves it open, like the services' other endpoints when API_KEY is empty.
+    """
+    from fastapi import HTTPException, Request, Response
+
+    app.add_middleware(PrometheusMiddleware)
+
+    def metrics(request: Request) -> Response:
+        if api_key and not _authorized(request.headers, api_key):
+            raise HTTPException(status_code=401, detail="Invalid API key")
+        return Response(content=render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+    app.add_api_route(path, metrics, methods=["GET"], include_in_schema=False)
+    # signal handlers can only be set from the main thread (true when uvicorn imports the app)
+    if hasattr(signal, "SIGUSR2") and threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGUSR2, PROFILER.toggle)
+    if PROFILE:
+        PROFILER.start()
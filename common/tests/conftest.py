@@ -0,0 +1,5 @@
+import os
+import sys
+
+# run pytest from any directory, with or without the package installed
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,28 @@
+from carrier_common.fuzzy import PhraseIndex, best, code_candidates, spoken_code
+
+def test_spoken_code():
+    assert spoken_code("L 0 0 1") == "L001"
+    assert spoken_code("el zero zero one") == "L001"
+    assert spoken_code("M C one oh double five", ignore=("m", "c")) == "1055"
+    assert spoken_code("load triple seven", ignore=("load",)) == "777"
+
+def test_code_candidates_find_near_codes():
+    ids = {"L001", "L002", "L101", "X999"}
+    known = lambda strings: [s for s in strings if s in ids]
+    found = dict(code_candidates("L001", "L0123456789X", known, limit=5))
+    assert found["L001"] == 1.0
+    assert {"L002", "L101"} <= set(found) and "X999" not in found
+    assert max(v for k, v in found.items() if k != "L001") < 1.0
+    # a spoken place name is not expanded into id lookups
+    assert code_candidates("chicago", "L0123456789X", known, limit=5) == []
+
+def test_phrase_index_ranks_similar_places():
+    places = ["Chicago IL", "Dallas TX", "Fort Worth TX", "Chico CA"]
+    index = PhraseIndex(places)
+    hits = index.search("chicago ill")
+    assert places[hits[0][0]] == "Chicago IL"
+    assert places[index.search("dalas texas")[0][0]] == "Dallas TX"
+    assert index.search("zzz qqq") == []
+
+def test_best_orders_and_bounds():
+    assert best([("b", 0.9), ("a", 0.9), ("c", 0.4), ("d", 1.0)], limit=3, min_score=0.5) == [("d", 1.0), ("a", 0.9), ("b", 0.9)]
@@ -0,0 +1,76 @@
+import hashlib
+import os
+import threading
+
+import pytest
+
+from carrier_common.snapshots import build_lock, csv_checksum, pad, read_header, write_sections
+
+MAGIC = b"TESTSNP\n"
+
+def _write(path, sections, align=16, **header):
+    write_sections(str(path), MAGIC, dict({"version": 1, "checksum": "abc"}, **header), sections, align)
+
+def test_csv_checksum(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_bytes(b"a,b\n" * 300000)
+    assert csv_checksum(str(path)) == hashlib.sha256(path.read_bytes()).hexdigest()
+
+def test_pad():
+    assert [pad(n, 8) for n in (0, 1, 7, 8, 9)] == [0, 7, 1, 0, 7]
+
+def test_sections_start_aligned(tmp_path):
+    path = tmp_path / "x.snap"
+    sections = [b"abc", memoryview(b"0123456789abcdefXY"), b""]
+    _write(path, sections, layout=[0, 16, 48])
+    with open(path, "rb") as f:
+        header, base = read_header(f, MAGIC, 1, "abc")
+    assert header["layout"] == [0, 16, 48] and base % 16 == 0
+    data = path.read_bytes()
+    assert len(data) == base + 48
+    for offset, section in zip(header["layout"], sections):
+        assert data[base + offset:base + offset + len(section)] == bytes(section)
+    assert data[base + 3:base + 16] == b"\0" * 13
+
+def test_stale_or_foreign_files_are_refused(tmp_path):
+    path = tmp_path / "x.snap"
+    _write(path, [b"abc"])
+
+    def header(*args):
+        with open(path, "rb") as f:
+            return read_header(f, *args)
+    assert header(MAGIC, 1)[0]["checksum"] == "abc"
+    assert header(MAGIC, 2) is None
+    assert header(MAGIC, 1, "def") is None
+    assert header(b"OTHERSN\n", 1) is None
+    for garbage in (b"", MAGIC, MAGIC + b"\xff" * 8, MAGIC + (4).to_bytes(8, "little") + b"[1] ", MAGIC + (3).to_bytes(8, "little") + b"{x}"):
+        path.write_bytes(garbage)
+        assert header(MAGIC, 1) is None, garbage
+
+def test_failed_write_keeps_the_old_file(tmp_path):
+    path = tmp_path / "x.snap"
+    _write(path, [b"old"])
+    before = path.read_bytes()
+
+    def sections():
+        yield b"new"
+        raise RuntimeError("boom")
+    with pytest.raises(RuntimeError):
+        _write(path, sections())
+    assert path.read_bytes() == before
+    assert os.listdir(tmp_path) == ["x.snap"]
+
+def test_build_lock_is_exclusive(tmp_path):
+    path = str(tmp_path / "x.snap")
+    order = []
+
+    def build():
+        with build_lock(path):
+            order.append("other")
+    with build_lock(path):
+        other = threading.Thread(target=build)
+        other.start()
+        other.join(0.2)
+        order.append("first")
+    other.join(5)
+    assert order == ["first", "other"]
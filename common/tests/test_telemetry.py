@@ -0,0 +1,38 @@
+import pytest
+
+pytest.importorskip("fastapi")
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from carrier_common.telemetry import install, phase
+
+def make_client(**kwargs) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    def item(item_id: str):
+        with phase("lookup"):
+            return {"id": item_id}
+
+    install(app, **kwargs)
+    return TestClient(app)
+
+def test_metrics_need_the_api_key():
+    client = make_client(api_key="secret")
+    client.get("/items/1")
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"X-API-Key": "wrong"}).status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Basic secret"}).status_code == 401
+    for headers in ({"X-API-Key": "secret"}, {"Authorization": "Bearer secret"}):
+        response = client.get("/metrics", headers=headers)
+        assert response.status_code == 200
+        assert 'route="/items/{item_id}"' in response.text
+        assert 'app_phase_duration_seconds_count{phase="lookup"}' in response.text
+
+def test_metrics_open_without_a_key():
+    client = make_client()
+    assert client.get("/metrics").status_code == 200
+    # the services pass their API_KEY, which is empty when auth is disabled
+    client = make_client(api_key="")
+    assert client.get("/metrics").status_code == 200
+    assert client.get("/metrics", headers={"X-API-Key": "anything"}).status_code == 200
@@ -1,13 +1,35 @@
 
 import os
-import csv
-from typing import Dict, Any, Optional
-from fastapi import FastAPI, HTTPException, Header, Depends
+import logging
+import threading
+from typing import Iterator, List, Optional, Sequence, Tuple
+from fastapi import FastAPI, HTTPException, Header, Depends, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+
+from carrier_common.fuzzy import PhraseIndex, best, code_candidates, spoken_code
+from carrier_common.telemetry import install as install_telemetry
+from carriers import _encode, evaluate_eligibility, load_cache, precompute
+from snapshot import load_or_build
+from upstream import CarrierResolver, QCMobileClient, TTLCache, UpstreamError
 
 DATA_PATH = os.environ.get("FMCSA_CACHE_PATH", "data/fmcsa_cache.csv")
+# Compiled, memory-mapped copy of the CSV shared by all workers (see snapshot.py), e.g. data/fmcsa.snap
+SNAPSHOT_PATH = os.environ.get("FMCSA_SNAPSHOT", "")
 API_KEY = os.environ.get("API_KEY", "dev-secret")  # change in prod
+BATCH_MAX = int(os.environ.get("BATCH_MAX", "10000"))
+# Proxy mode: numbers missing from the CSV are looked up on the FMCSA QCMobile API
+# (or any server speaking the same protocol, e.g. upstream_stub.py)
+UPSTREAM_URL = os.environ.get("FMCSA_UPSTREAM_URL", "")  # e.g. https://mobile.fmcsa.dot.gov/qc/services
+UPSTREAM_WEBKEY = os.environ.get("FMCSA_WEBKEY", "")
+UPSTREAM_TIMEOUT = float(os.environ.get("FMCSA_UPSTREAM_TIMEOUT", "5"))
+LRU_SIZE = int(os.environ.get("FMCSA_LRU_SIZE", "100000"))
+TTL_ACTIVE = float(os.environ.get("FMCSA_TTL_ACTIVE", "86400"))
+TTL_OTHER = float(os.environ.get("FMCSA_TTL_OTHER", "3600"))
+TTL_NEGATIVE = float(os.environ.get("FMCSA_TTL_NEGATIVE", "600"))
+
+log = logging.getLogger("fmcsa_fake")
 
 app = FastAPI(title="FMCSA Fake", version="0.1.0", description="Demo-ready fake FMCSA eligibility checks")
 
@@ -18,27 +40,46 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+install_telemetry(app, api_key=API_KEY)  # GET /metrics (Prometheus)
 
 class CheckRequest(BaseModel):
     mc: str
 
-def load_cache(path: str) -> Dict[str, Dict[str, Any]]:
-    cache: Dict[str, Dict[str, Any]] = {}
-    with open(path, newline="") as csvfile:
-        reader = csv.DictReader(csvfile)
-        for row in reader:
-            # normalize booleans and keys
-            row["mc"] = str(row["mc"]).strip()
-            row["dot"] = str(row.get("dot", "")).strip()
-            row["carrier_name"] = row.get("carrier_name", "").strip()
-            row["status"] = row.get("status", "").strip().lower()
-            row["insurance_ok"] = str(row.get("insurance_ok", "")).strip().lower() in ("true","1","yes","y")
-            row["authority_ok"] = str(row.get("authority_ok", "")).strip().lower() in ("true","1","yes","y")
-            row["reason"] = row.get("reason", "").strip()
-            cache[row["mc"]] = row
-    return cache
-
-CACHE = load_cache(DATA_PATH)
+class BatchRequest(BaseModel):
+    mc: List[str] = Field(default_factory=list)
+    dot: List[str] = Field(default_factory=list)
+
+SNAPSHOT = load_or_build(DATA_PATH, SNAPSHOT_PATH) if SNAPSHOT_PATH else None
+if SNAPSHOT is not None:
+    VERDICTS, DOT_INDEX = SNAPSHOT.verdicts, SNAPSHOT.by_dot
+    NUMBER_CHARS = SNAPSHOT.number_chars
+else:
+    CACHE = load_cache(DATA_PATH)
+    VERDICTS, DOT_INDEX = precompute(CACHE)
+    # characters MC/DOT numbers are made of, the alphabet of fuzzy number lookups
+    NUMBER_CHARS = "".join(sorted(set("".join(VERDICTS)) | set("".join(DOT_INDEX))))
+
+def _warm(kind: str, number: str) -> Optional[bytes]:
+    mc = number if kind == "mc" else DOT_INDEX.get(number)
+    return VERDICTS.get(mc) if mc is not None else None
+
+RESOLVER: Optional[CarrierResolver] = None
+if UPSTREAM_URL:
+    RESOLVER = CarrierResolver(
+        _warm,
+        lambda record: _encode(evaluate_eligibility(record)),
+        QCMobileClient(UPSTREAM_URL, UPSTREAM_WEBKEY, UPSTREAM_TIMEOUT),
+        TTLCache(LRU_SIZE),
+        ttl_active=TTL_ACTIVE,
+        ttl_other=TTL_OTHER,
+        ttl_negative=TTL_NEGATIVE,
+    )
+
+def lookup(kind: str, number: str) -> Optional[bytes]:
+    """Pre-encoded verdict for an MC or DOT number, or None if unknown."""
+    if RESOLVER is None:
+        return _warm(kind, number)
+    return RESOLVER.lookup(kind, number)
 
 def require_api_key(x_api_key: Optional[str] = Header(default=None, alias="X-API-Key")):
     if not API_KEY:
@@ -49,26 +90,104 @@ def require_api_key(x_api_key: Optional[str] = Header(default=None, alias="X-API
 
 @app.get("/health")
 def health():
-    return {"status": "ok", "records": len(CACHE)}
-
-def evaluate_eligibility(record: Dict[str, Any]) -> Dict[str, Any]:
-    eligible = (record.get("status") == "active") and record.get("insurance_ok") and record.get("authority_ok")
-    reason = record.get("reason") or ("Eligible" if eligible else "Not eligible")
-    return {
-        "eligible": eligible,
-        "reason": reason,
-        "mc": record.get("mc"),
-        "dot": record.get("dot"),
-        "carrier_name": record.get("carrier_name"),
-        "status": record.get("status"),
-        "insurance_ok": record.get("insurance_ok"),
-        "authority_ok": record.get("authority_ok"),
-    }
+    out = {"status": "ok", "records": len(VERDICTS), "mode": "proxy" if RESOLVER else "csv", "snapshot": SNAPSHOT is not None}
+    if RESOLVER is not None:
+        out["cache"] = RESOLVER.stats()
+    return out
+
+def _json(body: bytes) -> Response:
+    return Response(content=body, media_type="application/json")
+
+def _lookup_or_404(kind: str, number: str) -> Response:
+    try:
+        verdict = lookup(kind, str(number).strip())
+    except UpstreamError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    if verdict is None:
+        raise HTTPException(status_code=404, detail=f"{kind.upper()} not found in cache")
+    return _json(verdict)
+
+@app.post("/carriers/batch", dependencies=[Depends(require_api_key)])
+def check_batch(req: BatchRequest):
+    """Verdicts for many MC and/or DOT numbers, streamed as one JSON array in request order."""
+    if len(req.mc) + len(req.dot) > BATCH_MAX:
+        raise HTTPException(status_code=413, detail=f"At most {BATCH_MAX} numbers per batch")
+    queries = [("mc", str(x).strip()) for x in req.mc] + [("dot", str(x).strip()) for x in req.dot]
+
+    def body() -> Iterator[bytes]:
+        yield b"["
+        for i, (kind, number) in enumerate(queries):
+            head = b'%s{"query":%s,"by":"%s","found":' % (b"," if i else b"", _encode(number), kind.encode())
+            try:
+                verdict = lookup(kind, number)
+            except UpstreamError as e:
+                yield head + b'false,"result":null,"error":' + _encode(str(e)) + b"}"
+                continue
+            if verdict is None:
+                yield head + b'false,"result":null}'
+            else:
+                yield head + b'true,"result":' + verdict + b"}"
+        yield b"]"
+
+    return StreamingResponse(body(), media_type="application/json")
+
+_NAMES: Optional[Tuple[List[str], PhraseIndex]] = None
+_NAMES_LOCK = threading.Lock()
+
+def name_index() -> Tuple[Sequence[str], PhraseIndex]:
+    """MC numbers and a fuzzy index over their carrier names."""
+    global _NAMES
+    with _NAMES_LOCK:
+        if _NAMES is None:
+            if SNAPSHOT is not None:
+                _NAMES = (SNAPSHOT.mcs, SNAPSHOT.names)
+            else:
+                mcs = list(CACHE)
+                _NAMES = (mcs, PhraseIndex([CACHE[mc]["carrier_name"] for mc in mcs]))
+        return _NAMES
+
+if SNAPSHOT is None:
+    # build it off the request path; a lookup arriving first waits on the lock
+    threading.Thread(target=name_index, name="carrier-names", daemon=True).start()
+
+@app.get("/carriers/lookup", dependencies=[Depends(require_api_key)])
+def lookup_carriers(
+    q: str = Query(..., min_length=1, description="What the caller said, e.g. 'MC one two three four five' or 'prairie express'"),
+    by: str = Query("any", pattern="^(any|mc|dot|name)$", description="Where to look: any|mc|dot|name"),
+    limit: int = Query(5, ge=1, le=50, description="Maximum number of candidates"),
+    min_score: float = Query(0.5, ge=0, le=1, description="Drop candidates scoring below this (1.0 = exact)"),
+):
+    """
+    Tolerant lookup for speech-to-text input: ranked candidates with a score in
+    [0, 1] and their verdicts. Numbers are matched within two edits (dropped,
+    extra or misheard digits) after spoken digits are collapsed; names by
+    word and trigram similarity. Only the CSV snapshot is searched, also in
+    proxy mode.
+    """
+    found: List[Tuple[float, str, str, str]] = []  # (score, by, value, mc)
+    # "MC one two three, four five" -> "12345"; letters and other words drop out
+    digits = "".join(c for c in spoken_code(q) if c.isdigit())
+    if digits and by in ("any", "mc"):
+        for mc, score in best(code_candidates(digits, NUMBER_CHARS, lambda c: [x for x in c if x in VERDICTS], limit), limit, min_score):
+            found.append((score, "mc", mc, mc))
+    if digits and by in ("any", "dot"):
+        for dot, score in best(code_candidates(digits, NUMBER_CHARS, lambda c: [x for x in c if x in DOT_INDEX], limit), limit, min_score):
+            found.append((score, "dot", dot, DOT_INDEX[dot]))
+    if by in ("any", "name"):
+        mcs, names = name_index()
+        for pid, score in names.search(q, limit, min_score):
+            found.append((score, "name", names.phrases[pid], mcs[pid]))
+    found.sort(key=lambda f: -f[0])
+    items = [
+        b'{"by":"%s","value":%s,"score":%s,"result":%s}' % (kind.encode(), _encode(value), _encode(score), VERDICTS[mc])
+        for score, kind, value, mc in found[:limit]
+    ]
+    return _json(b'{"query":%s,"candidates":[%s]}' % (_encode(q), b",".join(items)))
+
+@app.get("/carriers/dot/{dot}", dependencies=[Depends(require_api_key)])
+def get_carrier_by_dot(dot: str):
+    return _lookup_or_404("dot", dot)
 
 @app.get("/carriers/{mc}", dependencies=[Depends(require_api_key)])
 def get_carrier(mc: str):
-    mc_norm = str(mc).strip()
-    rec = CACHE.get(mc_norm)
-    if not rec:
-        raise HTTPException(status_code=404, detail="MC not found in cache")
-    return evaluate_eligibility(rec)
+    return _lookup_or_404("mc", mc)
@@ -0,0 +1,43 @@
+"""Carrier records from the FMCSA CSV and their pre-encoded eligibility verdicts."""
+import csv
+import json
+from typing import Any, Dict, Tuple
+
+def load_cache(path: str) -> Dict[str, Dict[str, Any]]:
+    cache: Dict[str, Dict[str, Any]] = {}
+    with open(path, newline="") as csvfile:
+        reader = csv.DictReader(csvfile)
+        for row in reader:
+            # normalize booleans and keys
+            row["mc"] = str(row["mc"]).strip()
+            row["dot"] = str(row.get("dot", "")).strip()
+            row["carrier_name"] = row.get("carrier_name", "").strip()
+            row["status"] = row.get("status", "").strip().lower()
+            row["insurance_ok"] = str(row.get("insurance_ok", "")).strip().lower() in ("true","1","yes","y")
+            row["authority_ok"] = str(row.get("authority_ok", "")).strip().lower() in ("true","1","yes","y")
+            row["reason"] = row.get("reason", "").strip()
+            cache[row["mc"]] = row
+    return cache
+
+def evaluate_eligibility(record: Dict[str, Any]) -> Dict[str, Any]:
+    eligible = (record.get("status") == "active") and record.get("insurance_ok") and record.get("authority_ok")
+    reason = record.get("reason") or ("Eligible" if eligible else "Not eligible")
+    return {
+        "eligible": eligible,
+        "reason": reason,
+        "mc": record.get("mc"),
+        "dot": record.get("dot"),
+        "carrier_name": record.get("carrier_name"),
+        "status": record.get("status"),
+        "insurance_ok": record.get("insurance_ok"),
+        "authority_ok": record.get("authority_ok"),
+    }
+
+def _encode(obj: Any) -> bytes:
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+def precompute(cache: Dict[str, Dict[str, Any]]) -> Tuple[Dict[str, bytes], Dict[str, str]]:
+    """Pre-encoded eligibility verdict per MC, plus a DOT -> MC index."""
+    verdicts = {mc: _encode(evaluate_eligibility(rec)) for mc, rec in cache.items()}
+    by_dot = {rec["dot"]: mc for mc, rec in cache.items() if rec.get("dot")}
+    return verdicts, by_dot
@@ -0,0 +1,241 @@
+"""Compiled, memory-mapped snapshot of the carrier CSV.
+
+Layout of a snapshot file::
+
+    MAGIC | u64 header length | JSON header | sections, each 8-byte aligned
+
+The header records the SHA-256 of the source CSV and where every section
+is. A string table is a section of u64 offsets plus a UTF-8 blob. The
+tables hold:
+
+- the sorted MC numbers, their verdicts and carrier names
+- the sorted DOT numbers, with a u32 array of their MC positions
+- the carrier-name fuzzy index: sorted words, u32 posting lists and the
+  common-word bitmaps
+
+Lookups binary-search the sorted tables in place. Workers that map the
+same file share its pages, so memory stays flat as workers are added and
+each one starts without parsing the CSV.
+
+Pre-build one (e.g. in the Docker image)::
+
+    python snapshot.py data/fmcsa_cache.csv data/fmcsa.snap
+"""
+import argparse
+import logging
+import mmap
+import os
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from carrier_common.fuzzy import PhraseIndex
+from carrier_common.snapshots import build_lock, csv_checksum, pad, read_header, write_sections
+from carriers import load_cache, precompute
+
+MAGIC = b"FMSNAP1\n"
+FORMAT_VERSION = 1
+ALIGN = 8
+
+log = logging.getLogger("fmcsa_fake")
+
+class Strings(Sequence[str]):
+    """Read-only string table: ``offsets[i]:offsets[i + 1]`` of ``blob`` is item i."""
+
+    def __init__(self, offsets: memoryview, blob: memoryview):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def raw(self, i: int) -> bytes:
+        return bytes(self.blob[self.offsets[i]:self.offsets[i + 1]])
+
+    def __getitem__(self, i: int) -> str:
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self.raw(i).decode("utf-8")
+
+    def find(self, key: str) -> Optional[int]:
+        """Position of ``key`` in a sorted table, or None."""
+        # UTF-8 bytes sort like the strings they encode, so probes skip decoding
+        target = key.encode("utf-8")
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.raw(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo if lo < len(self) and self.raw(lo) == target else None
+
+class SortedMap:
+    """Dict-like view (``get``, ``in``, ``[]``, ``len``) of a sorted key table and per-key values."""
+
+    def __init__(self, keys: Strings, value):
+        self.keys = keys
+        self.value = value  # position -> value
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys)
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self.keys.find(key) is not None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        i = self.keys.find(key)
+        return default if i is None else self.value(i)
+
+    def __getitem__(self, key: str) -> Any:
+        i = self.keys.find(key)
+        if i is None:
+            raise KeyError(key)
+        return self.value(i)
+
+class Slices:
+    """``items[offsets[i]:offsets[i + 1]]`` for each i, e.g. posting lists."""
+
+    def __init__(self, offsets: memoryview, items: memoryview):
+        self.offsets = offsets
+        self.items = items
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> memoryview:
+        return self.items[self.offsets[i]:self.offsets[i + 1]]
+
+class CarrierSnapshot:
+    """The mapped sections, exposed like the dicts the app builds from the CSV."""
+
+    def __init__(self, header: Dict[str, Any], buf: mmap.mmap, base: int):
+        self.buf = buf  # keeps the mapping alive
+        view = memoryview(buf)
+        sections = {
+            name: view[base + offset:base + offset + size] for name, (offset, size) in header["sections"].items()
+        }
+
+        def strings(name: str) -> Strings:
+            return Strings(sections[name + ".offsets"].cast("Q"), sections[name + ".blob"])
+
+        self.mcs = strings("mc")
+        verdicts = strings("verdict")
+        self.verdicts = SortedMap(self.mcs, verdicts.raw)
+        dot_mc = sections["dot.mc"].cast("I")
+        self.by_dot = SortedMap(strings("dot"), lambda i: self.mcs[dot_mc[i]])
+        self.number_chars: str = header["number_chars"]
+
+        words = strings("word")
+        masks = sections["mask.blob"]
+        n = len(self.mcs)
+        self.names = PhraseIndex.from_parts(
+            strings("name"),
+            SortedMap(words, lambda i: i),
+            Slices(sections["posting.offsets"].cast("Q"), sections["posting.ids"].cast("I")),
+            {wid: masks[k * n:(k + 1) * n] for k, wid in enumerate(header["masks"])},
+            header["alphabet"],
+        )
+
+    def __len__(self) -> int:
+        return len(self.mcs)
+
+def _strings(values: Sequence[bytes]) -> Tuple[bytes, bytes]:
+    offsets = array("Q", [0])
+    for v in values:
+        offsets.append(offsets[-1] + len(v))
+    return offsets.tobytes(), b"".join(values)
+
+def write_snapshot(cache: Dict[str, Dict[str, Any]], path: str, checksum: str) -> None:
+    """Compile ``cache`` (see carriers.load_cache) to ``path`` atomically (temp file + rename)."""
+    verdicts, by_dot = precompute(cache)
+    mcs = sorted(cache)
+    position = {mc: i for i, mc in enumerate(mcs)}
+    dots = sorted(by_dot)
+    names = [cache[mc]["carrier_name"] for mc in mcs]
+    index = PhraseIndex(names)
+    words = sorted(index.vocab)  # word ids become positions in sorted order
+    wids = [index.vocab[w] for w in words]
+    new_wid = {old: new for new, old in enumerate(wids)}
+    postings = array("Q", [0])
+    for old in wids:
+        postings.append(postings[-1] + len(index.postings[old]))
+    masks = sorted(index.masks, key=new_wid.__getitem__)
+
+    sections: Dict[str, bytes] = {}
+    for name, values in (
+        ("mc", [mc.encode() for mc in mcs]),
+        ("verdict", [verdicts[mc] for mc in mcs]),
+        ("dot", [d.encode() for d in dots]),
+        ("name", [n.encode() for n in names]),
+        ("word", [w.encode() for w in words]),
+    ):
+        sections[name + ".offsets"], sections[name + ".blob"] = _strings(values)
+    sections["dot.mc"] = array("I", [position[by_dot[d]] for d in dots]).tobytes()
+    sections["posting.offsets"] = postings.tobytes()
+    sections["posting.ids"] = b"".join(index.postings[old].tobytes() for old in wids)
+    sections["mask.blob"] = b"".join(bytes(index.masks[old]) for old in masks)
+
+    layout: Dict[str, List[int]] = {}
+    offset = 0
+    for name, data in sections.items():
+        layout[name] = [offset, len(data)]
+        offset += len(data) + pad(len(data), ALIGN)
+    header = {
+        "version": FORMAT_VERSION,
+        "checksum": checksum,
+        "number_chars": "".join(sorted(set("".join(mcs)) | set("".join(dots)))),
+        "alphabet": index.alphabet,
+        "masks": [new_wid[old] for old in masks],
+        "sections": layout,
+    }
+    write_sections(path, MAGIC, header, sections.values(), ALIGN)
+
+def read_snapshot(path: str, checksum: Optional[str] = None) -> Optional[CarrierSnapshot]:
+    """Map a snapshot read-only; None if it is missing, unreadable or stale."""
+    try:
+        with open(path, "rb") as f:
+            found = read_header(f, MAGIC, FORMAT_VERSION, checksum)
+            if found is None:
+                return None
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    header, base = found
+    return CarrierSnapshot(header, buf, base)
+
+def load_or_build(csv_path: str, snapshot_path: str) -> Optional[CarrierSnapshot]:
+    """Map the snapshot if it matches the CSV checksum, else compile it first.
+
+    One worker compiles while the others wait on the lock, then they all map
+    the same file. None if the snapshot cannot be written.
+    """
+    checksum = csv_checksum(csv_path)
+    snap = read_snapshot(snapshot_path, checksum)
+    if snap is not None:
+        return snap
+    with build_lock(snapshot_path):
+        snap = read_snapshot(snapshot_path, checksum)
+        if snap is None:
+            try:
+                write_snapshot(load_cache(csv_path), snapshot_path, checksum)
+            except OSError:
+                # read-only filesystem etc.: the caller serves from the CSV instead
+                log.exception("could not write snapshot %s", snapshot_path)
+                return None
+            snap = read_snapshot(snapshot_path, checksum)
+    return snap
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pre-build the binary carrier snapshot from a CSV file")
+    parser.add_argument("csv", nargs="?", default=os.environ.get("FMCSA_CACHE_PATH", "data/fmcsa_cache.csv"))
+    parser.add_argument("snapshot", nargs="?", default=os.environ.get("FMCSA_SNAPSHOT", "data/fmcsa.snap"))
+    args = parser.parse_args()
+    cache = load_cache(args.csv)
+    write_snapshot(cache, args.snapshot, csv_checksum(args.csv))
+    print(f"wrote {args.snapshot}: {len(cache)} carriers")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+import importlib
+import os
+import sys
+
+import pytest
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# the service modules import each other by their flat names (run pytest from any directory);
+# carrier_common is used from the checkout, installed or not
+sys.path[:0] = [SERVICE_DIR, os.path.join(os.path.dirname(SERVICE_DIR), "common")]
+
+@pytest.fixture
+def load_app(tmp_path, monkeypatch):
+    """Import a fresh ``app`` module serving the carriers in ``csv_text``."""
+    def load(csv_text: str, **env: str):
+        path = tmp_path / "fmcsa.csv"
+        path.write_text(csv_text, encoding="utf-8")
+        settings = {"FMCSA_CACHE_PATH": str(path), "FMCSA_SNAPSHOT": "", "FMCSA_UPSTREAM_URL": "", "API_KEY": "test-key", **env}
+        for name, value in settings.items():
+            monkeypatch.setenv(name, value)
+        sys.modules.pop("app", None)
+        return importlib.import_module("app")
+
+    yield load
+    sys.modules.pop("app", None)
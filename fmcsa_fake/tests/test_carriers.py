@@ -0,0 +1,52 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from test_snapshot import CSV
+
+@pytest.fixture
+def client(load_app):
+    return TestClient(load_app(CSV, BATCH_MAX="4").app, headers={"X-API-Key": "test-key"})
+
+def _batch(client, **numbers):
+    response = client.post("/carriers/batch", json=numbers)
+    assert response.status_code == 200 and response.headers["content-type"] == "application/json"
+    assert "content-length" not in response.headers  # streamed as the verdicts are looked up
+    return json.loads(response.content)
+
+def test_batch_answers_in_request_order(client):
+    answers = _batch(client, mc=["654321", "123456", " 099887 "], dot=["444333"])
+    assert [(a["by"], a["query"], a["found"]) for a in answers] == [
+        ("mc", "654321", True), ("mc", "123456", True), ("mc", "099887", True), ("dot", "444333", True),
+    ]
+    assert [a["result"]["carrier_name"] for a in answers] == [
+        "Beta Transport Inc", "Alpha Logistics LLC", "Alpha Freight Lines", "Alpha Freight Lines",
+    ]
+    assert answers[0]["result"]["eligible"] is False and answers[0]["result"]["reason"] == "Insurance not on file"
+    assert answers[1]["result"]["eligible"] is True
+
+def test_batch_mixes_hits_and_misses(client):
+    answers = _batch(client, mc=["000000", "123456"], dot=["987654", "1"])
+    assert [(a["query"], a["found"]) for a in answers] == [("000000", False), ("123456", True), ("987654", True), ("1", False)]
+    assert answers[0]["result"] is None and answers[3]["result"] is None
+    assert answers[2]["result"]["mc"] == "123456"
+    assert _batch(client) == []
+
+def test_batch_size_is_limited(client):
+    assert client.post("/carriers/batch", json={"mc": ["1", "2", "3"], "dot": ["4"]}).status_code == 200
+    response = client.post("/carriers/batch", json={"mc": ["1", "2", "3"], "dot": ["4", "5"]})
+    assert response.status_code == 413 and response.json()["detail"] == "At most 4 numbers per batch"
+
+def test_dot_lookup(client):
+    response = client.get("/carriers/dot/555111")
+    assert response.status_code == 200 and response.json()["mc"] == "111222"
+    assert response.json()["reason"] == "Authority inactive"
+    # the MC lookup answers with the same verdict
+    assert client.get("/carriers/111222").content == response.content
+    missing = client.get("/carriers/dot/000001")
+    assert missing.status_code == 404 and missing.json()["detail"] == "DOT not found in cache"
+
+def test_endpoints_need_the_api_key(client):
+    assert client.get("/carriers/dot/555111", headers={"X-API-Key": "wrong"}).status_code == 401
+    assert client.post("/carriers/batch", json={"mc": ["123456"]}, headers={"X-API-Key": ""}).status_code == 401
@@ -0,0 +1,46 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from test_snapshot import CSV
+
+@pytest.fixture
+def lookup(load_app):
+    client = TestClient(load_app(CSV).app, headers={"X-API-Key": "test-key"})
+
+    def get(q, **params):
+        response = client.get("/carriers/lookup", params=dict(params, q=q))
+        assert response.status_code == 200, response.text
+        body = response.json()
+        assert body["query"] == q
+        return [(c["by"], c["value"], c["score"], c["result"]["mc"]) for c in body["candidates"]]
+    get.client = client
+    return get
+
+def test_spoken_numbers(lookup):
+    assert lookup("MC one two three four five six") == [("mc", "123456", 1.0, "123456")]
+    # a dropped digit is one edit away
+    assert lookup("one two three four five") == [("mc", "123456", 0.833, "123456")]
+    # a DOT candidate carries the verdict of its MC
+    assert lookup("nine eight seven six five four", by="dot") == [("dot", "987654", 1.0, "123456")]
+    assert lookup("mc 12345", by="dot") == []
+
+def test_names(lookup):
+    assert lookup("alpha logistics") == [("name", "Alpha Logistics LLC", 0.889, "123456")]
+    assert lookup("alfa freight lines", by="name") == [("name", "Alpha Freight Lines", 0.821, "099887")]
+    assert lookup("prairie expres")[0][1:] == ("Prairie Express Zürich", 0.737, "222333")
+
+def test_limit_and_min_score(lookup):
+    assert lookup("alpha") == []
+    both = lookup("alpha", min_score=0.2)
+    assert [c[1] for c in both] == ["Alpha Logistics LLC", "Alpha Freight Lines"]
+    assert lookup("alpha", min_score=0.2, limit=1) == both[:1]
+    assert lookup("one two three four five", min_score=0.9) == []
+
+def test_nothing_to_match(lookup):
+    for q in ("zzz", "   ", "mc"):
+        assert lookup(q) == [], q
+
+def test_invalid_parameters(lookup):
+    client = lookup.client
+    for params in ({}, {"q": ""}, {"q": "a", "limit": 0}, {"q": "a", "by": "phone"}, {"q": "a", "min_score": -1}):
+        assert client.get("/carriers/lookup", params=params).status_code == 422, params
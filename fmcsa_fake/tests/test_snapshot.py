@@ -0,0 +1,60 @@
+import snapshot
+from carrier_common.fuzzy import PhraseIndex
+from carriers import load_cache, precompute
+from snapshot import csv_checksum, load_or_build, read_snapshot, write_snapshot
+
+CSV = """mc,dot,carrier_name,status,insurance_ok,authority_ok,reason
+123456,987654,Alpha Logistics LLC,active,true,true,
+654321,123987,Beta Transport Inc,active,false,true,Insurance not on file
+111222,555111,Gamma Freight Co,inactive,true,true,Authority inactive
+222333,,Prairie Express Zürich,active,true,false,Operating authority not granted
+099887,444333,Alpha Freight Lines,ACTIVE,yes,1,
+"""
+
+def _write(tmp_path, text=CSV):
+    path = tmp_path / "fmcsa.csv"
+    path.write_text(text, encoding="utf-8")
+    return str(path), str(tmp_path / "fmcsa.snap")
+
+def test_round_trip(tmp_path):
+    csv_path, snap_path = _write(tmp_path)
+    cache = load_cache(csv_path)
+    write_snapshot(cache, snap_path, csv_checksum(csv_path))
+    snap = read_snapshot(snap_path, csv_checksum(csv_path))
+    assert snap is not None and len(snap) == len(cache)
+
+    verdicts, by_dot = precompute(cache)
+    assert {mc: snap.verdicts[mc] for mc in snap.verdicts} == verdicts
+    assert {dot: snap.by_dot[dot] for dot in snap.by_dot} == by_dot
+    assert snap.verdicts.get("000000") is None and "000000" not in snap.verdicts
+    assert set(snap.number_chars) == set("".join(cache) + "".join(by_dot))
+
+    # the mapped name index ranks like one built from the CSV
+    mcs = sorted(cache)
+    names = PhraseIndex([cache[mc]["carrier_name"] for mc in mcs])
+    for query in ("alpha", "prairie expres", "beta transport", "zurich", "nothing like it"):
+        assert snap.names.search(query, min_score=0.2) == names.search(query, min_score=0.2)
+
+def test_stale_checksum_and_other_versions_are_rejected(tmp_path, monkeypatch):
+    csv_path, snap_path = _write(tmp_path)
+    checksum = csv_checksum(csv_path)
+    write_snapshot(load_cache(csv_path), snap_path, checksum)
+    assert read_snapshot(snap_path, "0" * 64) is None
+    assert read_snapshot(snap_path) is not None
+    monkeypatch.setattr(snapshot, "FORMAT_VERSION", snapshot.FORMAT_VERSION + 1)
+    assert read_snapshot(snap_path, checksum) is None
+    monkeypatch.undo()
+    with open(snap_path, "wb") as f:
+        f.write(b"not a snapshot")
+    assert read_snapshot(snap_path, checksum) is None
+    assert read_snapshot(snap_path + ".missing", checksum) is None
+
+def test_load_or_build_rebuilds_a_stale_snapshot(tmp_path):
+    csv_path, snap_path = _write(tmp_path)
+    first = load_or_build(csv_path, snap_path)
+    assert first is not None and "555555" not in first.verdicts
+    with open(csv_path, "a", encoding="utf-8") as f:
+        f.write("555555,777777,Omega Haulers,active,true,true,\n")
+    second = load_or_build(csv_path, snap_path)
+    assert second.by_dot["777777"] == "555555"
+    assert read_snapshot(snap_path, csv_checksum(csv_path)) is not None
@@ -0,0 +1,74 @@
+import json
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import uvicorn
+
+os.environ.setdefault("STUB_PATH", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "fmcsa_cache.csv"))
+
+import upstream_stub
+from carriers import _encode, evaluate_eligibility
+from upstream import CarrierResolver, QCMobileClient, TTLCache, UpstreamError
+
+@pytest.fixture(scope="module")
+def stub_url():
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    server = uvicorn.Server(uvicorn.Config(upstream_stub.app, log_level="warning"))
+    thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    yield "http://127.0.0.1:%d" % sock.getsockname()[1]
+    server.should_exit = True
+    thread.join()
+
+@pytest.fixture
+def calls():
+    """Upstream requests made during the test."""
+    start = upstream_stub.CALLS
+    return lambda: upstream_stub.CALLS - start
+
+def _resolver(url, timeout=5.0):
+    encode = lambda record: _encode(evaluate_eligibility(record))
+    return CarrierResolver(lambda kind, number: None, encode, QCMobileClient(url, "key", timeout), TTLCache())
+
+def test_concurrent_misses_share_one_request(stub_url, calls, monkeypatch):
+    monkeypatch.setattr(upstream_stub, "STUB_LATENCY_MS", 300)
+    resolver = _resolver(stub_url)
+    with ThreadPoolExecutor(16) as pool:
+        results = list(pool.map(lambda _: resolver.lookup("mc", "123456"), range(16)))
+    assert calls() == 1
+    assert len(set(results)) == 1 and json.loads(results[0])["carrier_name"] == "Alpha Logistics LLC"
+    stats = resolver.stats()
+    assert stats["upstream_calls"] == 1 and stats["coalesced"] == 15
+    # now cached
+    resolver.lookup("mc", "123456")
+    assert calls() == 1 and resolver.stats()["lru_hits"] == 1
+
+def test_dot_lookup_fills_in_the_mc_number(stub_url, calls):
+    verdict = json.loads(_resolver(stub_url).lookup("dot", "987654"))
+    assert verdict["mc"] == "123456" and verdict["dot"] == "987654"
+    assert calls() == 2  # the carrier, then its docket numbers
+
+def test_unknown_numbers_are_cached_negatively(stub_url, calls):
+    resolver = _resolver(stub_url)
+    assert resolver.lookup("mc", "999999999") is None
+    assert resolver.lookup("dot", "999999999") is None
+    assert resolver.lookup("mc", "999999999") is None
+    assert calls() == 2 and resolver.stats()["negative_hits"] == 1
+
+def test_stale_entry_is_served_when_the_upstream_fails(stub_url):
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        dead = "http://127.0.0.1:%d" % sock.getsockname()[1]
+    resolver = _resolver(dead, timeout=1.0)
+    resolver.cache.put(("mc", "123456"), b"stale", ttl=0)
+    assert resolver.lookup("mc", "123456") == b"stale"
+    with pytest.raises(UpstreamError):
+        resolver.lookup("mc", "654321")
+    assert resolver.stats()["stale_served"] == 1
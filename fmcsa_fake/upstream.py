@@ -0,0 +1,220 @@
+"""Caching front for the FMCSA QCMobile API.
+
+Lookup order for a carrier:
+
+1. in-memory LRU, entries expire by status (active / other / not found)
+2. the local CSV snapshot (warm tier)
+3. the upstream API, with concurrent misses for the same number coalesced
+   into a single request
+
+Unknown numbers are cached negatively so retries don't reach the upstream.
+If the upstream fails, an expired entry is served when one is available.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from urllib.error import HTTPError, URLError
+from urllib.parse import quote, urlencode
+from urllib.request import Request, urlopen
+
+class UpstreamError(Exception):
+    pass
+
+class TTLCache:
+    """LRU map whose entries carry their own expiry; expired entries stay
+    readable (as stale) until evicted."""
+
+    def __init__(self, max_entries: int = 100_000):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Tuple[bool, Any]]:
+        """``(fresh, value)`` or None if the key was never cached (or evicted)."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            self.entries.move_to_end(key)
+            expires, value = entry
+            return (time.monotonic() < expires, value)
+
+    def put(self, key: Hashable, value: Any, ttl: float) -> None:
+        with self.lock:
+            self.entries[key] = (time.monotonic() + ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+class SingleFlight:
+    """Run at most one call per key at a time; concurrent callers share its result."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls: Dict[Hashable, Future] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Return ``(result, shared)``; ``shared`` is True for callers that waited on another's call."""
+        with self.lock:
+            future = self.calls.get(key)
+            leader = future is None
+            if leader:
+                future = self.calls[key] = Future()
+        if not leader:
+            return future.result(), True
+        try:
+            result = fn()
+            future.set_result(result)
+            return result, False
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+
+def record_from_qcmobile(carrier: Dict[str, Any], mc: str = "") -> Dict[str, Any]:
+    """Map a QCMobile ``carrier`` object onto the CSV record shape."""
+    def amount(field: str) -> float:
+        try:
+            return float(carrier.get(field) or 0)
+        except (TypeError, ValueError):
+            return 0.0
+
+    on_file = amount("bipdInsuranceOnFile")
+    required = carrier.get("bipdInsuranceRequired") == "Y"
+    insurance_ok = on_file > 0 and (not required or on_file >= amount("bipdRequiredAmount"))
+    authority_ok = carrier.get("allowedToOperate") == "Y"
+    reason = ""
+    if not authority_ok:
+        reason = "Not allowed to operate"
+    elif not insurance_ok:
+        reason = "Insurance not on file"
+    return {
+        "mc": mc,
+        "dot": str(carrier.get("dotNumber") or ""),
+        "carrier_name": (carrier.get("legalName") or carrier.get("dbaName") or "").strip(),
+        "status": "active" if carrier.get("statusCode") == "A" else "inactive",
+        "insurance_ok": insurance_ok,
+        "authority_ok": authority_ok,
+        "reason": reason,
+    }
+
+class QCMobileClient:
+    def __init__(self, base_url: str, webkey: str, timeout: float = 5.0):
+        self.base_url = base_url.rstrip("/")
+        self.webkey = webkey
+        self.timeout = timeout
+
+    def _get(self, path: str) -> Any:
+        """The ``content`` of a QCMobile response; None if the upstream answers 404."""
+        url = "%s%s?%s" % (self.base_url, path, urlencode({"webKey": self.webkey}))
+        try:
+            with urlopen(Request(url, headers={"Accept": "application/json"}), timeout=self.timeout) as res:
+                payload = json.load(res)
+        except HTTPError as e:
+            if e.code == 404:
+                return None
+            raise UpstreamError(f"upstream returned {e.code}") from e
+        except (URLError, TimeoutError, ValueError) as e:
+            raise UpstreamError(f"upstream request failed: {e}") from e
+        return payload.get("content") if isinstance(payload, dict) else None
+
+    def fetch(self, kind: str, number: str) -> Optional[Dict[str, Any]]:
+        """Carrier record for an MC (docket) or DOT number; None if unknown upstream."""
+        if kind == "mc":
+            content = self._get("/carriers/docket-number/%s" % quote(number, safe=""))
+        else:
+            content = self._get("/carriers/%s" % quote(number, safe=""))
+        if isinstance(content, list):
+            content = content[0] if content else None
+        carrier = content.get("carrier") if isinstance(content, dict) else None
+        if not carrier:
+            return None
+        # the carrier object has no docket number: a DOT lookup asks for it separately
+        mc = number if kind == "mc" else self.mc_number(number)
+        return record_from_qcmobile(carrier, mc=mc)
+
+    def mc_number(self, dot: str) -> str:
+        """The carrier's MC docket number, "" if it has none."""
+        content = self._get("/carriers/%s/docket-numbers" % quote(dot, safe=""))
+        for docket in content if isinstance(content, list) else ():
+            if isinstance(docket, dict) and docket.get("prefix") == "MC" and docket.get("docketNumber"):
+                return str(docket["docketNumber"])
+        return ""
+
+class CarrierResolver:
+    """Resolve ``(kind, number)`` to pre-encoded verdict bytes through the tiers above."""
+
+    def __init__(
+        self,
+        warm: Callable[[str, str], Optional[bytes]],
+        encode: Callable[[Dict[str, Any]], bytes],
+        client: QCMobileClient,
+        cache: TTLCache,
+        ttl_active: float = 86400,
+        ttl_other: float = 3600,
+        ttl_negative: float = 600,
+    ):
+        self.warm = warm
+        self.encode = encode
+        self.client = client
+        self.cache = cache
+        self.ttl_active = ttl_active
+        self.ttl_other = ttl_other
+        self.ttl_negative = ttl_negative
+        self.flight = SingleFlight()
+        self.counts = {"lru_hits": 0, "negative_hits": 0, "warm_hits": 0, "upstream_calls": 0,
+                       "coalesced": 0, "stale_served": 0, "upstream_errors": 0}
+        self.lock = threading.Lock()
+
+    def _count(self, name: str) -> None:
+        with self.lock:
+            self.counts[name] += 1
+
+    def lookup(self, kind: str, number: str) -> Optional[bytes]:
+        key = (kind, number)
+        cached = self.cache.get(key)
+        if cached is not None and cached[0]:
+            self._count("lru_hits" if cached[1] is not None else "negative_hits")
+            return cached[1]
+        verdict = self.warm(kind, number)
+        if verdict is not None:
+            self._count("warm_hits")
+            return verdict
+        result, shared = self.flight.do(key, lambda: self._fetch(key, cached))
+        if shared:
+            self._count("coalesced")
+        return result
+
+    def _fetch(self, key: Tuple[str, str], stale: Optional[Tuple[bool, Any]]) -> Optional[bytes]:
+        self._count("upstream_calls")
+        try:
+            record = self.client.fetch(*key)
+        except UpstreamError:
+            self._count("upstream_errors")
+            if stale is not None:
+                self._count("stale_served")
+                return stale[1]
+            raise
+        if record is None:
+            self.cache.put(key, None, self.ttl_negative)
+            return None
+        verdict = self.encode(record)
+        self.cache.put(key, verdict, self.ttl_active if record["status"] == "active" else self.ttl_other)
+        return verdict
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            counts = dict(self.counts)
+        served = counts["lru_hits"] + counts["negative_hits"] + counts["warm_hits"] + counts["coalesced"]
+        total = served + counts["upstream_calls"]
+        counts["lru_entries"] = len(self.cache)
+        counts["hit_ratio"] = round(served / total, 4) if total else None
+        return counts
@@ -0,0 +1,82 @@
+"""Local stand-in for the FMCSA QCMobile API, for exercising proxy mode.
+
+Serves QCMobile-shaped responses from a CSV in the same format as the
+service's cache, with optional latency and a call counter::
+
+    STUB_PATH=data/fmcsa_cache.csv STUB_LATENCY_MS=200 uvicorn upstream_stub:app --port 8011
+    FMCSA_UPSTREAM_URL=http://localhost:8011 FMCSA_CACHE_PATH=/dev/null uvicorn app:app --port 8001
+"""
+import csv
+import os
+import threading
+import time
+from typing import Any, Dict
+
+from fastapi import FastAPI, HTTPException
+
+STUB_PATH = os.environ.get("STUB_PATH", "data/fmcsa_cache.csv")
+STUB_LATENCY_MS = float(os.environ.get("STUB_LATENCY_MS", "0"))
+
+app = FastAPI(title="QCMobile stub")
+
+def _truthy(value: str) -> bool:
+    return str(value).strip().lower() in ("true", "1", "yes", "y")
+
+def _carrier(row: Dict[str, str]) -> Dict[str, Any]:
+    return {
+        "dotNumber": int(row["dot"]) if row.get("dot", "").strip().isdigit() else None,
+        "legalName": row.get("carrier_name", "").strip(),
+        "statusCode": "A" if row.get("status", "").strip().lower() == "active" else "I",
+        "allowedToOperate": "Y" if _truthy(row.get("authority_ok", "")) else "N",
+        "bipdInsuranceRequired": "Y",
+        "bipdRequiredAmount": "750",
+        "bipdInsuranceOnFile": "1000" if _truthy(row.get("insurance_ok", "")) else "0",
+    }
+
+BY_MC: Dict[str, Dict[str, Any]] = {}
+BY_DOT: Dict[str, Dict[str, Any]] = {}
+MC_BY_DOT: Dict[str, str] = {}
+with open(STUB_PATH, newline="") as f:
+    for row in csv.DictReader(f):
+        carrier = _carrier(row)
+        BY_MC[row["mc"].strip()] = carrier
+        if row.get("dot", "").strip():
+            BY_DOT[row["dot"].strip()] = carrier
+            MC_BY_DOT[row["dot"].strip()] = row["mc"].strip()
+
+CALLS = 0
+_lock = threading.Lock()
+
+def _hit() -> None:
+    global CALLS
+    with _lock:
+        CALLS += 1
+    if STUB_LATENCY_MS:
+        time.sleep(STUB_LATENCY_MS / 1000)
+
+@app.get("/stats")
+def stats():
+    return {"calls": CALLS}
+
+@app.get("/carriers/docket-number/{mc}")
+def by_docket(mc: str, webKey: str = ""):
+    _hit()
+    carrier = BY_MC.get(mc)
+    return {"content": [{"carrier": carrier}] if carrier else []}
+
+@app.get("/carriers/{dot}/docket-numbers")
+def docket_numbers(dot: str, webKey: str = ""):
+    _hit()
+    if dot not in BY_DOT:
+        raise HTTPException(status_code=404, detail="not found")
+    mc = MC_BY_DOT[dot]
+    dockets = [{"docketNumber": int(mc) if mc.isdigit() else mc, "prefix": "MC", "dotNumber": int(dot) if dot.isdigit() else None}]
+    return {"content": dockets if mc else []}
+
+@app.get("/carriers/{dot}")
+def by_dot(dot: str, webKey: str = ""):
+    _hit()
+    carrier = BY_DOT.get(dot)
+    if carrier is None:
+        raise HTTPException(status_code=404, detail="not found")
+    return {"content": {"carrier": carrier}}
@@ -0,0 +1,90 @@
+import itertools
+import os
+import subprocess
+import sys
+
+import pytest
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATABASE_DIR = os.path.join(os.path.dirname(API_DIR), "database")
+# the service modules import each other by their flat names (run pytest from any directory);
+# carrier_common is used from the checkout, installed or not
+sys.path[:0] = [API_DIR, os.path.join(os.path.dirname(os.path.dirname(API_DIR)), "common")]
+
+psycopg2 = pytest.importorskip("psycopg2")
+
+_names = itertools.count()
+
+def run_sql(url: str, sql: str, args=None) -> None:
+    conn = psycopg2.connect(url)
+    try:
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(sql, args)
+    finally:
+        conn.close()
+
+def run_file(url: str, path: str) -> None:
+    """Run a SQL file, relative to metrics_ui/database."""
+    with open(os.path.join(DATABASE_DIR, path)) as f:
+        run_sql(url, f.read())
+
+def run_psql(url: str, path: str) -> None:
+    """Run a SQL file, relative to metrics_ui/database, with psql (as the postgres image runs init.sql)."""
+    from pgserver.postgres_server import POSTGRES_BIN_PATH
+
+    subprocess.run([str(POSTGRES_BIN_PATH / "psql"), "-X", "-q", "-v", "ON_ERROR_STOP=1", "-d", url,
+                    "-f", os.path.join(DATABASE_DIR, path)], check=True, stdout=subprocess.DEVNULL)
+
+def migration_names() -> list:
+    """The migrations init.sql includes, in order."""
+    with open(os.path.join(DATABASE_DIR, "init.sql")) as f:
+        return [os.path.basename(line.split()[1]) for line in f if line.startswith("\\ir ")]
+
+def query(url: str, sql: str, args=None) -> list:
+    conn = psycopg2.connect(url)
+    try:
+        with conn.cursor() as cur:
+            cur.execute(sql, args)
+            return cur.fetchall()
+    finally:
+        conn.close()
+
+@pytest.fixture(scope="session")
+def pg_server(tmp_path_factory):
+    """A throwaway PostgreSQL server (pgserver), shared by the whole session."""
+    pgserver = pytest.importorskip("pgserver")
+    server = pgserver.get_server(str(tmp_path_factory.mktemp("pgdata")), cleanup_mode="stop")
+    yield server
+    server.cleanup()
+
+def _new_database(server) -> str:
+    name = "test_%d_%d" % (os.getpid(), next(_names))
+    run_sql(server.get_uri(), f"CREATE DATABASE {name}")
+    return server.get_uri(name)
+
+@pytest.fixture
+def database(pg_server):
+    """URL of a new database created from init.sql."""
+    url = _new_database(pg_server)
+    run_psql(url, "init.sql")
+    return url
+
+@pytest.fixture
+def baseline_database(pg_server):
+    """URL of a new database with the schema as first shipped: init.sql without its migrations."""
+    url = _new_database(pg_server)
+    with open(os.path.join(DATABASE_DIR, "init.sql")) as f:
+        run_sql(url, "".join(line for line in f if not line.startswith("\\")))
+    return url
+
+@pytest.fixture
+def api(database, monkeypatch):
+    """The app module, with its pool connected to ``database``."""
+    import app
+
+    pool = app.ConnectionPool(database, 1, 4, 5)
+    monkeypatch.setattr(app, "POOL", pool)
+    monkeypatch.setattr(app, "BUFFER", None)
+    yield app
+    pool.close()
@@ -0,0 +1,126 @@
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from conftest import psycopg2
+
+def _row(duration=60, mc="123456"):
+    now = datetime(2025, 10, 1, 12, tzinfo=timezone.utc)
+    return (mc, Decimal("1000.00"), Decimal("900.00"), True, Decimal("10.00"), "happy", "successful", duration, now)
+
+def _stored(api):
+    with api.get_conn() as conn, conn.cursor() as cur:
+        cur.execute("SELECT mc_number, duration FROM calls ORDER BY call_id")
+        return cur.fetchall()
+
+def _buffer(api, **kwargs):
+    # a long interval keeps the background thread out of the way: the tests flush themselves
+    options = dict(max_rows=1000, interval=60, max_queued=100, max_backoff=30)
+    options.update(kwargs)
+    return api.CallBuffer(**options)
+
+def test_a_rejected_batch_is_retried_row_by_row(api):
+    buffer = _buffer(api)
+    try:
+        for row in [_row(mc="A"), _row(duration=2**40, mc="B"), _row(mc="C")]:
+            buffer.add(row)
+        assert buffer.flush()
+        assert _stored(api) == [("A", 60), ("C", 60)]
+        assert buffer.stats() == {"queued": 0, "flushed": 2, "failures": 0, "dropped": 1, "backoff_s": 0}
+    finally:
+        buffer.close()
+
+def _down(rows):
+    raise psycopg2.OperationalError("connection refused")
+
+def test_an_unreachable_database_keeps_rows_and_backs_off(api, monkeypatch):
+    attempts = []
+
+    def down(rows):
+        attempts.append(len(rows))
+        _down(rows)
+
+    real_insert = api.insert_rows
+    monkeypatch.setattr(api, "insert_rows", down)
+    buffer = _buffer(api, max_rows=2, interval=0.05, max_backoff=0.4)
+    try:
+        buffer.add(_row(mc="A"))
+        buffer.add(_row(mc="B"))  # a full batch wakes the flusher at once
+        time.sleep(1.0)
+        # 0.05, 0.1, 0.2, 0.4, 0.4 ... seconds apart rather than a hot loop
+        assert 3 <= len(attempts) <= 7
+        assert set(attempts) == {2}
+        stats = buffer.stats()
+        # (an attempt may be under way, counted in attempts but not yet in failures)
+        assert stats["queued"] in (0, 2) and len(attempts) - 1 <= stats["failures"] <= len(attempts)
+        assert stats["backoff_s"] == 0.4
+        # the database comes back: the queued rows are written on the next attempt
+        monkeypatch.setattr(api, "insert_rows", real_insert)
+        deadline = time.monotonic() + 2
+        while buffer.stats()["queued"] and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert _stored(api) == [("A", 60), ("B", 60)]
+        assert buffer.stats()["backoff_s"] == 0
+    finally:
+        buffer.close()
+
+def test_an_outage_during_the_row_by_row_retry_keeps_the_rest(api, monkeypatch):
+    real_insert = api.insert_rows
+    calls = []
+
+    def flaky(rows):
+        calls.append(rows)
+        if len(calls) == 1:
+            raise psycopg2.DataError("value out of range")
+        if len(calls) == 3:
+            raise psycopg2.OperationalError("server closed the connection")
+        return real_insert(rows)
+
+    monkeypatch.setattr(api, "insert_rows", flaky)
+    buffer = _buffer(api)
+    try:
+        for mc in "ABC":
+            buffer.add(_row(mc=mc))
+        assert not buffer.flush()
+        assert _stored(api) == [("A", 60)]
+        assert [r[0] for r in buffer.rows] == ["B", "C"] and buffer.stats()["dropped"] == 0
+    finally:
+        monkeypatch.setattr(api, "insert_rows", real_insert)
+        buffer.close()
+    assert [mc for mc, _ in _stored(api)] == ["A", "B", "C"]
+
+def test_a_full_buffer_answers_503(api, monkeypatch):
+    monkeypatch.setattr(api, "insert_rows", _down)
+    buffer = _buffer(api, max_queued=3)
+    monkeypatch.setattr(api, "BUFFER", buffer)
+    client = TestClient(api.app, headers={"X-API-Key": api.API_KEY})
+    event = {
+        "mc_number": "123456", "original_price": 1000, "agreed_price": 900, "had_discount": True,
+        "discount_rate": 10, "sentiment": "happy", "outcome": "successful", "duration": 60,
+        "timestamp": "2025-10-01T12:00:00Z",
+    }
+    try:
+        for _ in range(3):
+            assert client.post("/calls", json=event).json() == {"ok": True, "queued": True}
+        response = client.post("/calls", json=event)
+        assert response.status_code == 503 and "Retry-After" in response.headers
+        assert client.post("/calls/batch", json=[event]).status_code == 503
+        with pytest.raises(HTTPException):
+            buffer.add(_row())
+        assert buffer.stats()["queued"] == 3
+    finally:
+        buffer.rows.clear()
+        buffer.close()
+
+def test_duration_must_fit_the_column(api):
+    client = TestClient(api.app, headers={"X-API-Key": api.API_KEY})
+    event = {
+        "mc_number": "123456", "original_price": 1000, "sentiment": "happy", "outcome": "successful",
+        "duration": 2**31, "timestamp": "2025-10-01T12:00:00Z",
+    }
+    assert client.post("/calls", json=event).status_code == 422
+    assert client.post("/calls/batch", json=[event]).status_code == 422
@@ -0,0 +1,51 @@
+from fastapi.testclient import TestClient
+
+from test_rollup import insert_calls
+
+SERIES = ("duration_evolution", "sales_evolution", "discount_evolution")
+TOTALS = ("total_duration_seconds", "total_sales_volume", "satisfaction", "success")
+
+def _client(api, monkeypatch):
+    monkeypatch.setattr(api, "DASHBOARD_CACHE", api.ResultCache(0))
+    return TestClient(api.app, headers={"X-API-Key": api.API_KEY})
+
+def test_dashboard_matches_the_single_metrics(api, database, monkeypatch):
+    insert_calls(database, 400)
+    client = _client(api, monkeypatch)
+    for days in (1, 14, 90):
+        board = client.get("/metrics/dashboard", params={"days": days}).json()
+        assert board["days"] == days
+        assert board["total_duration_seconds"] == client.get("/metrics/total_duration").json()["total_duration_seconds"]
+        assert board["total_sales_volume"] == client.get("/metrics/total_sales_volume").json()["total_sales_volume"]
+        for name in ("satisfaction", "success"):
+            assert board[name] == client.get(f"/metrics/{name}").json()
+        for name in SERIES:
+            assert board[name] == client.get(f"/metrics/{name}", params={"days": days}).json(), (name, days)
+
+def test_dashboard_parts(api, database, monkeypatch):
+    insert_calls(database, 100)
+    client = _client(api, monkeypatch)
+    board = client.get("/metrics/dashboard", params={"days": 30}).json()
+    totals = client.get("/metrics/dashboard", params={"part": "totals"}).json()
+    series = client.get("/metrics/dashboard", params={"part": "series", "days": 30}).json()
+    assert set(totals) == set(TOTALS) and set(series) == {"days", *SERIES}
+    assert {**totals, **series} == board
+    assert client.get("/metrics/dashboard", params={"part": "other"}).status_code == 422
+
+def test_dashboard_of_an_empty_database(api, monkeypatch):
+    client = _client(api, monkeypatch)
+    board = client.get("/metrics/dashboard", params={"days": 7}).json()
+    assert board == {
+        "days": 7, "total_duration_seconds": 0, "total_sales_volume": 0.0, "satisfaction": [], "success": [],
+        "duration_evolution": [], "sales_evolution": [], "discount_evolution": [],
+    }
+
+def test_totals_are_cached_apart_from_the_window(api, database):
+    insert_calls(database, 20)
+    client = TestClient(api.app, headers={"X-API-Key": api.API_KEY})
+    api.DASHBOARD_CACHE.invalidate()
+    client.get("/metrics/dashboard", params={"part": "totals", "days": 7})
+    client.get("/metrics/dashboard", params={"part": "series", "days": 7})
+    client.get("/metrics/dashboard", params={"part": "series", "days": 30})
+    # the totals do not depend on days: one entry for them, one per window
+    assert set(api.DASHBOARD_CACHE.entries) == {("totals", None), ("series", 7), ("series", 30)}
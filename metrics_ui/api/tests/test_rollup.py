@@ -0,0 +1,167 @@
+import os
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from conftest import DATABASE_DIR, migration_names, psycopg2, query, run_file, run_sql
+
+ROLLUP = """
+    SELECT day, calls, total_duration, discount_rate_sum, sales_volume, successful, unsuccessful,
+           outcome_na, happy, neutral, upset, sentiment_na
+    FROM calls_daily WHERE calls <> 0 ORDER BY day
+"""
+RAW = """
+    SELECT (timestamp AT TIME ZONE 'UTC')::date, COUNT(*), SUM(duration), SUM(discount_rate),
+           COALESCE(SUM(agreed_price) FILTER (WHERE outcome = 'successful'), 0),
+           COUNT(*) FILTER (WHERE outcome = 'successful'), COUNT(*) FILTER (WHERE outcome = 'unsuccessful'),
+           COUNT(*) FILTER (WHERE outcome = 'n/a'), COUNT(*) FILTER (WHERE sentiment = 'happy'),
+           COUNT(*) FILTER (WHERE sentiment = 'neutral'), COUNT(*) FILTER (WHERE sentiment = 'upset'),
+           COUNT(*) FILTER (WHERE sentiment = 'n/a')
+    FROM calls GROUP BY 1 ORDER BY 1
+"""
+
+def insert_calls(url, n, seed=1, start=None):
+    """Insert ``n`` random calls over the 60 days before ``start`` (now by default)."""
+    rnd = random.Random(seed)
+    start = start or datetime.now(timezone.utc)
+    rows = []
+    for _ in range(n):
+        agreed = rnd.choice([None, rnd.randint(500, 3000)])
+        rows.append((
+            str(rnd.randint(100000, 999999)), rnd.randint(500, 3000), agreed, agreed is not None,
+            rnd.choice([0, 5, 12.5]), rnd.choice(["happy", "neutral", "upset", "n/a"]),
+            rnd.choice(["successful", "unsuccessful", "n/a"]), rnd.randint(0, 900),
+            start - timedelta(minutes=rnd.randint(0, 60 * 24 * 60)),
+        ))
+    values = ",".join(["(%s,%s,%s,%s,%s,%s,%s,%s,%s)"] * n)
+    run_sql(url, f"""
+        INSERT INTO calls (mc_number, original_price, agreed_price, had_discount, discount_rate,
+                           sentiment, outcome, duration, timestamp) VALUES {values}""", [v for r in rows for v in r])
+
+def assert_rollup_matches(url):
+    assert query(url, ROLLUP) == query(url, RAW)
+
+def test_rollup_follows_inserts_updates_and_deletes(database):
+    insert_calls(database, 300)
+    assert_rollup_matches(database)
+    # moves rows across days (and monthly partitions), changes outcomes and amounts
+    run_sql(database, """
+        UPDATE calls SET timestamp = timestamp - INTERVAL '17 days', outcome = 'successful', agreed_price = 1000
+        WHERE call_id % 3 = 0""")
+    assert_rollup_matches(database)
+    run_sql(database, "UPDATE calls SET duration = duration + 1, sentiment = 'upset' WHERE call_id % 5 = 0")
+    assert_rollup_matches(database)
+    run_sql(database, "DELETE FROM calls WHERE call_id % 4 = 0")
+    assert_rollup_matches(database)
+    insert_calls(database, 50, seed=2)
+    assert_rollup_matches(database)
+    # a repair recomputes the same totals
+    run_sql(database, "SELECT rebuild_calls_daily()")
+    assert_rollup_matches(database)
+
+def test_migration_adds_and_backfills_the_rollup(baseline_database):
+    insert_calls(baseline_database, 200)
+    run_file(baseline_database, "migrations/001_calls_daily.sql")
+    assert_rollup_matches(baseline_database)
+    insert_calls(baseline_database, 40, seed=3)
+    run_sql(baseline_database, "DELETE FROM calls WHERE call_id % 7 = 0")
+    assert_rollup_matches(baseline_database)
+    # running it again changes nothing (and does not rebuild a populated rollup)
+    before = query(baseline_database, ROLLUP)
+    run_file(baseline_database, "migrations/001_calls_daily.sql")
+    assert query(baseline_database, ROLLUP) == before
+
+def _definitions(url):
+    return {
+        "functions": query(url, """
+            SELECT p.proname, pg_get_functiondef(p.oid) FROM pg_proc p
+            WHERE p.proname IN ('calls_daily_sql', 'calls_daily_trigger', 'rebuild_calls_daily',
+                                'maintain_calls_partitions') ORDER BY 1"""),
+        "triggers": query(url, """
+            SELECT tgname, pg_get_triggerdef(oid) FROM pg_trigger
+            WHERE tgrelid = 'calls'::regclass AND NOT tgisinternal ORDER BY 1"""),
+        "columns": query(url, """
+            SELECT table_name, column_name, data_type, column_default, is_nullable FROM information_schema.columns
+            WHERE table_name IN ('calls', 'calls_daily') ORDER BY 1, ordinal_position"""),
+        "constraints": query(url, """
+            SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint
+            WHERE conrelid = 'calls'::regclass ORDER BY 1"""),
+        "indexes": query(url, "SELECT indexname, indexdef FROM pg_indexes WHERE tablename = 'calls' ORDER BY 1"),
+        "partitions": query(url, """
+            SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = 'calls'::regclass ORDER BY 1"""),
+        "partition_key": query(url, "SELECT pg_get_partkeydef('calls'::regclass)"),
+    }
+
+def test_init_sql_applies_every_migration(api, database):
+    names = migration_names()
+    assert names == sorted(os.listdir(os.path.join(DATABASE_DIR, "migrations")))
+    assert names == [name for name, _ in api.MIGRATIONS]
+    assert api.pending_migrations() == []
+    # a new database is already migrated: running them again changes nothing
+    before = _definitions(database)
+    for name in names:
+        run_file(database, os.path.join("migrations", name))
+    assert _definitions(database) == before
+
+def test_partition_migration_keeps_rows_ids_and_rollup(baseline_database):
+    # 150 to 210 days back and the last 60 days, so the rows span several months
+    start = datetime.now(timezone.utc) - timedelta(days=150)
+    insert_calls(baseline_database, 300, start=start)
+    insert_calls(baseline_database, 100, seed=4)
+    run_sql(baseline_database, "DELETE FROM calls WHERE call_id % 9 = 0")
+    run_file(baseline_database, "migrations/001_calls_daily.sql")
+    rows = "SELECT * FROM calls ORDER BY call_id"
+    before = query(baseline_database, rows)
+    last_id = query(baseline_database, "SELECT last_value FROM calls_call_id_seq")[0][0]
+
+    run_file(baseline_database, "migrations/002_partition_calls.sql")
+    assert query(baseline_database, "SELECT relkind FROM pg_class WHERE relname = 'calls'") == [("p",)]
+    assert query(baseline_database, rows) == before
+    # every row sits in its own month, none in the default partition
+    assert query(baseline_database, "SELECT COUNT(*) FROM calls_default") == [(0,)]
+    months = query(baseline_database, """
+        SELECT DISTINCT tableoid::regclass::text, to_char(timestamp AT TIME ZONE 'UTC', '"calls_"YYYY_MM')
+        FROM calls""")
+    assert len(months) >= 5 and all(partition == month for partition, month in months)
+    assert_rollup_matches(baseline_database)
+
+    # new rows continue the old sequence and keep the rollup current
+    insert_calls(baseline_database, 30, seed=5)
+    assert query(baseline_database, "SELECT MIN(call_id) FROM calls WHERE call_id > %s", (last_id,)) == [(last_id + 1,)]
+    run_sql(baseline_database, "DELETE FROM calls WHERE call_id % 11 = 0")
+    assert_rollup_matches(baseline_database)
+
+    # running it again changes nothing
+    after = query(baseline_database, rows)
+    run_file(baseline_database, "migrations/002_partition_calls.sql")
+    assert query(baseline_database, rows) == after
+    assert_rollup_matches(baseline_database)
+
+def test_partition_migration_needs_the_rollup(baseline_database):
+    insert_calls(baseline_database, 10)
+    with pytest.raises(psycopg2.Error, match="run 001_calls_daily.sql first"):
+        run_file(baseline_database, "migrations/002_partition_calls.sql")
+    assert query(baseline_database, "SELECT relkind FROM pg_class WHERE relname = 'calls'") == [("r",)]
+
+def test_api_reports_and_serves_after_the_migration(baseline_database, monkeypatch):
+    import app
+
+    pool = app.ConnectionPool(baseline_database, 1, 2, 5)
+    monkeypatch.setattr(app, "POOL", pool)
+    monkeypatch.setattr(app, "DASHBOARD_CACHE", app.ResultCache(0))
+    try:
+        assert app.pending_migrations() == ["001_calls_daily.sql", "002_partition_calls.sql"]
+        insert_calls(baseline_database, 20)
+        run_file(baseline_database, "migrations/001_calls_daily.sql")
+        assert app.pending_migrations() == ["002_partition_calls.sql"]
+        run_file(baseline_database, "migrations/002_partition_calls.sql")
+        assert app.pending_migrations() == []
+        client = TestClient(app.app, headers={"X-API-Key": app.API_KEY})
+        response = client.get("/metrics/dashboard", params={"days": 90})
+        assert response.status_code == 200
+        assert sum(s["total_duration_s"] for s in response.json()["duration_evolution"]) == response.json()["total_duration_seconds"]
+    finally:
+        pool.close()
@@ -1,3 +1,10 @@
+-- Schema for new databases, run by psql (the postgres image runs it from
+-- /docker-entrypoint-initdb.d). It creates the schema as first shipped, then applies
+-- database/migrations/*.sql in order, so a new database and an upgraded one end up
+-- the same. Schema changes go into a new migration, included at the end; the base
+-- below stays as it was. See metrics_ui/README.md.
+\set ON_ERROR_STOP on
+
 -- Enums for standardized values
 CREATE TYPE sentiment_enum AS ENUM ('happy', 'neutral', 'upset', 'n/a');
 CREATE TYPE outcome_enum   AS ENUM ('successful', 'unsuccessful', 'n/a');
@@ -24,3 +31,8 @@ CREATE INDEX idx_calls_timestamp   ON calls (timestamp);
 CREATE INDEX idx_calls_outcome     ON calls (outcome);
 CREATE INDEX idx_calls_sentiment   ON calls (sentiment);
 CREATE INDEX idx_calls_mc          ON calls (mc_number);
+
+-- the calls_daily rollup, its triggers and rebuild_calls_daily()
+\ir migrations/001_calls_daily.sql
+-- calls partitioned by month, and maintain_calls_partitions()
+\ir migrations/002_partition_calls.sql
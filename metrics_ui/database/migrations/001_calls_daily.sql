@@ -0,0 +1,102 @@
+-- Migration 001: the calls_daily rollup read by the /metrics endpoints, for databases
+-- created from an init.sql that predates it. Safe to run again.
+--
+--   psql "$DATABASE_URL" -v ON_ERROR_STOP=1 -f database/migrations/001_calls_daily.sql
+BEGIN;
+
+-- Daily rollup read by the /metrics endpoints. Kept current by the statement-level
+-- triggers below, so a batch insert updates each affected day once. Days are UTC.
+CREATE TABLE IF NOT EXISTS calls_daily (
+  day               DATE PRIMARY KEY,
+  calls             BIGINT NOT NULL DEFAULT 0,
+  total_duration    BIGINT NOT NULL DEFAULT 0,          -- seconds
+  discount_rate_sum NUMERIC(16,2) NOT NULL DEFAULT 0,   -- avg = discount_rate_sum / calls
+  sales_volume      NUMERIC(16,2) NOT NULL DEFAULT 0,   -- agreed_price of successful calls
+  successful        BIGINT NOT NULL DEFAULT 0,
+  unsuccessful      BIGINT NOT NULL DEFAULT 0,
+  outcome_na        BIGINT NOT NULL DEFAULT 0,
+  happy             BIGINT NOT NULL DEFAULT 0,
+  neutral           BIGINT NOT NULL DEFAULT 0,
+  upset             BIGINT NOT NULL DEFAULT 0,
+  sentiment_na      BIGINT NOT NULL DEFAULT 0
+);
+
+-- Statement adding (sign $1 = 1) or subtracting ($1 = -1) the per-day aggregates of
+-- `source`: the calls table itself or a trigger's transition table. Transition tables
+-- are only visible inside the trigger function, hence SQL text instead of a function.
+CREATE OR REPLACE FUNCTION calls_daily_sql(source TEXT) RETURNS TEXT AS $$
+  SELECT format($q$
+    INSERT INTO calls_daily AS d (day, calls, total_duration, discount_rate_sum, sales_volume,
+                                  successful, unsuccessful, outcome_na, happy, neutral, upset, sentiment_na)
+    SELECT (r.timestamp AT TIME ZONE 'UTC')::date,
+           $1 * COUNT(*),
+           $1 * SUM(r.duration),
+           $1 * SUM(r.discount_rate),
+           $1 * COALESCE(SUM(r.agreed_price) FILTER (WHERE r.outcome = 'successful'), 0),
+           $1 * COUNT(*) FILTER (WHERE r.outcome = 'successful'),
+           $1 * COUNT(*) FILTER (WHERE r.outcome = 'unsuccessful'),
+           $1 * COUNT(*) FILTER (WHERE r.outcome = 'n/a'),
+           $1 * COUNT(*) FILTER (WHERE r.sentiment = 'happy'),
+           $1 * COUNT(*) FILTER (WHERE r.sentiment = 'neutral'),
+           $1 * COUNT(*) FILTER (WHERE r.sentiment = 'upset'),
+           $1 * COUNT(*) FILTER (WHERE r.sentiment = 'n/a')
+    FROM %I AS r
+    GROUP BY 1
+    ON CONFLICT (day) DO UPDATE SET
+      calls             = d.calls             + EXCLUDED.calls,
+      total_duration    = d.total_duration    + EXCLUDED.total_duration,
+      discount_rate_sum = d.discount_rate_sum + EXCLUDED.discount_rate_sum,
+      sales_volume      = d.sales_volume      + EXCLUDED.sales_volume,
+      successful        = d.successful        + EXCLUDED.successful,
+      unsuccessful      = d.unsuccessful      + EXCLUDED.unsuccessful,
+      outcome_na        = d.outcome_na        + EXCLUDED.outcome_na,
+      happy             = d.happy             + EXCLUDED.happy,
+      neutral           = d.neutral           + EXCLUDED.neutral,
+      upset             = d.upset             + EXCLUDED.upset,
+      sentiment_na      = d.sentiment_na      + EXCLUDED.sentiment_na
+  $q$, source);
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION calls_daily_trigger() RETURNS TRIGGER AS $$
+BEGIN
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    EXECUTE calls_daily_sql('old_rows') USING -1;
+  END IF;
+  IF TG_OP IN ('UPDATE', 'INSERT') THEN
+    EXECUTE calls_daily_sql('new_rows') USING 1;
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER calls_daily_ins AFTER INSERT ON calls
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION calls_daily_trigger();
+CREATE OR REPLACE TRIGGER calls_daily_upd AFTER UPDATE ON calls
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION calls_daily_trigger();
+CREATE OR REPLACE TRIGGER calls_daily_del AFTER DELETE ON calls
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION calls_daily_trigger();
+
+-- Recompute the rollup from scratch (backfill after loading data, or repair).
+-- Only attached partitions are counted: days archived by maintain_calls_partitions are lost.
+-- Blocks writes to calls while it runs so no insert is counted twice or missed.
+CREATE OR REPLACE FUNCTION rebuild_calls_daily() RETURNS BIGINT AS $$
+DECLARE
+  n BIGINT;
+BEGIN
+  LOCK TABLE calls IN SHARE MODE;
+  DELETE FROM calls_daily;
+  EXECUTE calls_daily_sql('calls') USING 1;
+  SELECT COUNT(*) INTO n FROM calls_daily;
+  RETURN n;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Backfill, unless the rollup already has rows (rebuilding it would lose the days of
+-- partitions archived since). CREATE TRIGGER above locks calls against writes until
+-- COMMIT, so no insert falls between the backfill and the triggers.
+SELECT rebuild_calls_daily() WHERE NOT EXISTS (SELECT 1 FROM calls_daily);
+
+COMMIT;
@@ -0,0 +1,162 @@
+-- Migration 002: partition calls by month, for databases whose calls table predates
+-- partitioning. Needs 001_calls_daily.sql. Safe to run again.
+--
+--   psql "$DATABASE_URL" -v ON_ERROR_STOP=1 -f database/migrations/002_partition_calls.sql
+--
+-- The rows are copied into a new partitioned calls table inside one transaction, which
+-- holds an exclusive lock on calls until COMMIT: inserts wait (or queue in the API's
+-- write-behind buffer) and reads of calls block for as long as the copy takes.
+-- call_id values are kept and the existing sequence carries on from where it was.
+BEGIN;
+
+DO $$
+BEGIN
+  IF to_regclass('public.calls_daily') IS NULL THEN
+    RAISE EXCEPTION 'calls_daily is missing: run 001_calls_daily.sql first';
+  END IF;
+END;
+$$;
+
+-- Old partitions are detached into this schema, where they can be dumped or dropped.
+CREATE SCHEMA IF NOT EXISTS archive;
+
+-- Partition maintenance, safe to run repeatedly (the API runs it at startup; schedule
+-- `python app.py maintain-partitions` for retention):
+--   * creates monthly partitions (UTC) from the current month to `months_ahead`
+--   * moves rows that landed in calls_default into their own monthly partitions
+--   * with `retain_months`, detaches partitions ending before the first day of the
+--     month `retain_months` months ago and moves them to the archive schema.
+--     calls_daily keeps their totals.
+CREATE OR REPLACE FUNCTION maintain_calls_partitions(months_ahead INTEGER DEFAULT 3,
+                                                     retain_months INTEGER DEFAULT NULL)
+RETURNS TABLE (action TEXT, partition_name TEXT) AS $$
+DECLARE
+  this_month DATE := date_trunc('month', NOW() AT TIME ZONE 'UTC')::date;
+  cutoff     DATE := this_month - make_interval(months => COALESCE(retain_months, 0));
+  m          DATE;
+  lo         TIMESTAMPTZ;
+  hi         TIMESTAMPTZ;
+  name       TEXT;
+BEGIN
+  -- several API workers run this at startup; serialize them
+  PERFORM pg_advisory_xact_lock(hashtext('maintain_calls_partitions'));
+  FOR m IN
+    SELECT (this_month + make_interval(months => i))::date FROM generate_series(0, months_ahead) i
+    UNION
+    SELECT DISTINCT date_trunc('month', c.timestamp AT TIME ZONE 'UTC')::date FROM calls_default c
+    ORDER BY 1
+  LOOP
+    name := 'calls_' || to_char(m, 'YYYY_MM');
+    CONTINUE WHEN to_regclass('public.' || name) IS NOT NULL;
+    lo := m::timestamp AT TIME ZONE 'UTC';
+    hi := (m + interval '1 month')::timestamp AT TIME ZONE 'UTC';
+    -- build the partition standalone, move its rows out of the default partition, then attach
+    -- (direct partition DML does not fire the calls_daily triggers on the parent)
+    EXECUTE format('CREATE TABLE %I (LIKE calls INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', name);
+    -- the CHECK lets ATTACH skip its validation scan
+    EXECUTE format('ALTER TABLE %I ADD CHECK (timestamp >= %L AND timestamp < %L)', name, lo, hi);
+    EXECUTE format('WITH moved AS (DELETE FROM calls_default WHERE timestamp >= $1 AND timestamp < $2 RETURNING *)
+                    INSERT INTO %I SELECT * FROM moved', name) USING lo, hi;
+    EXECUTE format('ALTER TABLE calls ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)', name, lo, hi);
+    action := 'created'; partition_name := name;
+    RETURN NEXT;
+  END LOOP;
+
+  IF retain_months IS NOT NULL THEN
+    FOR name IN
+      SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+      WHERE i.inhparent = 'calls'::regclass AND c.relname ~ '^calls_[0-9]{4}_[0-9]{2}$'
+        AND to_date(substr(c.relname, 7), 'YYYY_MM') < cutoff
+      ORDER BY 1
+    LOOP
+      EXECUTE format('ALTER TABLE calls DETACH PARTITION %I', name);
+      EXECUTE format('ALTER TABLE %I SET SCHEMA archive', name);
+      action := 'archived'; partition_name := name;
+      RETURN NEXT;
+    END LOOP;
+  END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+  first_month DATE;
+  last_month  DATE;
+  m           DATE;
+  expected    BIGINT;
+  copied      BIGINT;
+BEGIN
+  IF EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'public.calls'::regclass) THEN
+    RETURN;  -- already partitioned
+  END IF;
+  LOCK TABLE calls IN ACCESS EXCLUSIVE MODE;
+  ALTER TABLE calls RENAME TO calls_unpartitioned;
+  ALTER INDEX calls_pkey RENAME TO calls_unpartitioned_pkey;
+
+  -- the partitioned calls table, on the sequence of the old table. The checks are
+  -- named because the old table still holds the generated names until it is dropped.
+  CREATE TABLE calls (
+    call_id         BIGINT NOT NULL DEFAULT nextval('calls_call_id_seq'),
+    mc_number       TEXT NOT NULL,
+    original_price  NUMERIC(12,2) NOT NULL
+                    CONSTRAINT calls_original_price_check CHECK (original_price >= 0),
+    agreed_price    NUMERIC(12,2)
+                    CONSTRAINT calls_agreed_price_check CHECK (agreed_price >= 0),
+    had_discount    BOOLEAN NOT NULL DEFAULT FALSE,
+    discount_rate   NUMERIC(5,2) NOT NULL DEFAULT 0
+                    CONSTRAINT calls_discount_rate_check CHECK (discount_rate >= 0 AND discount_rate <= 100),
+    sentiment       sentiment_enum NOT NULL DEFAULT 'n/a',
+    outcome         outcome_enum   NOT NULL DEFAULT 'n/a',
+    duration        INTEGER NOT NULL CONSTRAINT calls_duration_check CHECK (duration >= 0),
+    timestamp       TIMESTAMPTZ NOT NULL,
+    PRIMARY KEY (call_id, timestamp)
+  ) PARTITION BY RANGE (timestamp);
+  CREATE TABLE calls_default PARTITION OF calls DEFAULT;
+
+  -- one partition per month the data spans, so the copy lands in place rather than in
+  -- calls_default (min/max come from the old timestamp index)
+  SELECT date_trunc('month', MIN(timestamp) AT TIME ZONE 'UTC')::date,
+         date_trunc('month', MAX(timestamp) AT TIME ZONE 'UTC')::date
+    INTO first_month, last_month FROM calls_unpartitioned;
+  FOR m IN SELECT generate_series(first_month, last_month, interval '1 month')::date LOOP
+    EXECUTE format('CREATE TABLE %I PARTITION OF calls FOR VALUES FROM (%L) TO (%L)',
+                   'calls_' || to_char(m, 'YYYY_MM'),
+                   m::timestamp AT TIME ZONE 'UTC', (m + interval '1 month')::timestamp AT TIME ZONE 'UTC');
+  END LOOP;
+
+  -- no triggers on the new table yet: calls_daily already counts these rows
+  INSERT INTO calls (call_id, mc_number, original_price, agreed_price, had_discount, discount_rate,
+                     sentiment, outcome, duration, timestamp)
+  SELECT call_id, mc_number, original_price, agreed_price, had_discount, discount_rate,
+         sentiment, outcome, duration, timestamp
+  FROM calls_unpartitioned;
+  GET DIAGNOSTICS copied = ROW_COUNT;
+  SELECT COUNT(*) INTO expected FROM calls_unpartitioned;
+  IF copied <> expected THEN
+    RAISE EXCEPTION 'copied % of % calls', copied, expected;
+  END IF;
+
+  -- keep the sequence when the old table goes (it drops its indexes and triggers with it)
+  ALTER SEQUENCE calls_call_id_seq OWNED BY calls.call_id;
+  DROP TABLE calls_unpartitioned;
+
+  CREATE INDEX idx_calls_timestamp   ON calls USING BRIN (timestamp);
+  CREATE INDEX idx_calls_successful  ON calls (timestamp) WHERE outcome = 'successful';
+  CREATE INDEX idx_calls_mc          ON calls (mc_number);
+END;
+$$;
+
+CREATE OR REPLACE TRIGGER calls_daily_ins AFTER INSERT ON calls
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION calls_daily_trigger();
+CREATE OR REPLACE TRIGGER calls_daily_upd AFTER UPDATE ON calls
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION calls_daily_trigger();
+CREATE OR REPLACE TRIGGER calls_daily_del AFTER DELETE ON calls
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION calls_daily_trigger();
+
+-- partitions for the months ahead
+SELECT maintain_calls_partitions();
+
+COMMIT;
@@ -1,3 +1,4 @@
+import argparse
 import requests
 import random
 from datetime import datetime, timedelta
@@ -34,18 +35,43 @@ def random_call():
     }
 
 def populate(n=100):
-    """Send n fake call events to the API."""
+    """Send n fake call events to the API, one request per call."""
     success, errors = 0, 0
-    for _ in range(n):
-        data = random_call()
-        r = requests.post(API_URL, json=data, headers=HEADERS)
-        if r.status_code == 200:
-            success += 1
-        else:
-            errors += 1
-            print(f"❌ Failed: {r.status_code} -> {r.text}")
+    with requests.Session() as session:
+        session.headers.update(HEADERS)
+        for _ in range(n):
+            data = random_call()
+            r = session.post(API_URL, json=data, timeout=30)
+            if r.status_code == 200:
+                success += 1
+            else:
+                errors += 1
+                print(f"❌ Failed: {r.status_code} -> {r.text}")
+    print(f"✅ Inserted {success} calls ({errors} errors)")
+
+def populate_bulk(n=100, batch_size=1000):
+    """Send n fake call events through POST /calls/batch, batch_size calls per request."""
+    success, errors = 0, 0
+    with requests.Session() as session:
+        session.headers.update(HEADERS)
+        for start in range(0, n, batch_size):
+            batch = [random_call() for _ in range(min(batch_size, n - start))]
+            r = session.post(f"{API_URL}/batch", json=batch, timeout=120)
+            if r.status_code == 200:
+                success += r.json()["inserted"]
+            else:
+                errors += len(batch)
+                print(f"❌ Failed batch: {r.status_code} -> {r.text}")
     print(f"✅ Inserted {success} calls ({errors} errors)")
 
 if __name__ == "__main__":
-    populate(300)
+    parser = argparse.ArgumentParser(description="Populate the metrics API with fake calls")
+    parser.add_argument("-n", type=int, default=300, help="number of calls to send")
+    parser.add_argument("--bulk", action="store_true", help="use POST /calls/batch")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    if args.bulk:
+        populate_bulk(args.n, args.batch_size)
+    else:
+        populate(args.n)
 
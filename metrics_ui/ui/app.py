@@ -2,7 +2,11 @@ import os
 import streamlit as st
 import requests
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, timedelta
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
 # ---------- Configuration ----------
 st.set_page_config(page_title="Carrier Sales Dashboard", layout="wide")
@@ -10,21 +14,77 @@ st.set_page_config(page_title="Carrier Sales Dashboard", layout="wide")
 API_URL = os.getenv("API_URL", "http://localhost:8000")
 API_KEY = os.getenv("API_KEY", "change-me")
 HEADERS = {"X-API-Key": API_KEY}
+REQUEST_TIMEOUT = float(os.getenv("REQUEST_TIMEOUT", "10"))  # seconds per API call
+CACHE_TTL = int(os.getenv("CACHE_TTL", "30"))  # seconds metrics are reused across reruns
 
 # ---------- Helper ----------
-def fetch(endpoint, params=None):
-    """Helper to call API and handle errors gracefully."""
+class FetchError(Exception):
+    """A dashboard request failed."""
+
+
+@st.cache_resource
+def get_session():
+    """One keep-alive HTTP session shared by all reruns and users of this server."""
+    session = requests.Session()
+    retry = Retry(total=2, backoff_factor=0.2, status_forcelist=(502, 503, 504), allowed_methods=["GET"])
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(HEADERS)
+    return session
+
+
+def _get(session, endpoint, params=None):
+    """Call the API; returns (data, error message)."""
     try:
-        res = requests.get(f"{API_URL}{endpoint}", headers=HEADERS, params=params)
-        if res.status_code == 200:
-            return res.json()
+        res = session.get(f"{API_URL}{endpoint}", params=params, timeout=REQUEST_TIMEOUT)
+    except requests.RequestException as e:
+        return None, f"Request failed: {e}"
+    if res.status_code == 200:
+        return res.json(), None
+    return None, f"Error {res.status_code}: {res.text}"
+
+
+def _dashboard(params):
+    data, error = _get(get_session(), "/metrics/dashboard", params)
+    if error:
+        raise FetchError(error)  # not cached: retried on the next rerun
+    return data
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def fetch_totals():
+    """Totals and distributions, which do not depend on the time window."""
+    return _dashboard({"part": "totals"})
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def fetch_series(days):
+    """Time series for the last `days` days."""
+    return _dashboard({"part": "series", "days": days})
+
+
+def load(days):
+    """Fetch both halves of the dashboard concurrently, showing errors and keeping whatever did load."""
+    ctx = get_script_run_ctx()
+
+    def run(fn, *args):
+        add_script_run_ctx(ctx=ctx)  # the cached functions look up the session's runtime
+        try:
+            return fn(*args)
+        except FetchError as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        results = [pool.submit(run, fetch_totals), pool.submit(run, fetch_series, days)]
+    data = {}
+    for future in results:
+        result = future.result()
+        if isinstance(result, FetchError):
+            st.error(str(result))
         else:
-            st.error(f"Error {res.status_code}: {res.text}")
-            return None
-    except Exception as e:
-        st.error(f"Request failed: {e}")
-        return None
-
+            data.update(result)
+    return data
 
 
 # ---------- Dashboard ----------
@@ -33,12 +93,14 @@ st.caption("Data visualization of call analytics from the Metrics API")
 
 days = st.slider("Days for time-series metrics", 7, 90, 14)
 
+# moving the slider only refetches the series; totals come from the cache
+data = load(days)
+
 col1, col2, col3 = st.columns(3)
 
 # Total duration
-duration_data = fetch("/metrics/total_duration")
-if duration_data:
-    total_seconds = duration_data["total_duration_seconds"]
+total_seconds = data.get("total_duration_seconds")
+if total_seconds is not None:
     
     # Dynamically choose the most appropriate time unit
     if total_seconds < 60:
@@ -53,12 +115,12 @@ if duration_data:
     col1.metric("Total Time Saved (call duration)", display_value)
 
 # Total sales volume
-sales_data = fetch("/metrics/total_sales_volume")
-if sales_data:
-    col2.metric("Total Sales Volume ($)", f"{sales_data['total_sales_volume']:.2f}")
+total_sales = data.get("total_sales_volume")
+if total_sales is not None:
+    col2.metric("Total Sales Volume ($)", f"{total_sales:.2f}")
 
 # Satisfaction distribution
-satisfaction = fetch("/metrics/satisfaction")
+satisfaction = data.get("satisfaction")
 if satisfaction:
     df_sat = pd.DataFrame(satisfaction)
     col3.metric("Most Frequent Sentiment", df_sat.loc[df_sat["percentage"].idxmax(), "sentiment"].capitalize())
@@ -71,7 +133,7 @@ st.subheader(f"📈 Trends over the last {days} days")
 col1, col2 = st.columns(2)
 
 # Duration evolution
-duration_evo = fetch("/metrics/duration_evolution", {"days": days})
+duration_evo = data.get("duration_evolution")
 if duration_evo:
     df = pd.DataFrame(duration_evo)
     df["day"] = pd.to_datetime(df["day"])
@@ -80,7 +142,7 @@ if duration_evo:
         st.caption("Total call duration per day")
 
 # Sales evolution
-sales_evo = fetch("/metrics/sales_evolution", {"days": days})
+sales_evo = data.get("sales_evolution")
 if sales_evo:
     df = pd.DataFrame(sales_evo)
     df["day"] = pd.to_datetime(df["day"])
@@ -91,7 +153,7 @@ if sales_evo:
 st.divider()
 
 # ---------- Discount trend ----------
-discount_evo = fetch("/metrics/discount_evolution", {"days": days})
+discount_evo = data.get("discount_evolution")
 if discount_evo:
     df = pd.DataFrame(discount_evo)
     df["day"] = pd.to_datetime(df["day"])
@@ -124,7 +186,7 @@ st.divider()
 st.markdown("#### Success Rate Distribution")
 col1, col2 = st.columns([1, 2])
 
-success = fetch("/metrics/success")
+success = data.get("success")
 if success:
     df_succ = pd.DataFrame(success)
     with col1: